@@ -5,24 +5,84 @@ import pandas as pd
 import io
 import matplotlib.pyplot as plt
 import web_functions as wf
-import options4 as opfour
+import functions as fn
+import fte_engine
+import report_writer
+import option4 as opfour
+import tier_table
+import schedule
+from report_cache import DownloadCache, ReportCache, data_version, excel_bytes
+from term_store import TermStore
 
 @st.cache_data
-def load_data():
+def load_data(version):
+    # version changes when a source file is replaced, reading it again
     dean_df = wf.readfile()
-    unique_df = pd.read_excel('unique_deansDailyCsar_FTE.xlsx')
-    fte_tier = pd.read_excel('FTE_Tier.xlsx')
+    fte_tier = tier_table.load()
     dean_df.columns = dean_df.columns.str.strip()
-    unique_df.columns = unique_df.columns.str.strip()
-    return dean_df, unique_df, fte_tier
+    return dean_df, fte_tier
+
+version = data_version()
+dean_df, fte_tier = load_data(version)
+
+@st.cache_resource
+def load_history():
+    # one store per server process, older terms load on first use
+    return TermStore()
+
+history = load_history()
+available_terms = history.terms()
+selected_terms = ""
+if len(available_terms) > 1:
+    current_term = [term for term in available_terms[-1:]
+                    if len(dean_df) and term == str(dean_df['Term'].iloc[0])]
+    chosen = st.sidebar.multiselect("Terms", available_terms, default=current_term)
+    if chosen:
+        selected_terms = ",".join(chosen)
+
+@st.cache_resource(max_entries=4)
+def load_reports(version, terms):
+    # option lists, FTE and totals are computed once per data version and
+    # term selection; every page below only slices them
+    sections = history.sections(terms) if terms else load_data(version)[0]
+    return ReportCache(sections, load_data(version)[1])
+
+reports = load_reports(version, selected_terms)
+dean_df = reports.sections
 
-dean_df, unique_df, fte_tier = load_data()
-
-def save_report(df_full, filename):
-    output = io.BytesIO()
-    with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
-        df_full.to_excel(writer, sheet_name='Full Report', index=False)
-    st.download_button("Save Report", output.getvalue(), file_name=filename)
+@st.cache_data
+def load_room_report(version, terms):
+    # the meetings of the terms picked in the sidebar, like every other page
+    meetings = history.tables(terms)[1] if terms else wf.readmeetings()
+    conflicts = schedule.double_bookings(meetings)
+    return schedule.room_utilization(meetings, conflicts), conflicts
+
+@st.cache_resource
+def load_downloads():
+    # workbooks written so far, shared by every session
+    return DownloadCache()
+
+downloads = load_downloads()
+
+def run_report(page, key):
+    # the report stays shown on the reruns its Save Report button causes
+    shown = st.session_state.setdefault('shown', {})
+    if st.button("Run Report"):
+        shown[page] = key
+    return shown.get(page) == key
+
+def save_report(report, key, df_full, filename, build=None):
+    # the workbook is only written when asked for, then kept by report,
+    # key and data version for every session
+    build = build or (lambda: excel_bytes(df_full))
+    cache_key = (report, key, version, selected_terms)
+    requested = st.session_state.setdefault('requested', set())
+    if cache_key not in requested and cache_key not in downloads:
+        if not st.button("Save Report", key=f"save {report}"):
+            return
+        requested.add(cache_key)
+    data = downloads.get(cache_key, build)
+    st.download_button(f"Download {filename}", data, file_name=filename)
 
 
 st.title('FTE Report Generator')
@@ -32,7 +92,9 @@ menu = [
     "Course Enrollment Percentage",
     "FTE by Division",
     "FTE per Instructor",
-    "FTE per Course"
+    "FTE per Course",
+    "Room Utilization",
+    "College FTE Dashboard"
 ]
 
 choice = st.sidebar.radio("Choose Report Option", menu)
@@ -40,28 +102,26 @@ choice = st.sidebar.radio("Choose Report Option", menu)
 if choice == "Sec Division Report":
     st.header("Sec Division Report")
     if 'Sec Divisions' in dean_df.columns:
-        division = st.selectbox("Select Division", dean_df['Sec Divisions'].dropna().unique())
-        run = st.button("Run Report")
+        division = st.selectbox("Select Division", reports.divisions)
+        run = run_report(choice, division)
         if run:
-            filtered = dean_df[dean_df['Sec Divisions'] == division]
+            filtered = reports.division_sections(division)
             st.dataframe(filtered.head(10))
-            save_report(filtered, f"{division}_Division_Report.xlsx")
+            save_report('division', division, filtered, f"{division}_Division_Report.xlsx")
     else:
         st.warning("This feature will run when 'Sec Divisions' is available in the dataset.")
 
 elif choice == "Course Enrollment Percentage":
     st.header("Course Enrollment Percentage")
     if 'Sec Name' in dean_df.columns:
-        course = st.selectbox("Select Course", dean_df['Sec Name'].dropna().unique())
-        run = st.button("Run Report")
+        course = st.selectbox("Select Course", reports.sec_names)
+        run = run_report(choice, course)
         if run:
-            filtered = dean_df[dean_df['Sec Name'] == course]
-            filtered = filtered.drop_duplicates(subset="Sec Name")
-            filtered["Enrollment Percentage"] = filtered.apply(wf.calc_enrollment, axis=1)
+            filtered = reports.enrollment_rows(course)
             st.dataframe(filtered.head(10))
             filtered['Enrollment Percentage'] = filtered['Enrollment Percentage'].replace('%', '', regex=True).astype(float)
             st.bar_chart(filtered.set_index('Sec Name')['Enrollment Percentage'])
-            save_report(filtered, f"{course}_Course_Report.xlsx")
+            save_report('enrollment', course, filtered, f"{course}_Course_Report.xlsx")
     else:
         st.warning("This feature will run when 'Sec Name' is available in the dataset.")
 
@@ -69,12 +129,11 @@ elif choice == "FTE by Division":
     st.header("FTE by Division")
 
     if 'Sec Divisions' in dean_df.columns:
-        division_input = st.selectbox("Select Division", dean_df['Sec Divisions'].dropna().unique())
-        run = st.button("Run Report")
+        division_input = st.selectbox("Select Division", reports.divisions)
+        run = run_report(choice, division_input)
 
         if run:
-            raw_df, orig_total, gen_total = wf.fte_by_div_raw(dean_df, fte_tier, division_input)
-            formatted_df = wf.format_fte_output(raw_df, orig_total, gen_total)
+            formatted_df, orig_total, gen_total = reports.division_report(division_input)
 
             # Add numeric column for plotting
             #formatted_df['Total FTE (Numeric)'] = (
@@ -89,25 +148,28 @@ elif choice == "FTE by Division":
             #if not plot_df.empty:
                 #st.bar_chart(plot_df['Total FTE (Numeric)'])
 
-            save_report(formatted_df, f"{division_input}_FTE_Report.xlsx")
+            save_report('division fte', division_input, formatted_df,
+                        f"{division_input}_FTE_Report.xlsx")
+
+        with st.expander("All divisions"):
+            st.dataframe(reports.by_division)
     else:
         st.info("Division data not available.")
 
 elif choice == "FTE per Instructor":
     st.header("FTE per Instructor")
     if 'Sec All Faculty Last Names' in dean_df.columns:
-        faculty_list = sorted(dean_df['Sec Faculty Info'].dropna().unique())
-        instructor = st.selectbox("Select Instructor", faculty_list)
+        instructor = st.selectbox("Select Instructor", reports.faculty)
 
-        run = st.button("Run Report")
+        run = run_report(choice, instructor)
         if run:
-            report_df, orig_fte, gen_fte = wf.generate_faculty_fte_report(dean_df, fte_tier, instructor)
+            report_df, orig_fte, gen_fte = reports.faculty_report(instructor)
             report_df = report_df.fillna("")
 
             st.dataframe(report_df)
 
             filename = opfour.clean_instructor_name(instructor)
-            save_report(report_df, filename)
+            save_report('instructor fte', instructor, report_df, filename)
 
             st.info(f"Total FTE: {orig_fte:.2f}")
             st.info(f"Generated FTE: ${gen_fte:,.2f}")
@@ -119,14 +181,15 @@ elif choice == "FTE per Instructor":
 
 elif choice == "FTE per Course":
     st.header("FTE per Course")
-    if 'Sec Name' in unique_df.columns:
+    if 'Sec Name' in dean_df.columns:
         course_name = st.text_input("Enter Course Name (Sec Name)")
-        run = st.button("Run Report")
+        run = run_report(choice, course_name)
         if run:
-            df_result, original_fte, generated_fte = wf.calculate_fte_by_course(dean_df, fte_tier, course_name)
+            df_result, original_fte, generated_fte = reports.course_report(course_name)
             if df_result is not None:
                 st.dataframe(df_result)
-                save_report(df_result, f"{course_name}_FTE_Report.xlsx")
+                save_report('course fte', course_name.strip().upper(), df_result,
+                            f"{course_name}_FTE_Report.xlsx")
                 st.success(f"Report generated for {course_name}")
                 st.bar_chart(df_result.set_index('Sec Name')['Total FTE'])
                 st.info(f"Original Total FTE: {original_fte:.2f}")
@@ -135,3 +198,52 @@ elif choice == "FTE per Course":
                 st.warning("Course not found.")
     else:
         st.warning("This feature will run when 'Sec Name' is present in the FTE dataset.")
+
+elif choice == "Room Utilization":
+    st.header("Room Utilization and Double Bookings")
+    utilization, conflicts = load_room_report(version, selected_terms)
+
+    status = st.selectbox("Show Rooms", ["All", "Over-used", "Under-used"])
+    shown = utilization if status == "All" else utilization[utilization['Status'] == status]
+    st.dataframe(shown)
+    st.bar_chart(shown.set_index(shown['Building'] + ' ' + shown['Room'])['Utilization %'])
+    save_report('rooms', status, shown, "room_utilization.xlsx")
+
+    st.subheader(f"Double Bookings ({len(conflicts)})")
+    st.dataframe(conflicts)
+
+
+elif choice == "College FTE Dashboard":
+    st.header("College FTE Dashboard")
+    labelled = reports.cube_sections
+    if labelled.empty:
+        st.warning("No sections to report on.")
+    else:
+        # added up division by division, like the College Summary
+        total, generated = [
+            fte_engine.running_total(fte_engine.division_totals(labelled, value))
+            for value in ['Total FTE', 'Generated FTE']]
+        left, middle, right = st.columns(3)
+        left.metric("Sections", f"{len(labelled):,}")
+        middle.metric("Total FTE", f"{total:,.2f}")
+        right.metric("Generated FTE", f"${generated:,.0f}")
+
+        by = st.radio("Break down by", ["Delivery Method", "Tier"], horizontal=True)
+        value = st.selectbox("Show", ["Generated FTE", "Total FTE", "Sections"])
+        columns = 'X Sec Delivery Method' if by == "Delivery Method" else 'Tier'
+        st.dataframe(fte_engine.pivot_cube(labelled, columns, value))
+
+        # drill down into one division's delivery methods and tiers
+        division = st.selectbox("Division", reports.divisions)
+        division_sections = labelled[labelled['Sec Divisions'] == division]
+        st.subheader(f"{division}: {value} by Delivery Method and Tier")
+        st.dataframe(fte_engine.pivot_cube(division_sections, 'Tier', value,
+                                           rows='X Sec Delivery Method'))
+
+        def dashboard_workbook():
+            output = io.BytesIO()
+            report_writer.write_workbook(output, fn.dashboard_sheets(labelled))
+            return output.getvalue()
+
+        save_report('dashboard', 'college', reports.cube, fn.DASHBOARD_FILE,
+                    dashboard_workbook)
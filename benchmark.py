@@ -0,0 +1,478 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmarks for the report pipeline on synthetic CSAR extracts.
+
+synthetic_csar builds a seeded extract shaped like deanDailyCsar.csv at
+any multiple of its 3,276 rows: sections with one to a dozen meetings,
+"Sec Divisions" filled only on a section's first row, co-taught sections
+whose "Sec Faculty Info" is split over several lines (a quoted field in
+the CSV), the five delivery methods, online and on-campus meetings and
+some sections without meeting times.
+
+Each stage (readfile, generate_fte, the division/course/faculty reports
+and the Excel exports) is timed and run once more under tracemalloc for
+its peak memory. Results are compared with the stored baseline in
+benchmark_baseline.json:
+
+    python benchmark.py --scales 10,100
+    python benchmark.py --scales 10,100,1000 --save-baseline
+
+The baseline is machine specific; save a new one after changing machines.
+"""
+import argparse
+import contextlib
+import io
+import json
+import math
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+import functions as fn
+import option4
+import tier_table
+from course_index import CourseIndex
+
+
+# Rows in the real extract, scale 1
+BASE_ROWS = 3276
+
+BASELINE_FILE = 'benchmark_baseline.json'
+
+# A stage this much slower than the baseline is a regression (ignored
+# below MIN_SECONDS, where timings are mostly noise)
+TOLERANCE = 1.5
+MIN_SECONDS = 0.05
+
+# Shape of the real extract
+MEETING_COUNTS = {1: 902, 2: 710, 3: 116, 4: 62, 5: 4, 6: 13, 7: 5, 8: 7, 12: 4}
+DELIVERY_METHODS = {'IN': 1325, 'TR': 1143, 'BL': 567, 'HY': 237, 'HF': 4}
+DIVISIONS = {'CGEN5': 462, 'CBUS1': 277, 'CGEN4': 258, 'CBUS3': 218,
+             'CGEN3': 181, 'CHLT2': 119, 'CTEC2': 107, 'CGEN': 77,
+             'CTEC1': 66, 'CGEN6': 32, 'CHLT1': 18, 'CSUPP': 10, 'CTEC3': 7}
+# Share of each delivery method's meetings held online (DED INET)
+ONLINE_SHARE = {'IN': 0.99, 'TR': 0.01, 'BL': 0.41, 'HY': 0.47, 'HF': 0.5}
+MEETING_TYPES = {'CLAS': 1921, 'LAB': 1008, 'CLIN': 62, 'WORK': 10}
+BUILDINGS = ['ATC', 'CUH', 'LAH', 'HOS', 'HTC', 'CAF', 'VCC']
+DAYS = ['M', 'T', 'W', 'TH', 'F', 'MW', 'TTH', 'MWF', 'S']
+TERM_PARTS = [('01/13/25', '05/14/25'), ('01/13/25', '03/10/25'),
+              ('03/13/25', '05/14/25')]
+CAPACITIES = [0, 10, 12, 15, 18, 20, 22, 24, 25, 28, 30, 35, 40, 45]
+CONTACT_HOURS = {1: 10, 2: 15, 3: 40, 4: 25, 5: 7, 6: 3}
+SECTIONS_PER_COURSE = 2.7
+NO_MEETING_SHARE = 0.084
+CO_TAUGHT_SHARE = 0.14
+MULTI_LINE_SHARE = 0.25
+TBA_SHARE = 0.03
+FALLBACK_PREFIXES = ['ACA', 'ACC', 'BIO', 'BUS', 'CIS', 'CSC', 'CTI', 'ENG',
+                     'HIS', 'MAT', 'NUR', 'PSY', 'SOC', 'SPA', 'WBL']
+
+_SYLLABLES = ['ba', 'ch', 'da', 'el', 'fa', 'go', 'har', 'in', 'jo', 'ke',
+              'lo', 'man', 'ne', 'or', 'pe', 'ri', 'son', 'ta', 'ut', 'ven',
+              'wa', 'ye', 'zel', 'ton']
+
+
+def _weighted(rng, options, size):
+    '''
+    Draws size values from a {value: weight} dict.
+    '''
+    values = np.array(list(options))
+    weights = np.array(list(options.values()), dtype=float)
+    return values[rng.choice(len(values), size=size, p=weights / weights.sum())]
+
+
+def _faculty_pool(rng, size):
+    '''
+    size distinct "F. Lastname" names.
+    '''
+    syllables = np.array(_SYLLABLES)
+    names = set()
+    while len(names) < size:
+        count = size - len(names)
+        parts = rng.integers(0, len(syllables), size=(count, 3))
+        initials = rng.integers(0, 26, size=count)
+        for initial, part in zip(initials, parts):
+            last = ''.join(syllables[part]).capitalize()
+            names.add(f"{chr(65 + initial)}. {last}")
+    return np.array(sorted(names))
+
+
+def _clock(minutes):
+    '''
+    "10:00AM" style times for an array of minutes after midnight.
+    '''
+    table = np.array([f"{(m // 60 - 1) % 12 + 1:02d}:{m % 60:02d}"
+                      f"{'AM' if m < 720 else 'PM'}" for m in range(1440)])
+    return table[minutes]
+
+
+def synthetic_csar(scale=1, seed=0, prefixes=None):
+    '''
+    A synthetic CSAR extract with the shape of deanDailyCsar.csv.
+
+    Parameters
+    ----------
+    scale : float
+        Multiple of the real extract's 3,276 rows (default is 1).
+    seed : int
+        Random seed; the same seed and scale give the same extract.
+    prefixes : list[str]
+        Course prefixes to use (default is FALLBACK_PREFIXES; run_benchmarks
+        passes the ones in FTE_Tier.xlsx so every prefix has a tier).
+
+    Returns
+    -------
+    csar : dataframe
+        One row per meeting, sorted by "Sec Name", with the CSAR columns.
+    hours : dataframe
+        The contact hours workbook: one row per course code.
+    '''
+    rng = np.random.default_rng(seed)
+    rows = max(1, int(round(BASE_ROWS * scale)))
+    prefixes = np.array(sorted(set(prefixes or FALLBACK_PREFIXES)))
+
+    # meetings per section, the last section cut to hit the row count
+    counts = _weighted(rng, MEETING_COUNTS, int(rows / 1.5) + 10)
+    while counts.sum() < rows:
+        counts = np.concatenate([counts, _weighted(rng, MEETING_COUNTS, len(counts))])
+    ends = np.cumsum(counts)
+    sections = int(np.searchsorted(ends, rows)) + 1
+    counts = counts[:sections]
+    counts[-1] -= ends[sections - 1] - rows
+
+    # courses: distinct prefix/number pairs, each prefix in one division
+    course_space = len(prefixes) * 900
+    courses = int(min(course_space, max(1, round(sections / SECTIONS_PER_COURSE))))
+    course_ids = np.sort(rng.choice(course_space, size=courses, replace=False))
+    course_prefix = course_ids // 900
+    course_codes = np.char.add(np.char.add(prefixes[course_prefix], '-'),
+                               (100 + course_ids % 900).astype(str))
+    prefix_division = _weighted(rng, DIVISIONS, len(prefixes))
+    course_hours = _weighted(rng, CONTACT_HOURS, courses)
+
+    # sections
+    course = rng.integers(0, courses, size=sections)
+    number = pd.Series(course).groupby(course).cumcount().to_numpy() + 1001
+    sec_names = np.char.add(np.char.add(course_codes[course], '-'),
+                            np.char.zfill(number.astype(str), 4))
+    delivery = _weighted(rng, DELIVERY_METHODS, sections)
+    capacity = rng.choice(CAPACITIES, size=sections)
+    enrolled = (capacity * rng.uniform(0.3, 1.05, size=sections)).astype(int)
+    total_fte = np.round(course_hours[course] * 16 * enrolled / 512, 3)
+    waitlist = np.where(rng.random(sections) < 0.63, 'Y', 'N')
+
+    # faculty, some co-taught lists on several lines or cut with (more)
+    pool = _faculty_pool(rng, max(10, sections // 4))
+    lead = rng.integers(0, len(pool), size=sections)
+    faculty = pool[lead].astype(object)
+    last_names = np.array([name.split('. ', 1)[1] for name in pool])[lead].astype(object)
+    for pos in np.flatnonzero(rng.random(sections) < CO_TAUGHT_SHARE):
+        team = [pool[lead[pos]]] + list(pool[rng.integers(0, len(pool),
+                                                          size=rng.integers(1, 6))])
+        if rng.random() < MULTI_LINE_SHARE:
+            faculty[pos] = '\n'.join(team)
+        else:
+            text = ', '.join(team)
+            faculty[pos] = text if len(text) <= 40 else text[:33] + ' (more)'
+    tba = rng.random(sections) < TBA_SHARE
+    faculty[tba] = 'To be Announced'
+    last_names[tba] = np.nan
+
+    # one row per meeting
+    section = np.repeat(np.arange(sections), counts)
+    first = np.ones(rows, dtype=bool)
+    first[1:] = section[1:] != section[:-1]
+    method = delivery[section]
+    online = rng.random(rows) < pd.Series(method).map(ONLINE_SHARE).to_numpy()
+
+    part = rng.integers(0, len(TERM_PARTS), size=rows)
+    starts = np.array([start for start, _ in TERM_PARTS])[part]
+    ends = np.array([end for _, end in TERM_PARTS])[part]
+    start_minute = rng.integers(16, 41, size=rows) * 30
+    end_minute = start_minute + rng.choice([50, 75, 110, 170], size=rows)
+    on_campus = pd.Series(
+        np.char.ljust(np.array(BUILDINGS)[rng.integers(0, len(BUILDINGS), size=rows)], 5))
+    on_campus += np.char.ljust(rng.integers(100, 400, size=rows).astype(str), 9)
+    on_campus += np.char.ljust(_weighted(rng, MEETING_TYPES, rows), 5)
+    on_campus += np.char.ljust(np.array(DAYS)[rng.integers(0, len(DAYS), size=rows)], 10)
+    on_campus += np.char.ljust(_clock(start_minute), 8) + np.char.ljust(_clock(end_minute), 7)
+    placed = on_campus.where(~online, 'DED  INET     CLAS MTWTHFSSU TBA' + ' ' * 12)
+    meeting_times = pd.Series(starts) + ' ' + pd.Series(ends) + ' ' + placed
+    meeting_times[rng.random(rows) < NO_MEETING_SHARE] = np.nan
+
+    csar = pd.DataFrame({
+        'Term': '2025SP',
+        'Sec Name': sec_names[section],
+        'X Sec Delivery Method': method,
+        'Meeting Times': meeting_times,
+        'Capacity': capacity[section],
+        'FTE Count': enrolled[section],
+        'Sec Allow Waitlist Flag': waitlist[section],
+        'Total FTE': total_fte[section],
+        'Sec Faculty Info': faculty[section],
+        'Sec All Faculty Last Names': pd.Series(last_names[section]).where(first),
+        'Sec Divisions': pd.Series(
+            prefix_division[course_prefix[course[section]]]).where(first),
+    })
+    csar = csar.sort_values('Sec Name', kind='stable').reset_index(drop=True)
+
+    hours = pd.DataFrame({
+        'Sec Name': course_codes,
+        'FTE Count': np.bincount(course, weights=enrolled, minlength=courses).astype(int),
+        'Total FTE': np.bincount(course, weights=total_fte, minlength=courses).round(3),
+        'Contact Hours': course_hours,
+    })
+    return csar, hours
+
+
+def write_synthetic(directory, scale=1, seed=0, tier_path=tier_table.TIER_FILE):
+    '''
+    Writes a synthetic extract, contact hours workbook and tier table to
+    directory under the names the reports read.
+
+    Returns
+    -------
+    int
+        Rows in the extract.
+    '''
+    os.makedirs(directory, exist_ok=True)
+    prefixes = pd.read_excel(tier_path)['Prefix/Course ID'].dropna().astype(str)
+    prefixes = [prefix for prefix in prefixes if len(prefix) == 3 and prefix.isalpha()]
+    csar, hours = synthetic_csar(scale, seed, prefixes)
+
+    csar_file, hours_file = fn.SOURCE_FILES
+    csar.to_csv(os.path.join(directory, csar_file), index=False)
+    hours.to_excel(os.path.join(directory, hours_file), index=False,
+                   engine='xlsxwriter')
+    shutil.copy(tier_path, os.path.join(directory, tier_table.TIER_FILE))
+    return len(csar)
+
+
+def measure(func, repeat=1):
+    '''
+    Best wall time of repeat runs, and the tracemalloc peak of one more.
+
+    Returns
+    -------
+    tuple
+        (seconds, peak bytes, result of the last run)
+    '''
+    best = math.inf
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            best = min(best, time.perf_counter() - start)
+
+        tracemalloc.start()
+        try:
+            result = func()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    return best, peak, result
+
+
+def stages(sample=10):
+    '''
+    The benchmarked stages, in order. Each takes and returns the shared
+    state dict (sections, meetings, tier, ...).
+
+    Parameters
+    ----------
+    sample : int
+        Courses and faculty members run through their reports.
+
+    Returns
+    -------
+    list[tuple]
+        (stage name, function)
+    '''
+    def readfile(state):
+        state['sections'], state['meetings'] = fn.read_tables(rebuild_cache=True)
+        return len(state['sections'])
+
+    def readfile_snapshot(state):
+        return len(fn.read_tables()[0])
+
+    def generate_fte(state):
+        return len(option4.generate_fte(state['sections'].copy(), tier_table.load()))
+
+    def division_fte(state):
+        divisions = sorted(state['sections']['Sec Divisions'].dropna().unique())
+        fn.division_fte_workbook(state['sections'], divisions, 'all_divisions_fte.xlsx')
+        return len(divisions)
+
+    def fte_per_course(state):
+        codes = state['sections']['Course Code'].value_counts().index[:sample]
+        courses = CourseIndex.from_frame(state['sections'])
+        for code in codes:
+            fn.course_fte_report(state['sections'], code, courses=courses)
+        return len(codes)
+
+    def fte_per_faculty(state):
+        names = state['sections']['Sec Faculty Info'].value_counts().index[:sample]
+        tier = tier_table.load()
+        for name in names:
+            option4.faculty_fte_report(state['sections'], name, tier)
+        return len(names)
+
+    def export_divisions(state):
+        divisions = sorted(state['sections']['Sec Divisions'].dropna().unique())
+        return len(fn.export_divisions(state['sections'], divisions))
+
+    return [('readfile', readfile),
+            ('readfile (snapshot)', readfile_snapshot),
+            ('generate_fte', generate_fte),
+            ('division_fte', division_fte),
+            ('fte_per_course', fte_per_course),
+            ('fte_per_faculty', fte_per_faculty),
+            ('export_divisions', export_divisions)]
+
+
+def run_benchmarks(scales=(10, 100), seed=0, repeat=1, workdir=None, sample=10):
+    '''
+    Runs every stage on a synthetic extract of each scale.
+
+    Parameters
+    ----------
+    scales : list[float]
+        Multiples of the real extract's size.
+    seed : int
+        Seed for synthetic_csar.
+    repeat : int
+        Timed runs per stage; the best one counts.
+    workdir : str
+        Where the synthetic files and reports go (default is a temporary
+        directory, removed afterwards).
+    sample : int
+        Courses and faculty members per report stage.
+
+    Returns
+    -------
+    dataframe
+        Scale, Rows, Stage, Seconds and Peak MB for every stage.
+    '''
+    tier_path = os.path.abspath(tier_table.TIER_FILE)
+    home = os.getcwd()
+    temporary = tempfile.TemporaryDirectory() if workdir is None else None
+    root = temporary.name if temporary else os.path.abspath(workdir)
+
+    results = []
+    try:
+        for scale in scales:
+            directory = os.path.join(root, f"scale_{scale}")
+            start = time.perf_counter()
+            rows = write_synthetic(directory, scale, seed, tier_path)
+            print(f"\nScale {scale}: {rows:,} rows generated in "
+                  f"{time.perf_counter() - start:.1f}s")
+
+            # the reports read and write relative to the working directory
+            os.chdir(directory)
+            state = {}
+            for stage, func in stages(sample):
+                seconds, peak, _ = measure(lambda: func(state), repeat)
+                results.append({'Scale': scale, 'Rows': rows, 'Stage': stage,
+                                'Seconds': round(seconds, 4),
+                                'Peak MB': round(peak / 2 ** 20, 2)})
+                print(f"  {stage:<20} {seconds:9.3f}s {peak / 2 ** 20:10.1f} MB")
+            os.chdir(home)
+    finally:
+        os.chdir(home)
+        if temporary:
+            temporary.cleanup()
+
+    return pd.DataFrame(results)
+
+
+def load_baseline(path=BASELINE_FILE):
+    '''
+    Stored results, an empty frame if there are none.
+    '''
+    try:
+        with open(path) as file:
+            return pd.DataFrame(json.load(file)['results'])
+    except (OSError, ValueError, KeyError):
+        return pd.DataFrame(columns=['Scale', 'Stage', 'Seconds', 'Peak MB'])
+
+
+def save_baseline(results, path=BASELINE_FILE):
+    '''
+    Stores results as the baseline, with the versions they were run on.
+    '''
+    baseline = {
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'machine': platform.machine(),
+        'results': results.to_dict(orient='records'),
+    }
+    with open(path, 'w') as file:
+        json.dump(baseline, file, indent=1)
+    print(f"Baseline saved to {path}")
+
+
+def compare(results, baseline):
+    '''
+    Adds the baseline figures and a Regression flag to the results.
+
+    Returns
+    -------
+    dataframe
+    '''
+    old = baseline[['Scale', 'Stage', 'Seconds', 'Peak MB']].rename(
+        columns={'Seconds': 'Baseline Seconds', 'Peak MB': 'Baseline MB'})
+    report = results.merge(old, on=['Scale', 'Stage'], how='left')
+    report['Change'] = (report['Seconds'] / report['Baseline Seconds']).round(2)
+    report['Regression'] = ((report['Change'] > TOLERANCE)
+                            & (report['Seconds'] > MIN_SECONDS))
+    return report
+
+
+def main(argv=None):
+    '''
+    Command line entry point; returns 1 if any stage regressed.
+    '''
+    parser = argparse.ArgumentParser(description="Benchmark the report stages "
+                                                 "on synthetic CSAR extracts.")
+    parser.add_argument('--scales', default='10,100',
+                        help="multiples of the real extract, e.g. 10,100,1000")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=1,
+                        help="timed runs per stage, the best counts")
+    parser.add_argument('--sample', type=int, default=10,
+                        help="courses and instructors per report stage")
+    parser.add_argument('--workdir', help="keep the synthetic files here")
+    parser.add_argument('--baseline', default=BASELINE_FILE)
+    parser.add_argument('--save-baseline', action='store_true',
+                        help="store these results as the new baseline")
+    args = parser.parse_args(argv)
+
+    scales = [float(scale) if '.' in scale else int(scale)
+              for scale in args.scales.split(',') if scale.strip()]
+    results = run_benchmarks(scales, args.seed, args.repeat, args.workdir, args.sample)
+
+    report = compare(results, load_baseline(args.baseline))
+    print()
+    print(report.to_string(index=False))
+
+    if args.save_baseline:
+        save_baseline(results, args.baseline)
+        return 0
+    regressions = report[report['Regression']]
+    if len(regressions):
+        print(f"\n{len(regressions)} stage(s) more than {TOLERANCE}x slower "
+              f"than the baseline")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
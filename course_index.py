@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+"""
+Course index over the "Sec Name" column, built once per frame.
+
+Holds the Course Code of every row as a categorical with the row
+positions of each code grouped together, the sorted unique codes for
+prefix matching, and the upper-cased section names in sorted order.
+Exact and prefix lookups are a binary search plus the matching rows,
+O(log n + k), instead of a regex scan of the whole column per query.
+"""
+import numpy as np
+import pandas as pd
+
+
+# Course code at the start of a section name, as in functions.merge_sources
+COURSE_CODE_PATTERN = r"([A-Z]{3}-\d{3})"
+
+# Sorts after every character a section name can hold
+_HIGHEST = '\U0010ffff'
+
+
+def _prefix_range(sorted_values, prefix):
+    '''
+    Start and stop of the values beginning with prefix in a sorted array.
+    '''
+    start = np.searchsorted(sorted_values, prefix, side='left')
+    stop = np.searchsorted(sorted_values, prefix + _HIGHEST, side='left')
+    return start, stop
+
+
+class CourseIndex:
+    '''
+    Row positions of every course and section of a frame.
+
+    Parameters
+    ----------
+    sec_names : array-like
+        The frame's "Sec Name" column.
+    course_codes : array-like
+        The frame's "Course Code" column (extracted from sec_names when
+        not given).
+    '''
+
+    def __init__(self, sec_names, course_codes=None):
+        names = pd.Series(sec_names, dtype=object).fillna('').astype(str)
+        if course_codes is None:
+            course_codes = names.str.extract(COURSE_CODE_PATTERN)[0]
+
+        self.course_codes = pd.Categorical(pd.Series(course_codes, dtype=object))
+        self.codes = self.course_codes.categories.to_numpy(dtype=str)
+
+        # rows of each code next to each other, in frame order within a code
+        row_codes = self.course_codes.codes
+        listed = np.flatnonzero(row_codes >= 0)
+        self._code_rows = listed[np.argsort(row_codes[listed], kind='stable')]
+        counts = np.bincount(row_codes[listed], minlength=len(self.codes))
+        self._code_starts = np.concatenate([[0], np.cumsum(counts)])
+
+        self.names = names.str.upper().to_numpy(dtype=str)
+        self._name_order = np.argsort(self.names, kind='stable')
+        self._sorted_names = self.names[self._name_order]
+
+    @classmethod
+    def from_frame(cls, data):
+        '''
+        Builds the index for a frame with a "Sec Name" column (and
+        "Course Code" if it has one).
+
+        Parameters
+        ----------
+        data : dataframe
+
+        Returns
+        -------
+        CourseIndex
+        '''
+        codes = data['Course Code'] if 'Course Code' in data.columns else None
+        return cls(data['Sec Name'], codes)
+
+    def __len__(self):
+        return len(self.names)
+
+    def rows(self, code):
+        '''
+        Row positions of one course code, e.g. "ACA-120".
+
+        Parameters
+        ----------
+        code : str
+
+        Returns
+        -------
+        np.ndarray
+            Positions (for DataFrame.iloc) in frame order, empty if the
+            code is not in the frame.
+        '''
+        code = str(code).strip().upper()
+        pos = np.searchsorted(self.codes, code)
+        if pos == len(self.codes) or self.codes[pos] != code:
+            return np.zeros(0, dtype=np.intp)
+        return self._code_rows[self._code_starts[pos]:self._code_starts[pos + 1]]
+
+    def codes_with_prefix(self, prefix):
+        '''
+        Course codes starting with prefix, e.g. "ACA-1".
+
+        Parameters
+        ----------
+        prefix : str
+
+        Returns
+        -------
+        np.ndarray
+            Matching codes in sorted order.
+        '''
+        start, stop = _prefix_range(self.codes, str(prefix).strip().upper())
+        return self.codes[start:stop]
+
+    def prefix_rows(self, prefix):
+        '''
+        Row positions of the sections whose name starts with prefix
+        ("ACA", "ACA-120", "ACA-120-1001", ...), case-insensitive.
+
+        Parameters
+        ----------
+        prefix : str
+
+        Returns
+        -------
+        np.ndarray
+            Positions in frame order.
+        '''
+        prefix = str(prefix).strip().upper()
+        if not prefix:
+            return np.zeros(0, dtype=np.intp)
+        start, stop = _prefix_range(self._sorted_names, prefix)
+        return np.sort(self._name_order[start:stop])
+
+    def search(self, text):
+        '''
+        Row positions for what a user typed: section names starting with
+        it, or failing that, containing it anywhere (a plain text scan,
+        not a regex).
+
+        Parameters
+        ----------
+        text : str
+
+        Returns
+        -------
+        np.ndarray
+            Positions in frame order.
+        '''
+        rows = self.prefix_rows(text)
+        text = str(text).strip().upper()
+        if len(rows) or not text:
+            return rows
+        return np.flatnonzero(np.char.find(self.names, text) >= 0)
@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+"""
+Session-scoped store for the CSAR Sections and Meetings tables.
+
+Loads deanDailyCsar.csv and unique_deansDailyCsar_FTE.xlsx once through
+functions.read_tables() and only reloads them when one of the source
+files changes on disk (modification time or size).
+"""
+import os
+import functions as fn
+from faculty_index import FacultyIndex
+from course_index import CourseIndex
+
+
+class DataStore:
+    '''
+    Holds the Sections and Meetings tables for the length of a session.
+
+    Parameters
+    ----------
+    sources : tuple[str]
+        Paths of the files the tables are built from (default is
+        functions.SOURCE_FILES, the files read_tables loads).
+    loader : callable
+        Function that returns the (sections, meetings) tables (default
+        is functions.read_tables).
+    '''
+
+    def __init__(self, sources=fn.SOURCE_FILES, loader=fn.read_tables):
+        self.sources = tuple(sources)
+        self.loader = loader
+        self._tables = None
+        self._signature = None
+        self._faculty = None
+        self._courses = None
+
+    def signature(self):
+        '''
+        Builds the (path, mtime, size) fingerprint of the source files.
+
+        Returns
+        -------
+        tuple or None
+            Fingerprint of every source file, or None if one is missing.
+        '''
+        stamps = []
+        for path in self.sources:
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                return None
+            stamps.append((path, stat.st_mtime_ns, stat.st_size))
+        return tuple(stamps)
+
+    def is_stale(self):
+        '''
+        Checks whether the loaded tables no longer match the files.
+
+        Returns
+        -------
+        bool
+            True if nothing is loaded yet or a source file has changed.
+        '''
+        return self._tables is None or self.signature() != self._signature
+
+    def reload(self, **kwargs):
+        '''
+        Rebuilds the tables from the source files.
+
+        Parameters
+        ----------
+        **kwargs
+            Passed on to the loader (e.g. rebuild_cache=True).
+
+        Returns
+        -------
+        tuple
+            (sections, meetings), empty lists if a file is missing,
+            matching functions.read_tables.
+        '''
+        signature = self.signature()
+        tables = self.loader(**kwargs)
+        self._faculty = None
+        self._courses = None
+
+        # only remember a successful load so a missing file is retried
+        if signature is not None and len(tables[0]) > 0:
+            self._tables = tables
+            self._signature = signature
+        else:
+            self._tables = None
+            self._signature = None
+        return tables
+
+    def tables(self):
+        '''
+        The (sections, meetings) tables, reloaded first if the source
+        files changed.
+        '''
+        if self.is_stale():
+            return self.reload()
+        return self._tables
+
+    @property
+    def sections(self):
+        '''
+        One row per section; what every report works on.
+        '''
+        return self.tables()[0]
+
+    @property
+    def meetings(self):
+        '''
+        One row per meeting, keyed by "Sec Name".
+        '''
+        return self.tables()[1]
+
+    @property
+    def faculty(self):
+        '''
+        FacultyIndex of the sections' "Sec Faculty Info", built once per
+        load (None while the files are missing).
+        '''
+        sections = self.sections
+        if self._faculty is None and len(sections) > 0:
+            self._faculty = FacultyIndex.from_frame(sections)
+        return self._faculty
+
+    @property
+    def courses(self):
+        '''
+        CourseIndex of the sections' "Sec Name", built once per load
+        (None while the files are missing).
+        '''
+        sections = self.sections
+        if self._courses is None and len(sections) > 0:
+            self._courses = CourseIndex.from_frame(sections)
+        return self._courses
+
+    # the name the menu code has always used for the report data
+    frame = sections
@@ -0,0 +1,286 @@
+# -*- coding: utf-8 -*-
+"""
+Faculty name index built once from the "Sec Faculty Info" values.
+
+Holds the normalized names (no periods, lower case), inverted maps
+from last name and first initial to the original names, and a sorted
+list of name keys so prefix searches are a binary search with bisect
+instead of a scan over every name.
+
+Mistyped names ("Hogsten Utly", "Peniston") are matched through a
+character-trigram inverted index: only names sharing enough trigrams
+with the query are compared with a bounded edit distance.
+"""
+from bisect import bisect_left
+from collections import Counter, defaultdict
+
+
+def normalize(name):
+    '''
+    Normalizes a name for searching: periods and commas become spaces,
+    lower case, single spaces.
+
+    Parameters
+    ----------
+    name : str
+
+    Returns
+    -------
+    str
+    '''
+    return ' '.join(name.replace('.', ' ').replace(',', ' ').lower().split())
+
+
+def trigrams(word):
+    '''
+    Character trigrams of a word padded with spaces, so the start and
+    end of the word count as well ("fann" -> "  f", " fa", "fan", ...).
+
+    Parameters
+    ----------
+    word : str
+
+    Returns
+    -------
+    list[str]
+    '''
+    padded = f"  {word} "
+    return [padded[i:i + 3] for i in range(len(padded) - 2)]
+
+
+def bounded_distance(first, second, bound):
+    '''
+    Edit distance between two strings, counting a swap of two neighbouring
+    letters ("Frnech") as one edit, and giving up as soon as it must be
+    larger than bound.
+
+    Parameters
+    ----------
+    first, second : str
+    bound : int
+        Largest distance of interest.
+
+    Returns
+    -------
+    int
+        The distance, or bound + 1 when it is larger than bound.
+    '''
+    if abs(len(first) - len(second)) > bound:
+        return bound + 1
+
+    before = None
+    previous = list(range(len(second) + 1))
+    for i, char in enumerate(first, 1):
+        current = [i]
+        for j, other in enumerate(second, 1):
+            cost = min(previous[j] + 1, current[j - 1] + 1,
+                       previous[j - 1] + (char != other))
+            if (before is not None and j > 1 and char == second[j - 2]
+                    and first[i - 2] == other):
+                cost = min(cost, before[j - 2] + 1)
+            current.append(cost)
+        if min(current) > bound:
+            return bound + 1
+        before, previous = previous, current
+    return min(previous[-1], bound + 1)
+
+
+class FacultyIndex:
+    '''
+    Search structures for a list of faculty names.
+
+    Parameters
+    ----------
+    names : iterable[str]
+        Faculty names as they appear in the data, e.g. "K. Hogsten Utley".
+        Missing values and duplicates are dropped.
+    '''
+
+    def __init__(self, names):
+        self.names = sorted({str(name) for name in names
+                             if isinstance(name, str) and name.strip()})
+        self.normalized = [normalize(name) for name in self.names]
+
+        self.by_name = defaultdict(list)
+        self.by_last = defaultdict(list)
+        self.by_initial = defaultdict(list)
+        self._words = []
+        self._grams = defaultdict(set)
+        keys = []
+        for number, (name, norm) in enumerate(zip(self.names, self.normalized)):
+            words = norm.split()
+            self._words.append(words)
+            for word in words:
+                for gram in trigrams(word):
+                    self._grams[gram].add(number)
+            self.by_name[norm].append(name)
+            if words:
+                self.by_initial[words[0][0]].append(name)
+            # every word after the first name/initial can be the last name
+            for word in words[1:]:
+                self.by_last[word].append(name)
+            # "k hogsten utley", "hogsten utley" and "utley" all point here
+            for start in range(len(words)):
+                keys.append((' '.join(words[start:]), name))
+
+        keys.sort()
+        self._keys = [key for key, _ in keys]
+        self._key_names = [name for _, name in keys]
+
+    @classmethod
+    def from_frame(cls, data, column='Sec Faculty Info'):
+        '''
+        Builds the index from a column of the Sections table.
+
+        Parameters
+        ----------
+        data : dataframe
+        column : str
+            Column holding the faculty names (default is
+            'Sec Faculty Info').
+
+        Returns
+        -------
+        FacultyIndex
+        '''
+        return cls(data[column].dropna().unique())
+
+    def __len__(self):
+        return len(self.names)
+
+    def __iter__(self):
+        return iter(self.names)
+
+    def prefix(self, text):
+        '''
+        Names with a word sequence starting with text, e.g. "hog" or
+        "k hog" both find "K. Hogsten Utley".
+
+        Parameters
+        ----------
+        text : str
+
+        Returns
+        -------
+        list[str]
+            Matching names in alphabetical order.
+        '''
+        key = normalize(text)
+        if not key:
+            return []
+        found = set()
+        pos = bisect_left(self._keys, key)
+        while pos < len(self._keys) and self._keys[pos].startswith(key):
+            found.add(self._key_names[pos])
+            pos += 1
+        return sorted(found)
+
+    def fuzzy(self, text, limit=10, max_distance=None):
+        '''
+        Names close to a possibly misspelled query, best first.
+
+        The query is compared with every run of the same number of words
+        in a name, so "hogsten utly" matches "K. Hogsten Utley" at
+        distance 1. Only names sharing enough trigrams with the query to
+        be within max_distance edits are compared.
+
+        Parameters
+        ----------
+        text : str
+        limit : int
+            Most candidates to return (default is 10).
+        max_distance : int
+            Largest edit distance accepted (default is 1, or 2 for
+            queries of 8 or more letters).
+
+        Returns
+        -------
+        list[tuple[str, int]]
+            (name, edit distance) sorted by distance, then name.
+        '''
+        query = normalize(text)
+        words = query.split()
+        if not words:
+            return []
+        if max_distance is None:
+            max_distance = 2 if len(query.replace(' ', '')) >= 8 else 1
+
+        grams = [gram for word in words for gram in trigrams(word)]
+        shared = Counter()
+        for gram in set(grams):
+            shared.update(self._grams.get(gram, ()))
+
+        # an edit changes at most 3 trigrams and a swap at most 4, so a
+        # match within max_distance shares at least this many (q-gram lemma)
+        needed = max(1, len(grams) - 4 * max_distance)
+
+        ranked = []
+        for number, count in shared.items():
+            if count < needed:
+                continue
+            name_words = self._words[number]
+            size = min(len(words), len(name_words))
+            best = max_distance + 1
+            for start in range(len(name_words) - size + 1):
+                window = ' '.join(name_words[start:start + size])
+                best = min(best, bounded_distance(query, window, max_distance))
+            if best <= max_distance:
+                # single instructors before co-taught lists at equal distance
+                ranked.append((best, len(name_words), self.names[number]))
+
+        ranked.sort()
+        return [(name, distance) for distance, _, name in ranked[:limit]]
+
+    def search(self, text):
+        '''
+        Names matching what a user typed: word prefixes first, then any
+        name containing the text, then names within a few typos.
+
+        Parameters
+        ----------
+        text : str
+
+        Returns
+        -------
+        list[str]
+        '''
+        matches = self.prefix(text)
+        if matches:
+            return matches
+        key = normalize(text)
+        if not key:
+            return []
+        matches = [name for name, norm in zip(self.names, self.normalized)
+                   if key in norm]
+        if matches:
+            return matches
+        return [name for name, _ in self.fuzzy(text)]
+
+    def find(self, text):
+        '''
+        Exact name, then last name, then a typo-tolerant match, then
+        first initial (the order option4.find_faculty has always used,
+        with the fuzzy step before the first-initial fallback).
+
+        Parameters
+        ----------
+        text : str
+
+        Returns
+        -------
+        list[str] or None
+            All matches at the first level that has any, None if none.
+        '''
+        words = normalize(text).split()
+        if not words:
+            return None
+
+        name = self.by_name.get(' '.join(words))
+        if not name:
+            # "Karen Hogsten Utley" or just "Utley" look up the last word
+            name = self.by_last.get(words[-1])
+        if not name:
+            name = [match for match, _ in self.fuzzy(text)]
+        if not name:
+            name = self.by_initial.get(words[0][0])
+        return list(name) if name else None
@@ -0,0 +1,338 @@
+# -*- coding: utf-8 -*-
+"""
+Columnar Generated FTE calculations shared by the division and course
+reports in functions.py and web_functions.py.
+
+Generated FTE = Total FTE * (tier funding for the course prefix + support)
+
+Everything is computed on whole columns at once; the report functions only
+decide which columns to show and how to format them.
+"""
+import numpy as np
+import pandas as pd
+from tier_table import as_tier_table
+
+
+# Division, delivery method or tier of sections that have none
+UNLISTED = 'Unlisted'
+
+# What the college FTE dashboard breaks Generated FTE down by
+CUBE_DIMENSIONS = ['Sec Divisions', 'X Sec Delivery Method', 'Tier']
+
+
+def compute_fte(frame, fte_tier, base_fte=None):
+    '''
+    Calculates FTE columns for every row of a slice of the CSAR data.
+
+    Adds these columns to a copy of the frame:
+        Section FTE      - Total FTE as a number, 0 when missing
+        Funding          - tier funding for the course prefix
+        Generated FTE    - Section FTE * (Funding + base_fte)
+        Enrollment Ratio - FTE Count / Capacity * 100, NaN when the
+                           capacity is missing or not positive
+
+    Parameters
+    ----------
+    frame : dataframe
+        Rows to calculate FTE for.
+    fte_tier : TierTable or dataframe
+        Tier funding table (tier_table.load()) or FTE_Tier.xlsx contents.
+    base_fte : int
+        Institutional and academic support value (default is the
+        tier table's support, 1926).
+
+    Returns
+    -------
+    dataframe
+        Copy of the frame with the FTE columns added.
+    '''
+    data = frame.copy()
+    tier = as_tier_table(fte_tier)
+    if base_fte is None:
+        base_fte = tier.support
+
+    # tier funding for the first 3 characters of the section name
+    funding = tier.funding_for(data['Sec Name'].str[:3])
+
+    section_fte = pd.to_numeric(data['Total FTE'], errors='coerce')
+    section_fte = section_fte.fillna(0).astype(float)
+
+    capacity = pd.to_numeric(data['Capacity'], errors='coerce')
+    count = pd.to_numeric(data['FTE Count'], errors='coerce')
+    valid = (capacity > 0) & count.notna()
+
+    data['Section FTE'] = section_fte
+    data['Funding'] = funding
+    data['Generated FTE'] = section_fte * (funding + base_fte)
+    data['Enrollment Ratio'] = ((count / capacity) * 100).where(valid)
+    return data
+
+
+def format_ratio(ratio, template="{:.2f}%"):
+    '''
+    Formats enrollment ratios rounded to 2 places, blank when missing.
+
+    Parameters
+    ----------
+    ratio : pd.Series
+        Enrollment Ratio column from compute_fte.
+    template : str
+        Format string applied to the rounded value (default "{:.2f}%").
+
+    Returns
+    -------
+    pd.Series
+        Formatted strings.
+    '''
+    return ratio.map(lambda x: '' if pd.isna(x) else template.format(round(x, 2)))
+
+
+def running_total(values):
+    '''
+    Adds values left to right, the same order the reports have always
+    accumulated their totals in. (pandas' sum can differ in the last
+    bit, which is enough to flip a total like 562.215 when rounded.)
+
+    Parameters
+    ----------
+    values : array-like
+        Numbers to add.
+
+    Returns
+    -------
+    float
+        The total, 0 when there are no values.
+    '''
+    values = np.asarray(values, dtype=float)
+    if len(values) == 0:
+        return 0
+    return float(np.cumsum(values)[-1])
+
+
+def group_totals(per_section, column, keys=None):
+    '''
+    Sections, Total FTE and Generated FTE of every course, division or
+    instructor, added left to right like the reports do.
+
+    Parameters
+    ----------
+    per_section : dataframe
+        One row per section with "Section FTE" and "Generated FTE" (see
+        compute_fte).
+    column : str
+        Column to group by, e.g. "Course Code" or "Sec Divisions".
+    keys : collection
+        Only total these keys (default is None, all of them).
+
+    Returns
+    -------
+    dataframe
+        "Sections", "Total FTE" and "Generated FTE", indexed by key.
+    '''
+    rows = per_section.dropna(subset=[column])
+    if keys is not None:
+        rows = rows[rows[column].isin(keys)]
+    groups = rows.groupby(column, sort=True, observed=True)
+    return pd.DataFrame({
+        'Sections': groups.size(),
+        'Total FTE': groups['Section FTE'].agg(running_total),
+        'Generated FTE': groups['Generated FTE'].agg(running_total),
+    })
+
+
+def cube_sections(sections, fte_tier, base_fte=None):
+    '''
+    Every section with its FTE (see compute_fte) and the dashboard's
+    dimensions, in the order the division reports list them, so totals
+    of its rows add up the same as the reports'.
+
+    Parameters
+    ----------
+    sections : dataframe
+        One row per section; a section listed twice (same "Term" and
+        "Sec Name") is counted once.
+    fte_tier : TierTable or dataframe
+        Tier funding table.
+    base_fte : int
+        Institutional and academic support value (default is the tier
+        table's support).
+
+    Returns
+    -------
+    dataframe
+        compute_fte's rows with "Sec Divisions", "X Sec Delivery Method"
+        and "Tier" (missing values reported as UNLISTED), the "Course
+        Code" of the Sec Name and "Sections", 1 on every row.
+    '''
+    keys = [col for col in ['Term', 'Sec Name'] if col in sections.columns]
+    data = compute_fte(sections.drop_duplicates(subset=keys), fte_tier, base_fte)
+    tier = as_tier_table(fte_tier)
+
+    dimensions = pd.DataFrame({
+        'Sec Divisions': data['Sec Divisions'].astype(object),
+        'X Sec Delivery Method': data['X Sec Delivery Method'].astype(object),
+        'Tier': tier.tier_for(data['Sec Name'].fillna('').str[:3]),
+    }, index=data.index).replace('', np.nan).fillna(UNLISTED)
+
+    data = data.assign(**{col: dimensions[col] for col in CUBE_DIMENSIONS},
+                       Sections=1)
+    # course code and order as the division reports have them
+    data['Course Code'] = data['Sec Name'].str.extract(r'([A-Z]+-\d+)')[0]
+    return data.sort_values(['Sec Divisions', 'Course Code', 'Sec Name'])
+
+
+def fte_cube(labelled):
+    '''
+    Sections, Total FTE and Generated FTE of every division, delivery
+    method and funding tier combination, added left to right like the
+    reports do.
+
+    Parameters
+    ----------
+    labelled : dataframe
+        Output of cube_sections.
+
+    Returns
+    -------
+    dataframe
+        "Sec Divisions", "X Sec Delivery Method", "Tier", "Sections",
+        "Total FTE" and "Generated FTE", one row per combination that
+        has sections.
+    '''
+    groups = labelled.groupby(CUBE_DIMENSIONS, sort=True)
+    cube = pd.DataFrame({
+        'Sections': groups.size(),
+        'Total FTE': groups['Section FTE'].agg(running_total),
+        'Generated FTE': groups['Generated FTE'].agg(running_total),
+    })
+    return cube.reset_index()
+
+
+def division_totals(labelled, value):
+    '''
+    Total FTE or Generated FTE of every division, added up the way its
+    division report does: Total FTE section by section, Generated FTE
+    course subtotal by course subtotal.
+
+    Parameters
+    ----------
+    labelled : dataframe
+        Output of cube_sections, or some of its rows.
+    value : str
+        "Total FTE" or "Generated FTE".
+
+    Returns
+    -------
+    pd.Series
+        The total of each "Sec Divisions".
+    '''
+    if value == 'Total FTE':
+        return labelled.groupby('Sec Divisions', sort=True)['Section FTE'].agg(
+            running_total)
+
+    divisions = labelled['Sec Divisions']
+    starts = course_starts(labelled['Course Code']) | course_starts(divisions)
+    subtotals = labelled['Generated FTE'].groupby(np.cumsum(starts)).agg(running_total)
+    return subtotals.groupby(divisions.to_numpy()[starts], sort=True).agg(running_total)
+
+
+def pivot_cube(labelled, columns, value='Generated FTE', rows='Sec Divisions'):
+    '''
+    Spreads the dashboard over two of its dimensions, with a TOTAL row and
+    column. FTE is added left to right over the sections; a division's
+    TOTAL is the one its report shows (see division_totals) and the
+    college TOTAL adds those up like the College Summary.
+
+    Parameters
+    ----------
+    labelled : dataframe
+        Output of cube_sections, or some of its rows.
+    columns : str
+        Dimension across the top, e.g. "X Sec Delivery Method" or "Tier".
+    value : str
+        "Sections", "Total FTE" or "Generated FTE" (default).
+    rows : str
+        Dimension down the side (default "Sec Divisions").
+
+    Returns
+    -------
+    dataframe
+        One row per value of rows plus TOTAL, 0 where there are no
+        sections.
+    '''
+    if labelled.empty:
+        return pd.DataFrame()
+    values = 'Section FTE' if value == 'Total FTE' else value
+    aggfunc = 'sum' if value == 'Sections' else running_total
+    pivot = labelled.pivot_table(index=rows, columns=columns, values=values,
+                                 aggfunc=aggfunc, fill_value=0, margins=True,
+                                 margins_name='TOTAL')
+    if value != 'Sections':
+        totals = division_totals(labelled, value)
+        if rows == 'Sec Divisions':
+            pivot.loc[totals.index, 'TOTAL'] = totals
+        pivot.loc['TOTAL', 'TOTAL'] = running_total(totals)
+    return pivot
+
+
+def course_starts(courses):
+    '''
+    Flags the first row of every run of the same course.
+
+    Parameters
+    ----------
+    courses : pd.Series
+        Course code of each row, already sorted by course.
+
+    Returns
+    -------
+    np.ndarray
+        True where a new course begins.
+    '''
+    codes = courses.to_numpy()
+    starts = np.ones(len(codes), dtype=bool)
+    starts[1:] = codes[1:] != codes[:-1]
+    return starts
+
+
+def add_course_totals(rows, courses, generated, label_column='Course Code'):
+    '''
+    Inserts a "Total" row after every course with that course's
+    Generated FTE subtotal.
+
+    Parameters
+    ----------
+    rows : dataframe
+        Report rows, one per section, sorted by course.
+    courses : pd.Series
+        Course code of each row.
+    generated : pd.Series
+        Generated FTE of each row.
+    label_column : str
+        Column that holds "Total" on the subtotal rows
+        (default is 'Course Code').
+
+    Returns
+    -------
+    report : dataframe
+        Section rows with a subtotal row after each course.
+    subtotals : pd.Series
+        Generated FTE total of each course, in report order.
+    '''
+    starts = course_starts(courses)
+    group = np.cumsum(starts) - 1
+    per_course = np.split(generated.to_numpy(dtype=float), np.flatnonzero(starts)[1:])
+    subtotals = pd.Series([running_total(values) for values in per_course])
+
+    totals = pd.DataFrame('', index=range(len(subtotals)), columns=rows.columns)
+    totals[label_column] = 'Total'
+    totals['Generated FTE'] = subtotals.to_numpy()
+
+    # order rows by course, putting each course's total after its sections
+    order_key = np.concatenate([group, subtotals.index.to_numpy()])
+    is_total = np.concatenate([np.zeros(len(rows)), np.ones(len(totals))])
+    report = pd.concat([rows.reset_index(drop=True), totals], ignore_index=True)
+    order = np.lexsort((is_total, order_key))
+    report = report.iloc[order].reset_index(drop=True)
+
+    return report, subtotals
@@ -14,15 +14,23 @@ CSC-221-001
 M7GroupAnBPro
 
 """
+import os
+import time
 import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
 #import re
-#import os
+import numpy as np
 import pandas as pd
 #import xlsxwriter
-from openpyxl import load_workbook
-from openpyxl.styles import Font, Border, Side, PatternFill
-#import openpyxl
-from openpyxl.utils import get_column_letter
+import instrument
+import snapshot
+import schema
+import meeting_times
+import fte_engine
+import tier_table
+from course_index import CourseIndex
+import report_writer
 
 
 def menu():
@@ -42,109 +50,435 @@ def menu():
     print('4) FTE per instructor (for specific Div)')
     print('5) FTE per course (for specific Div)')
     print('6) Exit')
+    print('7) Room utilization and double bookings')
+    print('8) Instructor schedule conflicts and load')
+    print('9) College FTE dashboard (division, delivery method, tier)')
     print("="*44)
 
 
-def readfile():
+SOURCE_FILES = ('deanDailyCsar.csv', 'unique_deansDailyCsar_FTE.xlsx')
+
+# Workbook of the college FTE dashboard (menu option 9)
+DASHBOARD_FILE = 'college_fte_dashboard.xlsx'
+
+
+def contact_hours_lookup(hours):
     '''
-    Generates the dataframe and then sorts it.
+    One Contact Hours value per course code from the contact hours
+    workbook. Codes listed more than once keep their first value.
+
+    Parameters
+    ----------
+    hours : dataframe
+        "Course Code" and "Contact Hours" columns.
+
+    Returns
+    -------
+    lookup : pd.Series
+        Contact Hours (numbers, NaN when unusable) indexed by unique
+        course code.
+    conflicts : dataframe
+        "Course Code" and "Contact Hours" rows of the codes listed with
+        different values, in file order.
+    '''
+    hours = hours.dropna(subset=["Course Code"])
+    values = pd.to_numeric(hours["Contact Hours"], errors='coerce')
+    codes = hours["Course Code"].astype(str)
+
+    # codes listed with more than one value; the same value twice is harmless
+    distinct = pd.DataFrame({"Course Code": codes, "Contact Hours": values}) \
+        .drop_duplicates()
+    conflicting = distinct["Course Code"].duplicated(keep=False)
+    conflicts = distinct[conflicting].reset_index(drop=True)
+
+    first = ~codes.duplicated()
+    lookup = pd.Series(values[first].to_numpy(), index=pd.Index(codes[first].to_numpy()),
+                       name="Contact Hours")
+    return lookup, conflicts
+
+
+def join_contact_hours(file_in, lookup):
+    '''
+    Adds the Contact Hours of every row's course code, as a left join
+    that can never add or drop rows.
+
+    Parameters
+    ----------
+    file_in : dataframe
+        CSAR rows with a "Course Code" column.
+    lookup : pd.Series
+        Output of contact_hours_lookup.
+
+    Returns
+    -------
+    dataframe
+        file_in with "Contact Hours" added, NaN for unlisted codes.
+
+    Raises
+    ------
+    pandas.errors.MergeError
+        If the lookup lists a course code twice (the check
+        merge(validate="many_to_one") makes).
+    '''
+    if not lookup.index.is_unique:
+        raise pd.errors.MergeError(
+            "Contact hours are not unique per course code (many_to_one)")
+
+    # one hash lookup per row: position of its code, -1 when not listed
+    positions = lookup.index.get_indexer(file_in["Course Code"])
+    hours = np.append(lookup.to_numpy(dtype=float), np.nan)[positions]
+
+    joined = file_in.copy()
+    joined["Contact Hours"] = hours
+    return joined
+
+
+@instrument.traced()
+def merge_sources(typed=True, sources=SOURCE_FILES):
+    '''
+    Reads the CSAR and contact hours files, merges them and calculates
+    Total FTE.
+
+    Parameters
+    ----------
+    typed : bool
+        Read with the compact column types from schema.py (default is
+        True). False gives pandas' default types, for comparison.
+    sources : tuple[str]
+        The CSAR extract and the contact hours workbook (default is
+        SOURCE_FILES).
 
     Returns
     -------
     groups : dataframe
-        the sorted dataframe of the file.
+        the merged dataframe sorted by division, section and faculty.
+
+    '''
+    # reads the deansDailyCsar.csv and unique_deansDailyCsar_FTE files in to a dataframe
+    csar_file, hours_file = sources
+    with instrument.span('read_csv') as stage:
+        if typed:
+            file_in = pd.read_csv(csar_file, dtype=schema.CSAR_DTYPES)
+        else:
+            file_in = pd.read_csv(csar_file)
+        stage.rows_out = len(file_in)
+    with instrument.span('read_excel') as stage:
+        if typed:
+            fte_file_in = pd.read_excel(hours_file,
+                                        usecols=schema.CONTACT_HOURS_COLUMNS)
+        else:
+            fte_file_in = pd.read_excel(hours_file)
+        stage.rows_out = len(fte_file_in)
+
+    # merge prior dataframes
+    # Extract Course Code from Sec Name if not already done
+    if "Course Code" not in file_in.columns:
+        file_in["Course Code"] = file_in["Sec Name"].str.extract(r"([A-Z]{3}-\d{3})")
+
+    # Also create Course Code in credits_df
+    if "Course Code" not in fte_file_in.columns:
+        fte_file_in["Course Code"] = fte_file_in["Sec Name"].str.extract(r"([A-Z]{3}-\d{3})")
+
+    # One Contact Hours per course code, so the join keeps every CSAR row
+    # exactly once even if the workbook lists a course twice
+    lookup, conflicts = contact_hours_lookup(fte_file_in)
+    if len(conflicts):
+        print(f"Warning: {conflicts['Course Code'].nunique()} course code(s) have "
+              f"different Contact Hours in {hours_file}; the first is used: "
+              + ", ".join(conflicts['Course Code'].unique()))
+
+    with instrument.span('merge', rows_in=len(file_in)) as stage:
+        merged_df = join_contact_hours(file_in, lookup)
+        stage.rows_out = len(merged_df)
+
+    merged_df["Contact Hours"] = pd.to_numeric(
+    merged_df["Contact Hours"], errors='coerce')
+    merged_df["FTE Count"] = pd.to_numeric(merged_df["FTE Count"], errors='coerce')
+
+    # Calculate Total FTE
+    merged_df["Total FTE"] = ((merged_df["Contact Hours"] * 16 *\
+                               merged_df["FTE Count"]) / 512).round(3)
+
+    if typed:
+        with instrument.span('apply_schema', rows_in=len(merged_df)):
+            merged_df = schema.apply_schema(merged_df)
+
+    # sorts the dataframe by sec divisions, sec name
+    # and sec faculty info and assigns it to groups
+    groups = merged_df.sort_values(["Sec Divisions", "Sec Name", "Sec Faculty Info"])
+    return groups
+
+
+# Columns that describe a meeting rather than the whole section
+MEETING_COLUMNS = ["Meeting Times"]
+
+
+def memory_report():
+    '''
+    Compares the memory used by the merged CSAR with pandas' default
+    types and with the compact types from schema.py.
+
+    Returns
+    -------
+    dataframe
+        Bytes per column before and after (see schema.memory_report).
+    '''
+    before = merge_sources(typed=False)
+    after = merge_sources()
+    return schema.memory_report(before, after[before.columns])
+
+
+@instrument.traced()
+def split_sections(merged):
+    '''
+    Splits the merged CSAR rows (one per meeting) into a Sections table
+    and a Meetings table.
+
+    The CSAR repeats a section once per meeting (e.g. CLAS and LAB) and
+    only fills "Sec Divisions" on the first of those rows. Sections keeps
+    that first row for each section, with any section-level value that is
+    blank on it taken from the section's other rows. Meetings keeps every
+    meeting, keyed by "Sec Name".
+
+    Parameters
+    ----------
+    merged : dataframe
+        Output of merge_sources.
+
+    Returns
+    -------
+    sections : dataframe
+        One row per section, in the merged sort order.
+    meetings : dataframe
+        "Sec Name", "Meeting" (0, 1, ... within the section) and the
+        meeting columns, one row per meeting.
+    '''
+    # the first row of each section is the one carrying Sec Divisions
+    sections = merged.drop_duplicates(subset="Sec Name", keep="first")
+
+    # fill blank section-level values from the section's other rows
+    section_columns = [col for col in merged.columns
+                       if col not in MEETING_COLUMNS and col != "Sec Name"]
+    filled = merged.groupby("Sec Name", sort=False)[section_columns].first()
+    sections = sections.copy()
+    sections[section_columns] = sections[section_columns].fillna(
+        filled.reindex(sections["Sec Name"]).set_axis(sections.index))
+
+    meetings = merged[["Sec Name"] + MEETING_COLUMNS].sort_values(
+        "Sec Name", kind="stable").reset_index(drop=True)
+    meetings.insert(1, "Meeting",
+                    meetings.groupby("Sec Name").cumcount().astype("int16"))
+
+    return sections, meetings
+
+
+def build_tables(sources=SOURCE_FILES):
+    '''
+    Builds the Sections and Meetings tables from the source files.
+    Meeting Times is parsed into typed columns here, once per load
+    (see meeting_times.parse).
+
+    Parameters
+    ----------
+    sources : tuple[str]
+        The CSAR extract and the contact hours workbook (default is
+        SOURCE_FILES).
 
+    Returns
+    -------
+    dict[str, dataframe]
+        {"sections": ..., "meetings": ...}
+    '''
+    sections, meetings = split_sections(merge_sources(sources=sources))
+    meetings = meeting_times.add_parsed_columns(meetings)
+    return {"sections": sections, "meetings": meetings}
+
+
+@instrument.traced()
+def read_tables(rebuild_cache=False, sources=SOURCE_FILES, name='tables'):
+    '''
+    Loads the Sections and Meetings tables, from the binary snapshot in
+    .csar_cache when the source files have not changed since it was
+    written.
+
+    Parameters
+    ----------
+    rebuild_cache : bool
+        Ignore the snapshot and rebuild it from the source files
+        (default is False).
+    sources : tuple[str]
+        The CSAR extract and the contact hours workbook (default is
+        SOURCE_FILES).
+    name : str
+        Name of the snapshot, one per extract (default is 'tables').
+
+    Returns
+    -------
+    sections : dataframe
+        One row per section (empty list if a file is missing).
+    meetings : dataframe
+        One row per meeting (empty list if a file is missing).
     '''
     try:
-        # reads the deansDailyCsar.csv and unique_deansDailyCsar_FTE files in to a dataframe
-        file_in = pd.read_csv('deanDailyCsar.csv')
-        fte_file_in = pd.read_excel('unique_deansDailyCsar_FTE.xlsx')
-
-        # merge prior dataframes
-        # Extract Course Code from Sec Name if not already done
-        if "Course Code" not in file_in.columns:
-            file_in["Course Code"] = file_in["Sec Name"].str.extract(r"([A-Z]{3}-\d{3})")
-
-        # Also create Course Code in credits_df
-        if "Course Code" not in fte_file_in.columns:
-            fte_file_in["Course Code"] = fte_file_in["Sec Name"].str.extract(r"([A-Z]{3}-\d{3})")
-
-        # Merge only needed columns from credits_df
-        merged_df = pd.merge(
-            file_in,
-            fte_file_in[["Course Code", "Contact Hours"]],
-            how='left',
-            on='Course Code'
-        )
-
-        merged_df["Contact Hours"] = pd.to_numeric(
-        merged_df["Contact Hours"], errors='coerce')
-        merged_df["FTE Count"] = pd.to_numeric(merged_df["FTE Count"], errors='coerce')
-
-        # Calculate Total FTE
-        merged_df["Total FTE"] = ((merged_df["Contact Hours"] * 16 *\
-                                   merged_df["FTE Count"]) / 512).round(3)
-
-
-        # sorts the dataframe by sec divisions, sec name
-        # and sec faculty info and assigns it to groups
-        groups = merged_df.sort_values(["Sec Divisions", "Sec Name", "Sec Faculty Info"])
-        print(groups.head(10))
-        return groups
+        tables = snapshot.load_or_build(sources, lambda: build_tables(sources),
+                                        name=name, rebuild=rebuild_cache)
+        return tables["sections"], tables["meetings"]
 
     except FileNotFoundError:
-        groups = []
         print("File Missing!")
-        return groups
+        return [], []
 
 
-def auto_format_excel(filename):
-    """
-    Auto-formats the column widths of an Excel file to fit the content.
-    
+def readfile(rebuild_cache=False):
+    '''
+    Generates the dataframe and then sorts it.
+    The dataframe has one row per section; see read_tables for the
+    matching Meetings table.
+
+    Parameters
+    ----------
+    rebuild_cache : bool
+        Ignore the snapshot and rebuild it from the source files
+        (default is False).
+
+    Returns
+    -------
+    groups : dataframe
+        the sorted dataframe of the file.
+
+    '''
+    groups = read_tables(rebuild_cache)[0]
+    if len(groups) > 0:
+        print(groups.head(10))
+    return groups
+
+
+def out_path(filename, out_dir=None):
+    '''
+    Puts a report file name in the output directory, if one is given.
+
     Parameters
     ----------
     filename : str
-        The name of the Excel file to format.
-    
+    out_dir : str
+        Directory for the reports (default is None, the current one).
+
     Returns
     -------
-    None.
-    """
-    try:
+    str
+    '''
+    return os.path.join(out_dir, filename) if out_dir else filename
 
 
-        # Load the workbook and select the active sheet
-        wb = load_workbook(filename)
-        ws = wb.active
+def select_codes(text, available):
+    '''
+    Matches codes separated by commas, or ALL, against the available
+    ones, ignoring case.
 
-        # Auto-adjust column widths
-        for column in ws.columns:
-            max_length = 0
-            column_letter = column[0].column_letter
+    Parameters
+    ----------
+    text : str
+        e.g. "CBUS1, cgen" or "ALL".
+    available : list[str]
+        The valid codes.
 
-            for cell in column:
-                try:
-                    if len(str(cell.value)) > max_length:
-                        max_length = len(str(cell.value))
-                except:
-                    pass
+    Returns
+    -------
+    selected : list[str]
+        Matching codes as spelled in available, in the order entered
+        (all of them for ALL).
+    missing : list[str]
+        Entered codes that are not available.
+    '''
+    available = list(available)
+    text = str(text).strip().upper()
+    if text == 'ALL':
+        return available, []
+
+    by_upper = {str(code).upper(): code for code in available}
+    selected, missing = [], []
+    for code in [c.strip() for c in text.split(',') if c.strip()]:
+        if code in by_upper:
+            if by_upper[code] not in selected:
+                selected.append(by_upper[code])
+        else:
+            missing.append(code)
+    return selected, missing
 
-            # Adjust width with a little extra space
-            adjusted_width = max_length + 2
-            ws.column_dimensions[column_letter].width = adjusted_width
 
-        # Save the formatted workbook
-        wb.save(filename)
-        print(f"Formatted {filename} with auto-adjusted column widths")
+def export_division(division, df_name, out_dir=None):
+    '''
+    Writes one division's rows to <division>.xlsx and formats it.
+    Kept at module level so it can run in a worker process.
 
-    except Exception as err:
-        print(f"Error formatting Excel file: {str(err)}")
+    Parameters
+    ----------
+    division : str
+        Division code, used for the file name.
+    df_name : dataframe
+        Rows of that division only.
+    out_dir : str
+        Directory for the file (default is None, the current one).
+
+    Returns
+    -------
+    tuple
+        (division, number of rows, file name, seconds taken)
+    '''
+    start = time.perf_counter()
+
+    # Create Excel filename (lowercase)
+    excel_filename = out_path(f"{division.lower()}.xlsx", out_dir)
+
+    # Write to Excel with the columns sized to fit the content
+    report_writer.write_report(excel_filename, df_name)
+
+    return division, len(df_name), excel_filename, time.perf_counter() - start
+
+
+def export_divisions_parallel(slices, max_workers=None, out_dir=None):
+    '''
+    Exports several divisions at once, one worker process per core.
+
+    Parameters
+    ----------
+    slices : dict[str, dataframe]
+        Rows of each division, keyed by division code.
+    max_workers : int
+        Number of worker processes (default is the number of cores).
+    out_dir : str
+        Directory for the files (default is None, the current one).
+
+    Returns
+    -------
+    list[tuple]
+        export_division results in the order the divisions finished.
+    '''
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    max_workers = max(1, min(max_workers, len(slices)))
+
+    results = []
+    try:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            futures = [pool.submit(export_division, division, df_name, out_dir)
+                       for division, df_name in slices.items()]
+            for future in as_completed(futures):
+                results.append(future.result())
+    except (OSError, BrokenProcessPool) as err:
+        # process pools are not available everywhere, finish serially
+        print(f"Parallel export unavailable ({err}), exporting serially")
+        done = {result[0] for result in results}
+        for division, df_name in slices.items():
+            if division not in done:
+                results.append(export_division(division, df_name, out_dir))
+    return results
 
 
 def sec_divisions(file_in):
     '''
     Allows user to enter sec divisions to search for.
+    ALL exports every division in parallel worker processes.
 
     Parameters
     ----------
@@ -174,67 +508,88 @@ def sec_divisions(file_in):
         sec_input = input("\nEnter Sec Divisions separated by commas or ALL: ")
         sec_input = sec_input.upper().strip()
 
-        if sec_input == 'ALL':  # Check for ALL before splitting
-            divisions_to_process = sec_group
-        else:
-            divisions_to_process = sec_input.split(',')  # Split only if not ALL
-            divisions_to_process = [div.strip() for div in divisions_to_process]
-
         # Validate and process divisions
-        for div in divisions_to_process:
-            if div.upper() not in [d.upper() for d in sec_group]:
-                print(f"\nWarning: Division '{div}' not found")
+        divisions, missing = select_codes(sec_input, sec_group)
+        for div in missing:
+            print(f"\nWarning: Division '{div}' not found")
 
+        export_divisions(file_in, divisions, parallel=sec_input == 'ALL')
 
-        for division in divisions_to_process:
-            if division.upper() in [d.upper() for d in sec_group]:
-                # Extract rows for selected division into a new dataframe
-                # Convert division name to lowercase for dataframe name
-                df_names = division.lower()
-
-                # Filter for the division and remove "Course Code" column if it exists,
-                # ensure "Contact Hours" is included
-                if "Course Code" in file_in.columns:
-                    # Get all columns except "Course Code"
-                    columns_to_keep = [col for col in file_in.columns if col != "Course Code"]
-                    df_name = file_in[file_in['Sec Divisions'] == division][columns_to_keep].copy()
-                else:
-                    df_name = file_in[file_in['Sec Divisions'] == division].copy()
+    except TypeError:
+        print("Missing information from file. Check to be sure the file is not missing.")
+    except Exception as err:
+        print("Error: "+str(err))
 
-                # Check if "Contact Hours" is in the dataframe
-                if "Contact Hours" not in df_name.columns:
-                    print(f"\nWarning: 'Contact Hours' column not found in the data")
 
-                # Create Excel filename (lowercase)
-                excel_filename = f"{division.lower()}.xlsx"
+@instrument.traced(profile=True)
+def export_divisions(file_in, divisions, parallel=False, out_dir=None):
+    '''
+    Writes the rows of each division to <division>.xlsx.
 
-                # Write to Excel
-                df_name.to_excel(excel_filename, index=False)
+    Parameters
+    ----------
+    file_in : dataframe
+        Contains the information for each division.
+    divisions : list[str]
+        Division codes to export.
+    parallel : bool
+        Export in worker processes, one per core (default is False).
+    out_dir : str
+        Directory for the files (default is None, the current one).
 
-                # Auto-format the Excel file columns
-                auto_format_excel(excel_filename)
+    Returns
+    -------
+    list[tuple]
+        export_division results, one per division.
+    '''
+    # Filter for the divisions and remove "Course Code" column if it exists,
+    # ensure "Contact Hours" is included
+    columns_to_keep = [col for col in file_in.columns if col != "Course Code"]
+    selected = file_in[file_in['Sec Divisions'].isin(divisions)][columns_to_keep]
+
+    # Check if "Contact Hours" is in the dataframe
+    if divisions and "Contact Hours" not in selected.columns:
+        print(f"\nWarning: 'Contact Hours' column not found in the data")
+
+    # Extract rows for each selected division into its own dataframe
+    slices = {division: selected[selected['Sec Divisions'] == division].copy()
+              for division in divisions}
+
+    start = time.perf_counter()
+    if parallel and len(slices) > 1:
+        results = export_divisions_parallel(slices, out_dir=out_dir)
+    else:
+        results = [export_division(division, df_name, out_dir)
+                   for division, df_name in slices.items()]
 
-                print(f"\nCreated DataFrame '{df_names}' with {len(df_name)} rows")
-                print(f"Saved to file: {excel_filename}")
+    for division, rows, excel_filename, seconds in results:
+        # Convert division name to lowercase for dataframe name
+        print(f"\nCreated DataFrame '{division.lower()}' with {rows} rows")
+        print(f"Saved to file: {excel_filename} ({seconds:.2f}s)")
 
-    except TypeError:
-        print("Missing information from file. Check to be sure the file is not missing.")
-    except Exception as err:
-        print("Error: "+str(err))
+    if results:
+        print(f"\nExported {len(results)} division(s) in "
+              f"{time.perf_counter() - start:.2f}s")
+    return results
 
 
-def option2_enrollment(df):
+def option2_enrollment(df, courses=None):
     '''
     Parameters
     ----------
     df : dataframe
         file data fram deansDailyCsar.csv
+    courses : CourseIndex
+        Index of df's section names (built from df when not given).
 
     Returns
     -------
     Returns course enrollment percentage
 
     '''
+    if courses is None:
+        courses = CourseIndex.from_frame(df)
+
     course_code = True
 
     while course_code:
@@ -244,21 +599,46 @@ def option2_enrollment(df):
         if course_input.lower() == 'back':
             return
 
-        # Filter rows in 'Sec Name' containing the course code (case insensitive)
-        filtered_df = df[df["Sec Name"].str.contains(course_input, case=False, na=False)]
-
-        if filtered_df.empty:
+        if enrollment_report(df, course_input, courses) is None:
             print("Course not found. Please re-enter the course code or"
                   "type 'back' to return to the main menu.")
         else:
             course_code = False
 
-    # For face-to-face sections, duplicate rows may exist.
-    # Here, we drop duplicate rows based on 'Sec Name'.
-    # This assumes online sections (which contain a '9' in the section number)
-    # are unique or do not duplicate.
-    filtered_df = filtered_df.drop_duplicates(subset="Sec Name")
 
+@instrument.traced(profile=True)
+def enrollment_report(df, course_input, courses=None, out_dir=None):
+    '''
+    Writes the enrollment percentage of every section matching a course
+    code to <code>_per.xlsx.
+
+    Parameters
+    ----------
+    df : dataframe
+        file data fram deansDailyCsar.csv
+    course_input : str
+        Course code or part of a section name, e.g. "ACA-120".
+    courses : CourseIndex
+        Index of df's section names (built from df when not given).
+    out_dir : str
+        Directory for the file (default is None, the current one).
+
+    Returns
+    -------
+    str or None
+        Name of the file written, None if no section matched.
+    '''
+    if courses is None:
+        courses = CourseIndex.from_frame(df)
+
+    # Rows whose 'Sec Name' starts with (or contains) the course code
+    filtered_df = df.iloc[courses.search(course_input)]
+    if filtered_df.empty:
+        return None
+
+    # The data already has one row per section (see split_sections),
+    # so no duplicates need to be dropped here.
+    filtered_df = filtered_df.copy()
 
     # Define a function to calculate enrollment percentage for a row
     def calc_enrollment(row):
@@ -293,48 +673,103 @@ def option2_enrollment(df):
 
     # Determine the file name based on the course code entered
     file_code = course_input.replace("-", "").lower()
-    file_name = f"{file_code}_per.xlsx"
+    file_name = out_path(f"{file_code}_per.xlsx", out_dir)
 
-    # Put output.df into an excel file
-    output_df.to_excel(file_name, index=False)
+    # Columns are 25 wide, "Meeting Times" is made wide enough to fit
+    widths = [25] * len(output_columns)
+    meeting_times = output_df["Meeting Times"].dropna().astype(str)
+    widths[output_columns.index("Meeting Times")] = max(
+        meeting_times.str.len().max() if len(meeting_times) else 0,
+        len("Meeting Times")) + 1
 
-    # Adjust column widths with openpyxl workbook
-    wb = load_workbook(file_name)
-    ws = wb.active
+    # Put output.df into an excel file
+    report_writer.write_report(file_name, output_df, widths=widths)
+    print(f"Created '{file_name}' with enrollment data.")
+    return file_name
 
 
 
-    # Adjust column widths dynamically
-    for column_cells in ws.columns:
-        column_letter = get_column_letter(column_cells[0].column)
-        max_length = 0
-        column_name = column_cells[0].value  # Header value
 
-        for cell in column_cells:
-            try:
-                if cell.value:
-                    cell_length = len(str(cell.value))
-                    if cell_length > max_length:
-                        max_length = cell_length
-            except:
-                pass
-
-        # If column is "Meeting Times", make it extra wide
-        if column_name == "Meeting Times":
-            ws.column_dimensions[column_letter].width = max_length + 1
-        else:
-            ws.column_dimensions[column_letter].width = 25
-    # Save the File
-    wb.save(file_name)
-    print(f"Created '{file_name}' with enrollment data.")
 
+def division_report(div_data, division):
+    '''
+    Builds the FTE by Division report rows for one division.
 
+    Parameters
+    ----------
+    div_data : pandas.DataFrame
+        The division's rows, sorted by Course Code and Sec Name and
+        already passed through fte_engine.compute_fte.
+    division : str
+        Division code shown on the first row.
 
+    Returns
+    -------
+    output_df : pandas.DataFrame
+        Formatted report with course totals and a DIVISION TOTAL row.
+    grand_total_original_fte : float
+        Sum of Total FTE for the division.
+    grand_total_fte : float
+        Sum of Generated FTE for the division.
+    '''
+    new_course = fte_engine.course_starts(div_data['Course Code'])
+
+    # One row per section, division and course code only on their first row
+    section_rows = pd.DataFrame({
+        'Division': '',
+        'Course Code': div_data['Course Code'].where(new_course, ''),
+        'Sec Name': div_data['Sec Name'],
+        'X Sec Delivery Method': div_data['X Sec Delivery Method'],
+        'Meeting Times': div_data['Meeting Times'],
+        'Capacity': div_data['Capacity'],
+        'FTE Count': div_data['FTE Count'],
+        'Sec Faculty Info': div_data['Sec Faculty Info'],
+        'Total FTE': div_data['Total FTE'],
+        'Enrollment Per': fte_engine.format_ratio(div_data['Enrollment Ratio']),
+        'Generated FTE': div_data['Generated FTE']
+    })
+    section_rows.iloc[0, 0] = division
+
+    # Add a Total row after each course
+    output_df, course_totals = fte_engine.add_course_totals(
+        section_rows, div_data['Course Code'], div_data['Generated FTE'])
+
+    # Track grand totals
+    grand_total_fte = fte_engine.running_total(course_totals)
+    grand_total_original_fte = fte_engine.running_total(div_data['Section FTE'])
+
+    # Add grand total row with formatted total
+    output_df.loc[len(output_df)] = {
+        'Division': '',
+        'Course Code': 'DIVISION TOTAL',
+        'Sec Name': '',
+        'X Sec Delivery Method': '',
+        'Meeting Times': '',
+        'Capacity': '',
+        'FTE Count': '',
+        'Sec Faculty Info': '',
+        'Total FTE': float(grand_total_original_fte),  # Ensure it's a float
+        'Enrollment Per': '',
+        'Generated FTE': float(grand_total_fte)  # Ensure it's a float
+    }
+
+    # Format Generated FTE column with '$' before the number
+    # and a comma every 3 digits
+    output_df['Generated FTE'] = output_df['Generated FTE'].map(
+        lambda x: "${:,.2f}".format(x) if isinstance(x, (int, float)) else x)
+
+    # Format Total FTE if it's a number (including the grand total)
+    output_df['Total FTE'] = output_df['Total FTE'].map(
+        lambda x: "{:.2f}".format(x) if isinstance(x, (int, float)) else x)
+
+    return output_df, grand_total_original_fte, grand_total_fte
 
 
 def division_fte(file_in):
     '''
     Analyze FTE by Division and export to a sheet in a division-specific report file.
+    Entering ALL or several codes separated by commas writes every
+    division to its own sheet of one workbook, plus a College Summary.
 
     Parameters
     ----------
@@ -358,7 +793,7 @@ def division_fte(file_in):
         print("  ".join(f"{div}" for div in row))
 
     # Get division code from user
-    div_code = input("\nEnter Division Code: ").strip()
+    div_code = input("\nEnter Division Code, several separated by commas, or ALL: ").strip()
 
     if not div_code:
         print("Please enter a valid division code.")
@@ -366,22 +801,56 @@ def division_fte(file_in):
 
     # Convert to uppercase for case-insensitive comparison
     div_code = div_code.upper()
+    valid_divisions = [div.upper() for div in divisions]
+
+    if div_code == 'ALL':
+        division_fte_workbook(file_in, divisions, "all_divisions_fte.xlsx")
+        return
+
+    if ',' in div_code:
+        # Keep the valid codes (with their correct case), warn about the rest
+        selected, missing = select_codes(div_code, divisions)
+        for code in missing:
+            print(f"Warning: Division '{code}' not found")
+        if not selected:
+            print("No valid division codes entered.")
+            return
+        filename = "_".join(div.lower() for div in selected) + "_fte.xlsx"
+        division_fte_workbook(file_in, selected, filename)
+        return
 
     # Check if division exists (case-insensitive comparison)
-    valid_divisions = [div.upper() for div in divisions]
     if div_code not in valid_divisions:
         print(f"Division '{div_code}' not found. Please check the code and try again.")
         return
 
-    # Read FTE tier data
-    fte_data = pd.read_excel('FTE_Tier.xlsx')
+    # Get the actual division code with correct case
+    division_fte_report(file_in, divisions[valid_divisions.index(div_code)])
 
-    # Create a lookup dictionary for faster access
-    fte_lookup = {row['Prefix/Course ID']: row['New Sector']
-                 for _, row in fte_data.iterrows() if not pd.isna(row['Prefix/Course ID'])}
 
-    # Get the actual division code with correct case
-    actual_div = divisions[valid_divisions.index(div_code)]
+@instrument.traced(profile=True)
+def division_fte_report(file_in, actual_div, out_dir=None):
+    '''
+    Writes the FTE by Division report for one division to
+    <division>_fte.xlsx.
+
+    Parameters
+    ----------
+    file_in : pandas.DataFrame
+        Input DataFrame containing course information.
+    actual_div : str
+        Division code, spelled as in the data.
+    out_dir : str
+        Directory for the file (default is None, the current one).
+
+    Returns
+    -------
+    tuple or None
+        (file name, Total FTE, Generated FTE) of the division, None if
+        it has no data or the report failed.
+    '''
+    # Read FTE tier data
+    fte_data = tier_table.load()
 
     try:
         # Filter data for the selected division
@@ -389,7 +858,7 @@ def division_fte(file_in):
 
         if len(div_data) == 0:
             print("No data found for this division.")
-            return
+            return None
 
         # Add course code column
         div_data['Course Code'] = div_data['Sec Name'].str.extract(r'([A-Z]+-\d+)')
@@ -397,177 +866,18 @@ def division_fte(file_in):
         # Sort by Course Code and Sec Name
         div_data = div_data.sort_values(['Course Code', 'Sec Name'])
 
-        # Base value for FTE calculation
-        base_fte_value = 1926
-
-        # Create output list to store rows
-        output_rows = []
-        current_course = None
-        course_total_fte = 0
-        first_row = True
-
-        # Track grand totals
-        grand_total_fte = 0
-        grand_total_original_fte = 0
-
-        # Process each row
-        for _, row in div_data.iterrows():
-            course = row['Course Code']
-
-            # If new course and not first course, add total for previous course
-            if course != current_course and current_course is not None:
-                output_rows.append({
-                    'Division': '',
-                    'Course Code': 'Total',
-                    'Sec Name': '',
-                    'X Sec Delivery Method': '',
-                    'Meeting Times': '',
-                    'Capacity': '',
-                    'FTE Count': '',
-                    'Sec Faculty Info': '',
-                    'Total FTE': '',
-                    'Enrollment Per': '',
-                    'Generated FTE': course_total_fte
-                })
-
-                # Add to grand total
-                grand_total_fte += course_total_fte
-
-                course_total_fte = 0
-
-            # Get section prefix (first 3 characters of section name)
-            sec = row['Sec Name'][:3] if not pd.isna(row['Sec Name']) else ""
-
-            # Look up new sector value from the dictionary
-            new_sector_value = fte_lookup.get(sec, 0)
-
-            # Calculate adjusted FTE for the current row
-            total_fte = float(row['Total FTE']) if pd.notna(row['Total FTE']) else 0
-
-            # Add to grand total of original FTE
-            grand_total_original_fte += total_fte
-
-            # Calculate adjusted_fte
-            adjusted_fte = total_fte * (new_sector_value + base_fte_value)
-
-            # Calculate enrollment percentage
-            enrollment_per = ''
-            if pd.notna(row['Capacity']) and pd.notna(row['FTE Count']) and \
-                        float(row['Capacity']) > 0:
-
-                enrollment_per = (float(row['FTE Count']) / float(row['Capacity'])) * 100
-                enrollment_per = "{:.2f}%".format(round(enrollment_per, 2)) 
-
-            # Add current row with enrollment percentage and generated FTE
-            output_rows.append({
-                'Division': actual_div if first_row else '',
-                'Course Code': course if course != current_course else '',
-                'Sec Name': row['Sec Name'],
-                'X Sec Delivery Method': row['X Sec Delivery Method'],
-                'Meeting Times': row['Meeting Times'],
-                'Capacity': row['Capacity'],
-                'FTE Count': row['FTE Count'],
-                'Sec Faculty Info': row['Sec Faculty Info'],
-                'Total FTE': row['Total FTE'],
-                'Enrollment Per': enrollment_per,
-                'Generated FTE': adjusted_fte
-            })
-
-            # Add to course total generated fte
-            course_total_fte += adjusted_fte
-
-            current_course = course
-            first_row = False
-
-        # Add total for last course
-        if current_course is not None:
-            output_rows.append({
-                'Division': '',
-                'Course Code': 'Total',
-                'Sec Name': '',
-                'X Sec Delivery Method': '',
-                'Meeting Times': '',
-                'Capacity': '',
-                'FTE Count': '',
-                'Sec Faculty Info': '',
-                'Total FTE': '',
-                'Enrollment Per': '',
-                'Generated FTE': course_total_fte
-            })
+        # Calculate Generated FTE and enrollment for every section at once
+        div_data = fte_engine.compute_fte(div_data, fte_data)
 
-            # Add last course total to grand total
-            grand_total_fte += course_total_fte
-            
-        # Add grand total row with formatted total
-        output_rows.append({
-            'Division': '',
-            'Course Code': 'DIVISION TOTAL',
-            'Sec Name': '',
-            'X Sec Delivery Method': '',
-            'Meeting Times': '',
-            'Capacity': '',
-            'FTE Count': '',
-            'Sec Faculty Info': '',
-            'Total FTE': float(grand_total_original_fte),  # Ensure it's a float
-            'Enrollment Per': '',
-            'Generated FTE': float(grand_total_fte)  # Ensure it's a float
-        })
-
-        # Format Generated FTE column with '$' before the number
-        # and a comma every 3 digits
-        for row in output_rows:
-            # Format Generated FTE if it's a number
-            if isinstance(row['Generated FTE'], (int, float)):
-                row['Generated FTE'] = "${:,.2f}".format(row['Generated FTE'])
-            
-            # Format Total FTE if it's a number (including the grand total)
-            if isinstance(row['Total FTE'], (int, float)):
-                row['Total FTE'] = "{:.2f}".format(row['Total FTE'])
-
-        # Convert to DataFrame
-        output_df = pd.DataFrame(output_rows)
+        output_df, grand_total_original_fte, grand_total_fte = \
+            division_report(div_data, actual_div)
 
         # Create Excel file
-        excel_filename = f"{actual_div.lower()}_fte.xlsx"
+        excel_filename = out_path(f"{actual_div.lower()}_fte.xlsx", out_dir)
 
         # Write to Excel
-        with pd.ExcelWriter(excel_filename, engine='openpyxl') as writer:
-            output_df.to_excel(writer, sheet_name='Division Analysis', index=False)
-
-            # Format the worksheet
-            worksheet = writer.sheets['Division Analysis']
-
-            # Adjust column widths
-            for idx, col in enumerate(output_df.columns):
-                max_length = max(
-                    output_df[col].astype(str).apply(len).max(),
-                    len(str(col))
-                ) + 2
-                worksheet.column_dimensions[chr(65 + idx)].width = max_length
-                
-            # Apply bold formatting to the Division Total row
-            last_row = len(output_df) + 1  # +1 because Excel rows are 1-indexed and we have a header row
-            for col in range(1, len(output_df.columns) + 1):
-                cell = worksheet.cell(row=last_row, column=col)
-                cell.font = Font(bold=True)
-                
-            # Add a bottom border to cells before the grand total
-            second_last_row = last_row - 1
-            if second_last_row > 1:  # Make sure there are rows before the total
-                for col in range(1, len(output_df.columns) + 1):
-                    cell = worksheet.cell(row=second_last_row, column=col)
-                    cell.border = Border(
-                        bottom=Side(style='thin')
-                    )
-                    
-            # Add background color to the grand total row
-            for col in range(1, len(output_df.columns) + 1):
-                cell = worksheet.cell(row=last_row, column=col)
-                cell.fill = PatternFill(
-                    start_color="E0E0E0", 
-                    end_color="E0E0E0",
-                    fill_type="solid"
-                )
+        report_writer.write_report(excel_filename, output_df,
+                                   'Division Analysis', total_row=True)
 
         print("\nAnalysis for division: {}".format(actual_div))
         print("Results exported to {}".format(excel_filename))
@@ -577,9 +887,167 @@ def division_fte(file_in):
     except Exception as e:
         print("Error processing data")
         print(traceback.format_exc())
-        return
+        return None
 
-    return
+    return excel_filename, grand_total_original_fte, grand_total_fte
+
+
+@instrument.traced(profile=True)
+def division_fte_workbook(file_in, divisions, excel_filename):
+    '''
+    Writes the FTE by Division report for several divisions to one
+    workbook, one sheet per division plus a College Summary sheet.
+
+    The frame is filtered, sorted and run through the FTE engine once and
+    then split into divisions with a single groupby.
+
+    Parameters
+    ----------
+    file_in : pandas.DataFrame
+        Input DataFrame containing course information.
+    divisions : list[str]
+        Division codes to include.
+    excel_filename : str
+        Name of the workbook to create.
+
+    Returns
+    -------
+    summary : pandas.DataFrame
+        One row per division with its totals, plus a COLLEGE TOTAL row.
+    '''
+    try:
+        fte_data = tier_table.load()
+
+        data = file_in[file_in['Sec Divisions'].isin(divisions)].copy()
+        if data.empty:
+            print("No data found for these divisions.")
+            return None
+
+        data['Course Code'] = data['Sec Name'].str.extract(r'([A-Z]+-\d+)')
+        data = data.sort_values(['Sec Divisions', 'Course Code', 'Sec Name'])
+        data = fte_engine.compute_fte(data, fte_data)
+
+        # Build every division's report from one groupby
+        reports = []
+        summary_rows = []
+        for division, div_data in data.groupby('Sec Divisions', sort=True, observed=True):
+            output_df, original_fte, generated_fte = \
+                division_report(div_data, division)
+            reports.append((division, output_df))
+            summary_rows.append({
+                'Division': division,
+                'Sections': len(div_data),
+                'Total FTE': original_fte,
+                'Generated FTE': generated_fte
+            })
+            print(f"{division}: {len(div_data)} sections, "
+                  f"Generated FTE ${generated_fte:,.2f}")
+
+        summary = pd.DataFrame(summary_rows)
+        college_original = fte_engine.running_total(summary['Total FTE'])
+        college_generated = fte_engine.running_total(summary['Generated FTE'])
+        summary.loc[len(summary)] = {
+            'Division': 'COLLEGE TOTAL',
+            'Sections': summary['Sections'].sum(),
+            'Total FTE': college_original,
+            'Generated FTE': college_generated
+        }
+
+        summary_report = summary.copy()
+        summary_report['Total FTE'] = summary_report['Total FTE'].map("{:.2f}".format)
+        summary_report['Generated FTE'] = summary_report['Generated FTE'].map(
+            "${:,.2f}".format)
+
+        # College Summary first, then one sheet per division
+        sheets = [('College Summary', summary_report, {'total_row': True})]
+        sheets += [(division, output_df, {'total_row': True})
+                   for division, output_df in reports]
+        report_writer.write_workbook(excel_filename, sheets)
+
+        print("\nResults exported to {}".format(excel_filename))
+        print("College Total Original FTE: {:.2f}".format(college_original))
+        print("College Total Generated FTE: ${:,.2f}".format(college_generated))
+        return summary
+
+    except Exception as e:
+        print("Error processing data")
+        print(traceback.format_exc())
+        return None
+
+
+def dashboard_sheets(labelled):
+    '''
+    Sheets of the college FTE dashboard: Generated FTE of every division
+    by delivery method and by tier, with totals, and the full cube to
+    drill down into.
+
+    Parameters
+    ----------
+    labelled : pandas.DataFrame
+        Output of fte_engine.cube_sections.
+
+    Returns
+    -------
+    list[tuple]
+        (sheet_name, frame, options) for report_writer.write_workbook.
+    '''
+    sheets = []
+    for sheet_name, columns in [('By Delivery Method', 'X Sec Delivery Method'),
+                                ('By Tier', 'Tier')]:
+        pivot = fte_engine.pivot_cube(labelled, columns).reset_index()
+        pivot.columns.name = None
+        money = {col: report_writer.MONEY_FORMAT for col in pivot.columns[1:]}
+        sheets.append((sheet_name, pivot, {'total_row': True, 'column_formats': money}))
+
+    sheets.append(('Detail', fte_engine.fte_cube(labelled), {
+        'autofilter': True,
+        'column_formats': {'Total FTE': report_writer.NUMBER_FORMAT,
+                           'Generated FTE': report_writer.MONEY_FORMAT}}))
+    return sheets
+
+
+@instrument.traced(profile=True)
+def college_fte_dashboard(file_in, excel_filename=DASHBOARD_FILE, out_dir=None):
+    '''
+    Writes Generated FTE by division, delivery method and funding tier
+    for the whole college to one workbook (see dashboard_sheets) and
+    shows the division by delivery method totals.
+
+    Parameters
+    ----------
+    file_in : pandas.DataFrame
+        Input DataFrame containing course information.
+    excel_filename : str
+        Name of the workbook (default is DASHBOARD_FILE).
+    out_dir : str
+        Directory for the file (default is None, the current one).
+
+    Returns
+    -------
+    pandas.DataFrame or None
+        The fte_engine.fte_cube rows, None if there is no data or the
+        report failed.
+    '''
+    try:
+        labelled = fte_engine.cube_sections(file_in, tier_table.load())
+        if labelled.empty:
+            print("No data found for the dashboard.")
+            return None
+
+        excel_filename = out_path(excel_filename, out_dir)
+        report_writer.write_workbook(excel_filename, dashboard_sheets(labelled))
+
+        pivot = fte_engine.pivot_cube(labelled, 'X Sec Delivery Method')
+        print("\nGenerated FTE by Division and Delivery Method:")
+        print(pivot.to_string(float_format="${:,.2f}".format))
+        print("\nResults exported to {}".format(excel_filename))
+        print("College Total Generated FTE: ${:,.2f}".format(pivot.iloc[-1, -1]))
+        return fte_engine.fte_cube(labelled)
+
+    except Exception as e:
+        print("Error processing data")
+        print(traceback.format_exc())
+        return None
 
 
 def clean_name_for_search(name):
@@ -651,8 +1119,9 @@ def fte_per_course(file_in):
    
     print()
     # Step 1: Extract course codes from section names using regex
-    file_in['Course Code'] = file_in['Sec Name'].str.extract(r'([A-Z]+-\d+)')
-    course_codes = sorted(file_in['Course Code'].dropna().unique())
+    # (into a local Series; file_in is the shared cached table)
+    codes = file_in['Sec Name'].str.extract(r'([A-Z]+-\d+)')[0]
+    course_codes = sorted(codes.dropna().unique())
 
     while True:
         # Step 2a: Prompt user for course code input
@@ -686,147 +1155,111 @@ type 'back' to return to main menu:")
                 continue
             selected_course = matching_courses[int(selection) - 1]
 
-        print(f"\nProcessing data for course: {selected_course}")
+        if course_fte_report(file_in, selected_course) is not None:
+            break
 
-        try:
-            # Step 3a: Filter data for selected course
-            course_data = file_in[file_in['Course Code'] == selected_course].copy()
-            if course_data.empty:
-                print("No sections found for this course.")
-                continue
 
-            # Step 3b: Remove duplicate sections
-            course_data = course_data.drop_duplicates(subset='Sec Name')
-
-            # Step 3c: Load FTE tier data for calculations
-            fte_data = pd.read_excel('FTE_Tier.xlsx')
-            fte_lookup = {row['Prefix/Course ID']: row['New Sector']
-                          for _, row in fte_data.iterrows()
-                          if pd.notna(row['Prefix/Course ID'])}
-
-            # Step 3d: Sort data by section name
-            course_data = course_data.sort_values('Sec Name')
-            base_fte_value = 1926
-
-            # Step 4a: Initialize variables for calculating FTE
-            output_rows = []
-            total_generated_fte = 0
-            total_original_fte = 0  # Track sum of original Total FTE
-
-            # Step 4b: Process each section to calculate FTE metrics
-            for _, row in course_data.iterrows():
-                # Extract section prefix (first 3 chars of section name)
-                sec_prefix = row['Sec Name'][:3] if not pd.isna(row['Sec Name']) else ""
-
-                # Look up new sector value for this prefix
-                new_sector_value = fte_lookup.get(sec_prefix, 0)
-
-                # Calculate total FTE for this section
-                total_fte = float(row['Total FTE']) if pd.notna(row['Total FTE']) else 0
-                
-                # Add to total original FTE
-                total_original_fte += total_fte
-
-                # Calculate generated FTE using formula
-                generated_fte = total_fte * (new_sector_value + base_fte_value)
-
-                # Calculate enrollment percentage
-                enrollment_per = ""
-                if pd.notna(row['Capacity']) and pd.notna(row['FTE Count']) and float(row['Capacity']) > 0:
-                    enrollment_per = round((float(row['FTE Count']) / float(row['Capacity'])) * 100, 2)
-
-                # Add section data to output rows
-                output_rows.append({
-                    'Course Code': selected_course if len(output_rows) == 0 else '',
-                    'Sec Name': row['Sec Name'],
-                    'X Sec Delivery Method': row['X Sec Delivery Method'],
-                    'Sec Faculty Info': row['Sec Faculty Info'],
-                    'Meeting Times': row['Meeting Times'],
-                    'Capacity': row['Capacity'],
-                    'FTE Count': row['FTE Count'],
-                    'Total FTE': total_fte,
-                    'Enrollment Per': "{:.2f}%".format(enrollment_per) if enrollment_per != "" else "",
-                    'Generated FTE': generated_fte
-                })
-
-                # Add current section's FTE to course total
-                total_generated_fte += generated_fte
-
-            # Step 4c: Add a summary row with course totals
-            output_rows.append({
-                'Course Code': 'COURSE TOTAL',
-                'Sec Name': '',
-                'X Sec Delivery Method': '',
-                'Sec Faculty Info': '',
-                'Meeting Times': '',
-                'Capacity': '',
-                'FTE Count': '',
-                'Total FTE': total_original_fte,  # Add total original FTE
-                'Enrollment Per': '',
-                'Generated FTE': total_generated_fte
-            })
+@instrument.traced(profile=True)
+def course_fte_report(file_in, selected_course, out_dir=None, courses=None):
+    """
+    Calculate and export FTE data for one course to <code>_FTE.xlsx.
 
-            # Format the numeric values
-            for row in output_rows:
-                # Format Generated FTE if it's a number
-                if isinstance(row['Generated FTE'], (int, float)):
-                    row['Generated FTE'] = "${:,.2f}".format(row['Generated FTE'])
-                
-                # Format Total FTE if it's a number (including the total row)
-                if isinstance(row['Total FTE'], (int, float)):
-                    row['Total FTE'] = "{:.2f}".format(row['Total FTE'])
-
-            # Step 5a: Convert to DataFrame for export
-            output_df = pd.DataFrame(output_rows)
-
-            # Step 5b: Create Excel file with course code as name
-            file_name = f"{selected_course.replace('-', '').lower()}_FTE.xlsx"
-            
-            # Create a writer for Excel output
-            with pd.ExcelWriter(file_name, engine='openpyxl') as writer:
-                output_df.to_excel(writer, index=False, sheet_name='Course Analysis')
-                
-                # Get the worksheet and apply formatting
-                worksheet = writer.sheets['Course Analysis']
-                
-                # Adjust column widths
-                for idx, col in enumerate(output_df.columns):
-                    max_length = max(
-                        output_df[col].astype(str).apply(len).max(),
-                        len(str(col))
-                    ) + 2
-                    worksheet.column_dimensions[chr(65 + idx)].width = max_length
-                
-                # Apply formatting to the Course Total row (bold and background color)
-                last_row = len(output_df) + 1  
-                for col in range(1, len(output_df.columns) + 1):
-                    cell = worksheet.cell(row=last_row, column=col)
-                    cell.font = Font(bold=True)
-                    cell.fill = PatternFill(
-                        start_color="E0E0E0", 
-                        end_color="E0E0E0",
-                        fill_type="solid"
-                    )
-                
-                # Add a bottom border to cells before the total row
-                second_last_row = last_row - 1
-                if second_last_row > 1:  # Make sure there are rows before the total
-                    for col in range(1, len(output_df.columns) + 1):
-                        cell = worksheet.cell(row=second_last_row, column=col)
-                        cell.border = Border(
-                            bottom=Side(style='thin')
-                        )
-
-            # Display summary of results
-            print(f"\nAnalysis for course: {selected_course}")
-            print(f"Found {len(course_data)} sections")
-            print(f"Results exported to {file_name}")
-            print("Course Total Original FTE: {:.2f}".format(total_original_fte))
-            print("Course Total Generated FTE: ${:,.2f}".format(total_generated_fte))
-            break
+    Parameters
+    ----------
+    file_in : pandas.DataFrame
+        Input DataFrame containing course information.
+    selected_course : str
+        Course code, e.g. "CSC-121".
+    out_dir : str
+        Directory for the file (default is None, the current one).
+    courses : CourseIndex
+        Index of file_in, to look the course up without scanning every
+        section name (default is None, scan them).
 
-        except Exception as e:
-            print("Error processing course data" )
-            print(str(e))
-            print(traceback.format_exc())
-            continue
+    Returns
+    -------
+    tuple or None
+        (file name, Total FTE, Generated FTE) of the course, None if it
+        has no sections or the report failed.
+    """
+    print(f"\nProcessing data for course: {selected_course}")
+
+    try:
+        # Step 3a: Filter data for selected course
+        if courses is not None:
+            course_data = file_in.iloc[courses.rows(selected_course)].copy()
+        else:
+            course_codes = file_in['Sec Name'].str.extract(r'([A-Z]+-\d+)')[0]
+            course_data = file_in[course_codes == selected_course].copy()
+        if course_data.empty:
+            print("No sections found for this course.")
+            return None
+
+        # Step 3c: Load FTE tier data for calculations
+        fte_data = tier_table.load()
+
+        # Step 3d: Sort data by section name
+        course_data = course_data.sort_values('Sec Name')
+
+        # Step 4a: Calculate FTE metrics for every section at once
+        course_data = fte_engine.compute_fte(course_data, fte_data)
+        total_generated_fte = fte_engine.running_total(course_data['Generated FTE'])
+        total_original_fte = fte_engine.running_total(course_data['Section FTE'])
+
+        # Step 4b: Build one output row per section
+        output_df = pd.DataFrame({
+            'Course Code': '',
+            'Sec Name': course_data['Sec Name'],
+            'X Sec Delivery Method': course_data['X Sec Delivery Method'],
+            'Sec Faculty Info': course_data['Sec Faculty Info'],
+            'Meeting Times': course_data['Meeting Times'],
+            'Capacity': course_data['Capacity'],
+            'FTE Count': course_data['FTE Count'],
+            'Total FTE': course_data['Section FTE'],
+            'Enrollment Per': fte_engine.format_ratio(course_data['Enrollment Ratio']),
+            'Generated FTE': course_data['Generated FTE']
+        }).reset_index(drop=True)
+        output_df.loc[0, 'Course Code'] = selected_course
+
+        # Step 4c: Add a summary row with course totals
+        output_df.loc[len(output_df)] = {
+            'Course Code': 'COURSE TOTAL',
+            'Sec Name': '',
+            'X Sec Delivery Method': '',
+            'Sec Faculty Info': '',
+            'Meeting Times': '',
+            'Capacity': '',
+            'FTE Count': '',
+            'Total FTE': total_original_fte,  # Add total original FTE
+            'Enrollment Per': '',
+            'Generated FTE': total_generated_fte
+        }
+
+        # Step 5a: Format the numeric values for export
+        output_df['Generated FTE'] = output_df['Generated FTE'].map(
+            "${:,.2f}".format)
+        output_df['Total FTE'] = output_df['Total FTE'].map(
+            "{:.2f}".format)
+
+        # Step 5b: Create Excel file with course code as name
+        file_name = out_path(
+            f"{selected_course.replace('-', '').lower()}_FTE.xlsx", out_dir)
+        
+        # Write the sheet with the Course Total row highlighted
+        report_writer.write_report(file_name, output_df,
+                                   'Course Analysis', total_row=True)
+
+        # Display summary of results
+        print(f"\nAnalysis for course: {selected_course}")
+        print(f"Found {len(course_data)} sections")
+        print(f"Results exported to {file_name}")
+        print("Course Total Original FTE: {:.2f}".format(total_original_fte))
+        print("Course Total Generated FTE: ${:,.2f}".format(total_generated_fte))
+
+    except Exception as e:
+        print("Error processing course data" )
+        print(str(e))
+        print(traceback.format_exc())
+        return None
+
+    return file_name, total_original_fte, total_generated_fte
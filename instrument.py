@@ -0,0 +1,275 @@
+# -*- coding: utf-8 -*-
+"""
+Spans for timing the stages of a run.
+
+A span is a context manager or decorator around one stage (reading the
+CSAR, the merge, a report, an Excel write):
+
+    with instrument.span('read_csv') as current:
+        frame = pd.read_csv(path)
+        current.rows_out = len(frame)
+
+    @instrument.traced()
+    def division_fte_report(file_in, actual_div, out_dir=None): ...
+
+Nothing is recorded unless tracing is on, either with the CSAR_PROFILE
+environment variable (1, or the trace file to write) or with
+``python main.py --profile``. When it is off a span costs one attribute
+check. When it is on every span records its wall time, the rows it got
+and returned, and its tracemalloc peak; the spans are written at exit as
+a Chrome trace (open in chrome://tracing or ui.perfetto.dev).
+
+Spans marked profile=True (the report of each menu option) also run
+under cProfile when a profile directory is given (CSAR_PROFILE_DIR or
+--profile-dir), one <name>.prof per span name, for pstats or snakeviz.
+"""
+import atexit
+import cProfile
+import functools
+import json
+import os
+import time
+import tracemalloc
+
+import pandas as pd
+
+
+ENV_VAR = 'CSAR_PROFILE'
+PROFILE_DIR_ENV_VAR = 'CSAR_PROFILE_DIR'
+
+TRACE_FILE = 'csar_trace.json'
+
+
+class _State:
+    '''
+    Whether tracing is on, and what has been recorded so far.
+    '''
+    enabled = False
+    trace_file = TRACE_FILE
+    profile_dir = None
+    origin = 0.0
+    spans = []
+    stack = []
+    profiles = {}
+    profiling = False
+
+
+_state = _State()
+
+
+def enable(trace_file=TRACE_FILE, profile_dir=None):
+    '''
+    Turns tracing on; the trace is written when the program exits.
+
+    Parameters
+    ----------
+    trace_file : str
+        Where to write the JSON trace (default is 'csar_trace.json').
+    profile_dir : str
+        Directory for the cProfile dumps of profiled spans (default is
+        None, no profiling).
+    '''
+    if not _state.enabled:
+        atexit.register(write)
+        _state.origin = time.perf_counter()
+    _state.enabled = True
+    _state.trace_file = trace_file
+    _state.profile_dir = profile_dir
+    if not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+
+def disable():
+    '''
+    Turns tracing off and forgets what was recorded.
+    '''
+    _state.enabled = False
+    _state.spans = []
+    _state.stack = []
+    _state.profiles = {}
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+
+def enabled():
+    '''
+    True while spans are being recorded.
+    '''
+    return _state.enabled
+
+
+def _rows(value):
+    '''
+    Rows in a dataframe or series, or in the first one of a tuple.
+    '''
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return len(value)
+    if isinstance(value, tuple):
+        for item in value:
+            if isinstance(item, (pd.DataFrame, pd.Series)):
+                return len(item)
+    return None
+
+
+class span:
+    '''
+    Times one stage; use as a context manager or through traced.
+
+    Parameters
+    ----------
+    name : str
+        Stage name shown in the trace.
+    rows_in : int
+        Rows the stage works on, if known (rows_out can be set on the
+        span before it closes).
+    profile : bool
+        Also run the stage under cProfile when a profile directory is
+        set (default is False).
+    '''
+    __slots__ = ('name', 'rows_in', 'rows_out', 'profile', '_start', '_base',
+                 '_peak', '_profiler')
+
+    def __init__(self, name, rows_in=None, profile=False):
+        self.name = name
+        self.rows_in = rows_in
+        self.rows_out = None
+        self.profile = profile
+        self._start = None
+
+    def __enter__(self):
+        if _state.enabled:
+            self._open()
+        return self
+
+    def __exit__(self, *exc):
+        if self._start is not None:
+            self._close()
+        return False
+
+    def _open(self):
+        # the peak so far belongs to the enclosing span; start afresh
+        current, peak = tracemalloc.get_traced_memory()
+        if _state.stack:
+            parent = _state.stack[-1]
+            parent._peak = max(parent._peak, peak)
+        tracemalloc.reset_peak()
+        self._base = current
+        self._peak = current
+
+        self._profiler = None
+        if self.profile and _state.profile_dir and not _state.profiling:
+            self._profiler = _state.profiles.setdefault(self.name, cProfile.Profile())
+            _state.profiling = True
+            self._profiler.enable()
+
+        _state.stack.append(self)
+        self._start = time.perf_counter()
+
+    def _close(self):
+        seconds = time.perf_counter() - self._start
+        if self._profiler is not None:
+            self._profiler.disable()
+            _state.profiling = False
+
+        _, peak = tracemalloc.get_traced_memory()
+        peak = max(self._peak, peak)
+        _state.stack.pop()
+        if _state.stack:
+            parent = _state.stack[-1]
+            parent._peak = max(parent._peak, peak)
+
+        _state.spans.append({
+            'name': self.name,
+            'start': self._start - _state.origin,
+            'seconds': seconds,
+            'depth': len(_state.stack),
+            'rows_in': self.rows_in,
+            'rows_out': self.rows_out,
+            'peak_bytes': peak - self._base,
+        })
+        self._start = None
+
+
+def traced(name=None, profile=False):
+    '''
+    Decorator running a function in a span. Rows in are those of the
+    first dataframe argument, rows out those of the result.
+
+    Parameters
+    ----------
+    name : str
+        Span name (default is the function's name).
+    profile : bool
+        See span.
+    '''
+    def decorate(func):
+        label = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _state.enabled:
+                return func(*args, **kwargs)
+            rows_in = next((rows for rows in map(_rows, args) if rows is not None), None)
+            with span(label, rows_in, profile) as current:
+                result = func(*args, **kwargs)
+                current.rows_out = _rows(result)
+            return result
+        return wrapper
+    return decorate
+
+
+def spans():
+    '''
+    The spans recorded so far, in the order they closed.
+
+    Returns
+    -------
+    dataframe
+        name, start, seconds, depth, rows_in, rows_out and peak_bytes.
+    '''
+    return pd.DataFrame(_state.spans, columns=['name', 'start', 'seconds', 'depth',
+                                               'rows_in', 'rows_out', 'peak_bytes'])
+
+
+def write(trace_file=None):
+    '''
+    Writes the recorded spans as a Chrome trace and the cProfile dumps.
+
+    Parameters
+    ----------
+    trace_file : str
+        Where to write the trace (default is the one given to enable).
+
+    Returns
+    -------
+    str or None
+        The trace file, None if nothing was recorded.
+    '''
+    if not _state.spans:
+        return None
+    trace_file = trace_file or _state.trace_file
+
+    events = [{
+        'name': item['name'], 'ph': 'X', 'pid': os.getpid(), 'tid': 0,
+        'ts': round(item['start'] * 1e6), 'dur': round(item['seconds'] * 1e6),
+        'args': {'rows_in': item['rows_in'], 'rows_out': item['rows_out'],
+                 'peak_kb': round(item['peak_bytes'] / 1024, 1)},
+    } for item in _state.spans]
+    with open(trace_file, 'w') as file:
+        json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, file)
+
+    if _state.profile_dir and _state.profiles:
+        os.makedirs(_state.profile_dir, exist_ok=True)
+        for name, profiler in _state.profiles.items():
+            safe = ''.join(ch if ch.isalnum() or ch in '-_' else '_' for ch in name)
+            profiler.dump_stats(os.path.join(_state.profile_dir, f"{safe}.prof"))
+
+    print(f"Trace of {len(events)} spans written to {trace_file}")
+    return trace_file
+
+
+# CSAR_PROFILE=1 (or =trace.json) turns tracing on for the whole run
+if os.environ.get(ENV_VAR, '').strip().lower() not in ('', '0', 'false', 'no'):
+    _value = os.environ[ENV_VAR].strip()
+    enable(_value if _value.lower() not in ('1', 'true', 'yes') else TRACE_FILE,
+           os.environ.get(PROFILE_DIR_ENV_VAR) or None)
@@ -4,6 +4,14 @@ Takes data from deanDailyCsar.xlsx and FTE_Tier.xlsx to determine classes FTE.
 Allows the user to Get Course Enrollment, and get FTE by Division, Instructor,
 and Course. 
 
+Run without a command for the menu, or with one to write reports without
+any prompts, e.g.
+
+    python main.py division --codes ALL --out reports/
+    python main.py course --codes CSC-121,MAT-171
+    python main.py faculty --all
+    python main.py --term 2024FA:2025SP dashboard
+
 GROUP A & B
 Thuan Chau, Karen Brown, Harley Coughlin,Teresa Hearn, Shiane Ransford, Latoya Winston
 
@@ -14,24 +22,81 @@ CSC-221-001
 M7GroupAnBPro
 
 """
+import argparse
+import os
+from collections import Counter
+import sys
 import functions as fn
-import options4 
+import instrument
+import option4 as options4
+import refresh
+import schedule
+import tier_table
+from datastore import DataStore
+from faculty_index import FacultyIndex
+from course_index import CourseIndex
+from term_store import TermStore
+
+
+# Exit status of a command; argparse itself exits with 2 on bad arguments
+EXIT_OK = 0
+EXIT_FAILED = 1
+
+
+def load_tables(store, history=None, terms=None):
+    '''
+    The data every report works on, read once and reused.
+
+    Parameters
+    ----------
+    store : DataStore
+        The current extract.
+    history : TermStore
+        Older terms, used instead of the store when given.
+    terms : str
+        Term, range or list of terms to take from the history.
+
+    Returns
+    -------
+    tuple
+        (sections, meetings, FacultyIndex, CourseIndex); the indexes are
+        None when they have to be built from the sections.
+    '''
+    if history is None:
+        return store.frame, store.meetings, store.faculty, store.courses
+    sections, meetings = history.tables(terms)
+    return sections, meetings, None, None
 
 
-def main():
+def main(rebuild_cache=False, terms=None):
     '''
     Main function to handle the menu and the users options.
 
+    Parameters
+    ----------
+    rebuild_cache : bool
+        Rebuild the snapshot in .csar_cache instead of reading it
+        (default is False).
+    terms : str
+        Term, range or list of terms from csar_terms/ to report on, e.g.
+        "2024FA:2025SP" (default is None, the current extract).
+
     Returns
     -------
     None.
     '''
     try:
         choice = 0
+        # loads the files once and reloads only when they change.
+        store = DataStore()
+        if rebuild_cache:
+            store.reload(rebuild_cache=True)
+        # older terms are only read when asked for
+        history = TermStore() if terms else None
 
         while choice != '6':
-            # reads the file into a data frame.
-            file_in = fn.readfile()
+            # gets the data frame for this session.
+            file_in, meetings, faculty, courses = load_tables(store, history, terms)
             # displays menu
             fn.menu()
             # gets user input.
@@ -47,7 +112,7 @@ def main():
             elif choice == '2':
                 print("\nOption 2: Enrollment Percentage")
                 # calls function to get course enrollment
-                fn.option2_enrollment(file_in)
+                fn.option2_enrollment(file_in, courses)
 
             elif choice == '3':
                 print("\nOption 3: FTE by Division: ")
@@ -57,7 +122,7 @@ def main():
             elif choice == '4':
                 print("\nOption 4: FTE by Instructor: ")
                 # gets FTE by instructor
-                options4.fte_per_faculty(file_in)
+                options4.fte_per_faculty(file_in, faculty)
 
             elif choice == '5':
                 print("\nOption 2: FTE by Course: ")
@@ -67,8 +132,23 @@ def main():
             elif choice == '6':
                 # exits program
                 print("Exit Program: GoodBye!")
+
+            elif choice == '7':
+                print("\nOption 7: Room Utilization: ")
+                # checks every room's bookings in the meetings table
+                schedule.room_report(meetings)
+
+            elif choice == '8':
+                print("\nOption 8: Instructor Conflicts and Load: ")
+                # checks every instructor at once, no prompt needed
+                schedule.instructor_report(file_in, meetings)
+
+            elif choice == '9':
+                print("\nOption 9: College FTE Dashboard: ")
+                # every division, delivery method and tier in one workbook
+                fn.college_fte_dashboard(file_in)
             else:
-                print("\nPlease include an option between 1 and 6!")
+                print("\nPlease include an option between 1 and 9!")
 
     except FileNotFoundError as err:
         print(f"Error: File not found - {err}")
@@ -76,5 +156,284 @@ def main():
         print(f"Error: Invalid value - {err}")
 
 
+def run_division(args, file_in, meetings, faculty, courses):
+    '''
+    FTE by Division for --codes, one file per division or one --workbook.
+    Returns the number of codes that failed.
+    '''
+    divisions, missing = fn.select_codes(
+        args.codes, sorted(file_in['Sec Divisions'].dropna().unique()))
+    for code in missing:
+        print(f"Division '{code}' not found")
+
+    if args.workbook and divisions:
+        summary = fn.division_fte_workbook(
+            file_in, divisions, fn.out_path(args.workbook, args.out))
+        return len(missing) + (summary is None)
+
+    failed = [division for division in divisions
+              if fn.division_fte_report(file_in, division, args.out) is None]
+    return len(missing) + len(failed)
+
+
+def run_export(args, file_in, meetings, faculty, courses):
+    '''
+    Sec Divisions export (menu option 1) for --codes.
+    Returns the number of codes that failed.
+    '''
+    divisions, missing = fn.select_codes(
+        args.codes, sorted(file_in['Sec Divisions'].dropna().unique()))
+    for code in missing:
+        print(f"Division '{code}' not found")
+    results = fn.export_divisions(file_in, divisions, parallel=len(divisions) > 1,
+                                  out_dir=args.out)
+    return len(missing) + len(divisions) - len(results)
+
+
+def run_course(args, file_in, meetings, faculty, courses):
+    '''
+    FTE by Course for --codes. Returns the number of codes that failed.
+    '''
+    selected, missing = fn.select_codes(args.codes, courses.codes)
+    for code in missing:
+        print(f"No course found with code '{code}'.")
+    failed = [code for code in selected
+              if fn.course_fte_report(file_in, code, args.out, courses) is None]
+    return len(missing) + len(failed)
+
+
+def run_enrollment(args, file_in, meetings, faculty, courses):
+    '''
+    Enrollment percentage for --codes (course codes or parts of section
+    names). Returns the number of codes that failed.
+    '''
+    codes = courses.codes if args.codes.strip().upper() == 'ALL' else \
+        [code.strip() for code in args.codes.split(',') if code.strip()]
+    failed = 0
+    for code in codes:
+        if fn.enrollment_report(file_in, code, courses, args.out) is None:
+            print(f"Course '{code}' not found.")
+            failed += 1
+    return failed
+
+
+def run_faculty(args, file_in, meetings, faculty, courses):
+    '''
+    FTE per Instructor for every --names entry or --all faculty.
+    Returns the number of names that failed.
+    '''
+    if args.all:
+        names, failed = list(faculty.names), 0
+    else:
+        names, failed = [], 0
+        for text in args.names:
+            matches = faculty.find(text) or []
+            if len(matches) == 1:
+                names.append(matches[0])
+            else:
+                print(f"'{text}' matches {len(matches)} instructors"
+                      + (": " + "; ".join(matches) if matches else ""))
+                failed += 1
+
+    # files are named by last name and first initial; instructors that
+    # would share a file are numbered so no report overwrites another
+    bases = [options4.faculty_file_name(name).lower() for name in names]
+    shared = Counter(bases)
+    numbered = Counter()
+
+    course_tier = tier_table.load()
+    written = {}
+    for name, base in zip(names, bases):
+        file_name = None
+        if shared[base] > 1:
+            numbered[base] += 1
+            file_name = f"{base}_{numbered[base]}"
+        path = options4.faculty_fte_report(file_in, name, course_tier, args.out,
+                                           file_name)
+        if path is None:
+            failed += 1
+        elif path in written:
+            print(f"Error: {name} would overwrite the report of {written[path]}")
+            failed += 1
+        else:
+            written[path] = name
+    return failed
+
+
+def run_rooms(args, file_in, meetings, faculty, courses):
+    '''
+    Room utilization and double bookings. Returns 1 if it failed.
+    '''
+    utilization, _ = schedule.room_report(
+        meetings, fn.out_path('room_utilization.xlsx', args.out))
+    return int(utilization is None)
+
+
+def run_instructors(args, file_in, meetings, faculty, courses):
+    '''
+    Instructor conflicts and load. Returns 1 if it failed.
+    '''
+    exceptions, _ = schedule.instructor_report(
+        file_in, meetings, args.max_hours,
+        fn.out_path('instructor_exceptions.xlsx', args.out))
+    return int(exceptions is None)
+
+
+def run_dashboard(args, file_in, meetings, faculty, courses):
+    '''
+    College FTE by division, delivery method and tier. Returns 1 if it
+    failed.
+    '''
+    cube = fn.college_fte_dashboard(file_in, args.workbook, args.out)
+    return int(cube is None)
+
+
+def build_parser():
+    '''
+    Command line options and one subcommand per report.
+
+    Returns
+    -------
+    argparse.ArgumentParser
+    '''
+    parser = argparse.ArgumentParser(
+        description="FTE reports from the daily CSAR. Without a command "
+                    "the interactive menu is shown.")
+    parser.add_argument('--rebuild-cache', action='store_true',
+                        help="rebuild the snapshot in .csar_cache")
+    parser.add_argument('--memory-report', action='store_true',
+                        help="print the bytes per column and exit")
+    parser.add_argument('--refresh', action='store_true',
+                        help="list the reports made stale by changes to the "
+                             "extract since the last refresh (appended to "
+                             f"{refresh.CHANGE_LOG}) and exit; the reports "
+                             "are not run or sped up")
+    parser.add_argument('--profile', nargs='?', const=instrument.TRACE_FILE,
+                        metavar='TRACE',
+                        help="record the time, rows and peak memory of every "
+                             "stage to a JSON trace (default %(const)s)")
+    parser.add_argument('--profile-dir', metavar='DIR',
+                        help="with --profile, also write a cProfile dump per "
+                             "report to DIR")
+    parser.add_argument('--term', metavar='SPEC',
+                        help="term, range or list from csar_terms/, "
+                             "e.g. 2025SP, 2023FA:2025SP or ALL")
+    commands = parser.add_subparsers(dest='command', metavar='command')
+
+    def command(name, run, help_text):
+        sub = commands.add_parser(name, help=help_text, description=help_text)
+        sub.add_argument('--out', metavar='DIR',
+                         help="directory for the reports (default is the "
+                              "current one)")
+        sub.set_defaults(run=run)
+        return sub
+
+    sub = command('division', run_division, "FTE by Division")
+    sub.add_argument('--codes', required=True,
+                     help="division codes separated by commas, or ALL")
+    sub.add_argument('--workbook', metavar='FILE',
+                     help="write every division to one workbook with a "
+                          "College Summary instead")
+
+    sub = command('export', run_export, "export the rows of each division")
+    sub.add_argument('--codes', required=True,
+                     help="division codes separated by commas, or ALL")
+
+    sub = command('course', run_course, "FTE by Course")
+    sub.add_argument('--codes', required=True,
+                     help="course codes separated by commas, or ALL")
+
+    sub = command('enrollment', run_enrollment, "course enrollment percentage")
+    sub.add_argument('--codes', required=True,
+                     help="course codes separated by commas, or ALL")
+
+    sub = command('faculty', run_faculty, "FTE per Instructor")
+    who = sub.add_mutually_exclusive_group(required=True)
+    who.add_argument('--names', nargs='+', metavar='NAME',
+                     help="instructor names, e.g. \"A. Fann\" Jones")
+    who.add_argument('--all', action='store_true', help="every instructor")
+
+    command('rooms', run_rooms, "room utilization and double bookings")
+
+    sub = command('dashboard', run_dashboard,
+                  "college FTE by division, delivery method and tier")
+    sub.add_argument('--workbook', metavar='FILE', default=fn.DASHBOARD_FILE,
+                     help="name of the workbook (default %(default)s)")
+
+    sub = command('instructors', run_instructors,
+                  "instructor schedule conflicts and load")
+    sub.add_argument('--max-hours', type=float,
+                     default=schedule.MAX_CONTACT_HOURS,
+                     help="weekly contact hours above which an instructor "
+                          "is flagged (default %(default)s)")
+    return parser
+
+
+def cli(argv=None):
+    '''
+    Runs one report command without prompts, or the menu when no
+    command is given.
+
+    Parameters
+    ----------
+    argv : list[str]
+        Command line arguments (default is sys.argv[1:]).
+
+    Returns
+    -------
+    int
+        EXIT_OK, or EXIT_FAILED when the data could not be read or any
+        report failed or was not found.
+    '''
+    args = build_parser().parse_args(argv)
+
+    if args.profile:
+        # the trace is written when the program exits
+        instrument.enable(args.profile, args.profile_dir)
+
+    if args.memory_report:
+        # bytes per column with pandas' default types and with schema.py
+        print(fn.memory_report().to_string(index=False))
+        return EXIT_OK
+    if args.refresh:
+        # finds the reports the changes since the last refresh made stale
+        refresh.refresh()
+        return EXIT_OK
+    if args.command is None:
+        main(rebuild_cache=args.rebuild_cache, terms=args.term)
+        return EXIT_OK
+
+    try:
+        # the data is read once for every report of the command
+        store = DataStore()
+        if args.rebuild_cache:
+            store.reload(rebuild_cache=True)
+        history = TermStore() if args.term else None
+        file_in, meetings, faculty, courses = load_tables(store, history, args.term)
+        if len(file_in) == 0:
+            print("Error: no CSAR data could be read", file=sys.stderr)
+            return EXIT_FAILED
+        if faculty is None:
+            faculty = FacultyIndex.from_frame(file_in)
+        if courses is None:
+            courses = CourseIndex.from_frame(file_in)
+
+        if args.out:
+            os.makedirs(args.out, exist_ok=True)
+        failed = args.run(args, file_in, meetings, faculty, courses)
+
+    except FileNotFoundError as err:
+        print(f"Error: File not found - {err}", file=sys.stderr)
+        return EXIT_FAILED
+    except ValueError as err:
+        print(f"Error: Invalid value - {err}", file=sys.stderr)
+        return EXIT_FAILED
+
+    if failed:
+        print(f"{failed} report(s) failed or were not found", file=sys.stderr)
+        return EXIT_FAILED
+    return EXIT_OK
+
+
 if __name__ == '__main__':
-    main()
+    sys.exit(cli())
@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+"""
+Vectorized parser for the fixed-width "Meeting Times" column.
+
+Every meeting line in the CSAR is one padded 62 character string:
+
+    01/13/25 05/14/25 LAH  106      LAB  T         02:00PM 04:50PM
+    [start ] [end   ] [bld][room   ][typ][days    ][start ][end  ]
+
+parse() slices the whole column at once into typed columns (dates,
+building, room, meeting type, a days bitmask and start/end minutes past
+midnight) so schedule reports can work on arrays instead of text.
+"""
+import numpy as np
+import pandas as pd
+
+import instrument
+
+
+# Character positions of each field in the Meeting Times string
+START_DATE = slice(0, 8)
+END_DATE = slice(9, 17)
+BUILDING = slice(18, 23)
+ROOM = slice(23, 32)
+MEETING_TYPE = slice(32, 37)
+DAYS = slice(37, 47)
+START_TIME = slice(47, 55)
+END_TIME = slice(55, 62)
+
+# Bit for each day token in the "Days" mask
+DAY_BITS = {'M': 1, 'T': 2, 'W': 4, 'TH': 8, 'F': 16, 'S': 32, 'SU': 64}
+
+# Single letter each token is rewritten to before matching
+_DAY_LETTERS = {'M': 'M', 'T': 'T', 'W': 'W', 'TH': 'R', 'F': 'F', 'S': 'S',
+                'SU': 'U'}
+
+# Columns added by parse(), in order
+PARSED_COLUMNS = ['Start Date', 'End Date', 'Building', 'Room',
+                  'Meeting Type', 'Days', 'Start Minute', 'End Minute']
+
+
+def _dates(text):
+    '''
+    Parses mm/dd/yy dates, NaT when blank or malformed.
+    '''
+    return pd.to_datetime(text.str.strip(), format='%m/%d/%y', errors='coerce')
+
+
+def _labels(text):
+    '''
+    Strips the padding and stores the values as a categorical.
+    '''
+    labels = text.str.strip()
+    return labels.where(labels != '').astype('category')
+
+
+def _minutes(text):
+    '''
+    Converts hh:mmAM/PM times to minutes past midnight, <NA> for TBA.
+    '''
+    parts = text.str.extract(r'(\d{2}):(\d{2})([AP])M')
+    hours = pd.to_numeric(parts[0], errors='coerce') % 12
+    minutes = pd.to_numeric(parts[1], errors='coerce')
+    hours = hours + np.where(parts[2] == 'P', 12, 0)
+    return (hours * 60 + minutes).astype('Int16')
+
+
+def _day_mask(text):
+    '''
+    Turns day patterns such as MTWTHFSSU or TTH into a bitmask.
+
+    The two letter tokens are swapped for a single letter first so that
+    the T in TH and the S in SU are not counted as Tuesday and Saturday.
+    '''
+    letters = text.fillna('').str.strip()
+    letters = letters.str.replace('TH', 'R', regex=False)
+    letters = letters.str.replace('SU', 'U', regex=False)
+
+    mask = np.zeros(len(letters), dtype=np.uint8)
+    for day, bit in DAY_BITS.items():
+        has_day = letters.str.contains(_DAY_LETTERS[day], regex=False)
+        mask[has_day.to_numpy(dtype=bool)] |= bit
+    return pd.Series(mask, index=text.index)
+
+
+def parse(times):
+    '''
+    Parses a column of Meeting Times strings.
+
+    Parameters
+    ----------
+    times : pd.Series
+        Meeting Times strings; missing values give missing fields.
+
+    Returns
+    -------
+    dataframe
+        One row per entry of times (same index) with the columns
+        Start Date, End Date (datetime), Building, Room, Meeting Type
+        (category), Days (uint8 bitmask, see DAY_BITS) and Start Minute,
+        End Minute (Int16 minutes past midnight, <NA> for TBA).
+    '''
+    text = times.astype('str').where(times.notna())
+
+    return pd.DataFrame({
+        'Start Date': _dates(text.str[START_DATE]),
+        'End Date': _dates(text.str[END_DATE]),
+        'Building': _labels(text.str[BUILDING]),
+        'Room': _labels(text.str[ROOM]),
+        'Meeting Type': _labels(text.str[MEETING_TYPE]),
+        'Days': _day_mask(text.str[DAYS]),
+        'Start Minute': _minutes(text.str[START_TIME]),
+        'End Minute': _minutes(text.str[END_TIME]),
+    }, index=times.index)
+
+
+@instrument.traced()
+def add_parsed_columns(meetings):
+    '''
+    Adds the parsed Meeting Times columns to the Meetings table.
+
+    Parameters
+    ----------
+    meetings : dataframe
+        Needs a "Meeting Times" column.
+
+    Returns
+    -------
+    dataframe
+        Copy of meetings with PARSED_COLUMNS appended.
+    '''
+    parsed = parse(meetings['Meeting Times'])
+    return pd.concat([meetings, parsed], axis=1)
+
+
+def day_names(mask):
+    '''
+    Lists the day tokens set in a Days bitmask, e.g. 10 -> ['T', 'TH'].
+
+    Parameters
+    ----------
+    mask : int
+
+    Returns
+    -------
+    list[str]
+    '''
+    return [day for day, bit in DAY_BITS.items() if int(mask) & bit]
@@ -1,10 +1,14 @@
 import pandas as pd
 import re
 import os
-import xlsxwriter
 import traceback
-from openpyxl import load_workbook
-from openpyxl.styles import Font, Border, Side, PatternFill
+import instrument
+import tier_table
+import report_writer
+from faculty_index import FacultyIndex
+from course_index import CourseIndex
+from fte_engine import running_total
+from tier_table import SUPPORT, TierTable, as_tier_table
 
 
 def clean_name_for_search(name):
@@ -57,21 +61,22 @@ def clean_instructor_name(name):
     return f"{last_name}{first_initial}_FTE.xlsx"
 
 
-def fte_per_faculty(data):
+def fte_per_faculty(data, faculty=None):
     """Prompts user for faculty name and then creates an excel sheet
     with FTE information for the courses for that faculty member
 
     Parameters
     ----------
-    faculty_data: pd.DataFrame
-        DataFrame to extract information from
-    course_tier: pd.DataFrame
+    data: pd.DataFrame
         DataFrame to extract information from
+    faculty: FacultyIndex
+        Name index of the data (built from data when not given)
     """
     
     print()
-    # Get unique faculty names for reference
-    faculty = sorted(data['Sec Faculty Info'].dropna().unique())
+    # Index of the unique faculty names, built once for all searches
+    if faculty is None:
+        faculty = FacultyIndex.from_frame(data)
     print(f"Found {len(faculty)} faculty members")
 
     go = True
@@ -89,7 +94,7 @@ def fte_per_faculty(data):
         if faculty_name.lower() == 'list':
             print("\nInstructors:")
             for i in range(0, len(faculty), 3):
-                names = faculty[i:i+3]
+                names = faculty.names[i:i+3]
                 print("  ".join(f"{name:<30}" for name in names))
             continue
 
@@ -97,16 +102,15 @@ def fte_per_faculty(data):
             print("Please enter a valid name.")
             continue
 
-        # Case-insensitive search for partial matches with standardized format
-        cleaned_input = clean_name_for_search(faculty_name)
-        matches = [f for f in faculty if cleaned_input
-                   in clean_name_for_search(f)]
+        # Case-insensitive search on name prefixes, then partial matches
+        matches = faculty.search(faculty_name)
         print(f"Found {len(matches)} matching instructors")
 
         if not matches:
             print(f"No instructors found matching '{faculty_name}'.")
             print("Try searching without periods (.) or check \
 the instructor list.")
+            continue
 
         if len(matches) > 1:
             print("\nMultiple instructors found:")
@@ -124,17 +128,63 @@ instructor (or press Enter to search again): ")
 
         go = False
 
+    faculty_fte_report(data, selected_faculty)
+
+
+def faculty_file_name(selected_faculty):
+    """Base of an instructor's report file name: the last name and first
+    initial, e.g. "FannA" for "A. Fann"
+
+    Parameters
+    ----------
+    selected_faculty: str
+        "Sec Faculty Info" value of the faculty member
+
+    Returns
+    -------
+    str
+    """
+    name_parts = selected_faculty.split()
+    if len(name_parts) >= 2:
+        return name_parts[1] + name_parts[0][0]  # lastname + first initial
+    return name_parts[0]  # fallback if only one name
+
+
+@instrument.traced(profile=True)
+def faculty_fte_report(data, selected_faculty, course_tier=None, out_dir=None,
+                       file_name=None):
+    """Creates the FTE excel sheet for one faculty member
+
+    Parameters
+    ----------
+    data: pd.DataFrame
+        DataFrame to extract information from
+    selected_faculty: str
+        "Sec Faculty Info" value of the faculty member
+    course_tier: TierTable
+        Tier table (default = None, tier_table.load())
+    out_dir: str
+        Directory for the file (default = None, the current one)
+    file_name: str
+        Base of the file name (default = None, faculty_file_name)
+
+    Returns
+    -------
+    str or None
+        Path of the file written, None if the faculty member has no
+        sections.
+    """
     print(f"\nProcessing data for: {selected_faculty}")
-        
-    name = selected_faculty
 
-    # Read FTE tier data
-    course_tier = pd.read_excel('FTE_Tier.xlsx')
+    # Read FTE tier data (loaded once per run)
+    if course_tier is None:
+        course_tier = tier_table.load()
 
-    # Filter data for the selected faculty
+    # Filter data for the selected faculty (one row per section already)
     frame = data[data["Sec Faculty Info"] == selected_faculty].copy()
-
-    frame = remove_duplicate_sections(frame)
+    if frame.empty:
+        print(f"No sections found for {selected_faculty}.")
+        return None
 
     # Select columns of interest
     frame = frame[[
@@ -147,11 +197,7 @@ instructor (or press Enter to search again): ")
     course_codes = sorted(get_course_codes(courses))
 
     # Create a safe filename
-    name_parts = selected_faculty.split()
-    if len(name_parts) >= 2:
-        filename = name_parts[1] + name_parts[0][0]  # lastname + first initial
-    else:
-        filename = name_parts[0]  # fallback if only one name
+    filename = file_name or faculty_file_name(selected_faculty)
 
     # Calculate enrollment percentage
     frame["Enrollment Per"] = calculate_enrollment_percentage(
@@ -162,15 +208,17 @@ instructor (or press Enter to search again): ")
         frame = generate_fte(frame, course_tier)
 
     # Create the Excel file
-    create_instructor_excel(
+    return create_instructor_excel(
         data=frame,
         name=filename,
         course_codes=course_codes,
-        instructor_name=selected_faculty
+        instructor_name=selected_faculty,
+        out_dir=out_dir
     )
 
 
-def create_instructor_excel(data, name, course_codes, instructor_name):
+def create_instructor_excel(data, name, course_codes, instructor_name,
+                            out_dir=None):
     """Creates an Excel report for instructor FTE data
 
     Parameters
@@ -183,6 +231,13 @@ def create_instructor_excel(data, name, course_codes, instructor_name):
         List of course codes to include
     instructor_name: str
         Name of the instructor for the report
+    out_dir: str
+        Directory for the file (default = None, the current one)
+
+    Returns
+    -------
+    str
+        Path of the file written
     """
    
     # Calculate totals
@@ -196,161 +251,109 @@ def create_instructor_excel(data, name, course_codes, instructor_name):
     else:
         filename = name.lower()
     filename += "_FTE.xlsx"
-    file_path = os.path.join(os.getcwd(), filename)
+    file_path = os.path.join(os.path.abspath(out_dir or os.getcwd()), filename)
+
+    # Write header row
+    headers = ["Instructor", "Course Code", "Sec Name", "X Sec Delivery Method",
+             "Meeting Times", "Capacity", "FTE Count", "Total FTE", "Sec Divisions"]
+
+    # Add Generated FTE column to headers
+    has_generated = "Generated FTE" in data.columns
+    if has_generated:
+        headers.append("Generated FTE")
+
+    # Index the rows by section name once instead of scanning per course
+    courses = CourseIndex.from_frame(data)
+
+    # Process each course
+    blocks = []
+    course_totals = []
+    course_generated_totals = []
+
+    for course in course_codes:
+        # Filter data for this course
+        course_data = data.iloc[courses.search(course)].copy()
+        course_data = course_data.sort_values(by=["Sec Name"])
+
+        # Handle #NUM! or missing values in Sec Divisions
+        divisions = course_data["Sec Divisions"]
+        divisions = divisions.where(divisions.notna() &
+                                    (divisions.astype(str) != "#NUM!"), "")
+
+        # One row per section, course code on the first one
+        block = pd.DataFrame({
+            "Instructor": "",
+            "Course Code": "",
+            "Sec Name": course_data["Sec Name"],
+            "X Sec Delivery Method": course_data["X Sec Delivery Method"],
+            "Meeting Times": course_data["Meeting Times"],
+            "Capacity": course_data["Capacity"],
+            "FTE Count": course_data["FTE Count"],
+            "Total FTE": course_data["Total FTE"],
+            "Sec Divisions": divisions
+        }, columns=headers)
+        if has_generated:
+            block["Generated FTE"] = course_data["Generated FTE"]
+        if len(block):
+            block.iloc[0, 1] = course
+
+        # Track course totals
+        course_total_fte = running_total(course_data["Total FTE"])
+        course_totals.append(course_total_fte)
+        total_row = {"Course Code": "Total", "Total FTE": course_total_fte}
+        if has_generated:
+            course_total_generated_fte = running_total(course_data["Generated FTE"])
+            course_generated_totals.append(course_total_generated_fte)
+            total_row["Generated FTE"] = course_total_generated_fte
+
+        # Put Total under Course Code column
+        blocks += [block, pd.DataFrame([total_row], columns=headers)]
+
+    # Update grand totals
+    grand_total_fte = running_total(course_totals)
+    grand_total_generated_fte = running_total(course_generated_totals)
+
+    grand_total_row = {col: "" for col in headers}
+    grand_total_row.update({"Course Code": "Total", "Total FTE": grand_total_fte})
+    if has_generated:
+        grand_total_row["Generated FTE"] = grand_total_generated_fte
+    blocks.append(pd.DataFrame([grand_total_row], columns=headers))
+
+    report = pd.concat(blocks, ignore_index=True)
+    report.iloc[0, 0] = instructor_name
+
+    # Format columns to appropriate width
+    column_widths = [
+        15,  # Instructor
+        12,  # Course Code
+        15,  # Sec Name
+        20,  # X Sec Delivery Method
+        40,  # Meeting Times
+        10,  # Capacity
+        10,  # FTE Count
+        10,  # Total FTE
+        15,  # Sec Divisions
+        15   # Generated FTE
+    ]
+
+    # Write the workbook in one pass, total row highlighted with a
+    # border above it
+    report_writer.write_report(
+        file_path, report,
+        widths=column_widths[:len(headers)],
+        total_row=True,
+        column_formats={"Total FTE": report_writer.NUMBER_FORMAT,
+                        "Generated FTE": report_writer.MONEY_FORMAT})
 
-    # Create Excel workbook
-    excel_options = {'nan_inf_to_errors': True}
-    with xlsxwriter.Workbook(file_path, excel_options) as workbook:
-        worksheet = workbook.add_worksheet()
-        
-        # Define formats
-        header_format = workbook.add_format({'bold': True})
-        number_format = workbook.add_format({'num_format': '#,##0.00'})
-        money_format = workbook.add_format({'num_format': '$#,##0.00'})
-        total_format = workbook.add_format({
-            'bold': True,
-            'bg_color': '#E0E0E0'
-        })
-        total_number_format = workbook.add_format({
-            'bold': True,
-            'bg_color': '#E0E0E0',
-            'num_format': '#,##0.00'
-        })
-        total_money_format = workbook.add_format({
-            'bold': True,
-            'bg_color': '#E0E0E0',
-            'num_format': '$#,##0.00'
-        })
-        
-        # Write header row
-        headers = ["Instructor", "Course Code", "Sec Name", "X Sec Delivery Method", 
-                 "Meeting Times", "Capacity", "FTE Count", "Total FTE", "Sec Divisions"]
-        
-        # Add Generated FTE column to headers
-        if "Generated FTE" in data.columns:
-            headers.append("Generated FTE")
-        
-        for col, header in enumerate(headers):
-            worksheet.write(0, col, header, header_format)
-        
-        # Track current row
-        current_row = 1
-        
-        # Write instructor name in first row, first column
-        worksheet.write(current_row, 0, instructor_name)
-        
-        # Process each course
-        grand_total_fte = 0
-        grand_total_generated_fte = 0
-        
-        for course in course_codes:
-            # Filter data for this course
-            course_data = data[data["Sec Name"].str.contains(course, case=False, na=False)].copy()
-            course_data = course_data.sort_values(by=["Sec Name"])
-            
-            # Write course code in first column
-            worksheet.write(current_row, 1, course)
-            
-            # Track course totals
-            course_total_fte = 0
-            course_total_generated_fte = 0
-            
-            # Process each section in the course
-            for _, row in course_data.iterrows():
-                # Calculate running totals
-                course_total_fte += row["Total FTE"]
-                if "Generated FTE" in data.columns:
-                    course_total_generated_fte += row["Generated FTE"]
-                
-                # Write row data
-                worksheet.write(current_row, 2, row["Sec Name"])
-                worksheet.write(current_row, 3, row["X Sec Delivery Method"])
-                worksheet.write(current_row, 4, row["Meeting Times"])
-                worksheet.write(current_row, 5, row["Capacity"])
-                worksheet.write(current_row, 6, row["FTE Count"])
-                worksheet.write_number(current_row, 7, row["Total FTE"], number_format)
-                
-                # Handle #NUM! or missing values in Sec Divisions
-                if pd.notna(row["Sec Divisions"]) and str(row["Sec Divisions"]) != "#NUM!":
-                    worksheet.write(current_row, 8, row["Sec Divisions"])
-                else:
-                    worksheet.write(current_row, 8, "")  # Write empty string for missing/error values
-                
-                # Write Generated FTE if available
-                if "Generated FTE" in data.columns:
-                    worksheet.write_number(current_row, 9, row["Generated FTE"], money_format)
-                
-                current_row += 1
-            
-            # Update grand totals
-            grand_total_fte += course_total_fte
-            grand_total_generated_fte += course_total_generated_fte
-            
-            # Write course total row
-            worksheet.write(current_row, 1, "Total")  # Put Total under Course Code column
-            worksheet.write_number(current_row, 7, course_total_fte, number_format)
-            
-            # Write Generated FTE course total if available
-            if "Generated FTE" in data.columns:
-                worksheet.write_number(current_row, 9, course_total_generated_fte, money_format)
-            
-            current_row += 1
-        
-        # Write grand total row
-        for col in range(len(headers)):
-            # Apply formatting to all cells in the Total row
-            if col == 1:  # Put Total in Course Code column (column B)
-                worksheet.write(current_row, col, "Total", total_format)
-            elif col == 7:  # Total FTE column
-                worksheet.write_number(current_row, col, grand_total_fte, total_number_format)
-            elif col == 9 and "Generated FTE" in data.columns:  # Generated FTE column
-                worksheet.write_number(current_row, col, grand_total_generated_fte, total_money_format)
-            else:
-                worksheet.write(current_row, col, "", total_format)
-        
-        # Format columns to appropriate width
-        column_widths = {
-            0: 15,  # Instructor
-            1: 12,  # Course Code
-            2: 15,  # Sec Name
-            3: 20,  # X Sec Delivery Method
-            4: 40,  # Meeting Times
-            5: 10,  # Capacity
-            6: 10,  # FTE Count
-            7: 10,  # Total FTE
-            8: 15,  # Sec Divisions
-            9: 15   # Generated FTE
-        }
-        
-        for col, width in column_widths.items():
-            if col < len(headers):
-                worksheet.set_column(col, col, width)
-    
-    # Open with openpyxl to add bottom border above total
-    wb = load_workbook(file_path)
-    ws = wb.active
-    
-    # Get last row (where the total is)
-    last_row = ws.max_row
-    
-    # Add a bottom border to cells before the total
-    if last_row > 2:  # Make sure there are rows before the total
-        for col in range(1, len(headers) + 1):
-            cell = ws.cell(row=last_row-1, column=col)
-            cell.border = Border(
-                bottom=Side(style='thin')
-            )
-    
-    wb.save(file_path)
-    
     # Print summary
     print(f"\nCreated file: {file_path}")
     print(f"Total FTE for {instructor_name}: {grand_total_fte:.2f}")
-    if "Generated FTE" in data.columns:
+    if has_generated:
         print(f"Total Generated FTE for {instructor_name}: ${grand_total_generated_fte:.2f}")
+    return file_path
 
 
-def get_course_frame(data, name, apply_filter=True):
+def get_course_frame(data, name, apply_filter=True, courses=None):
     """Extracts rows associated with a course code
 
     Parameters
@@ -360,26 +363,24 @@ def get_course_frame(data, name, apply_filter=True):
     name: str
         Course code to filter for.
     filter: bool (default = True)
-        If true, face-to-face courses will be filtered
+        Kept for compatibility; the Sections table from readfile()
+        already has one row per section so nothing is filtered.
+    courses: CourseIndex
+        Index of data (built from data when not given).
 
     Returns
     -------
     pd.DataFrame
-        All rows associated to the Course Code without face-to-face
-        classes with INET meeting times if filtered, else all rows.
+        All rows associated to the Course Code.
     """
 
     assert isinstance(data, pd.DataFrame)
     assert name is not None
 
     # Filter for matching course code
-    frame = data[data["Sec Name"].str.contains(name, case=False,
-                                               na=False)].copy()
-
-    if apply_filter:
-        frame = remove_duplicate_sections(frame)
-    else:
-        frame = remove_duplicate_sections(frame)
+    if courses is None:
+        courses = CourseIndex.from_frame(data)
+    frame = data.iloc[courses.search(name)].copy()
 
     return frame
 
@@ -388,6 +389,8 @@ def remove_duplicate_sections(frame):
     """
     Removes duplicate course section rows based on 'Sec Name'.
     Keeps the first entry for each section (regardless of delivery method).
+    Only needed for raw CSAR rows; readfile() already returns one row
+    per section.
 
     Parameters
     ----------
@@ -475,7 +478,8 @@ def total_ftes(data):
 
     return {}, 0
 
-def generate_fte(data, tier, support=1926):
+@instrument.traced()
+def generate_fte(data, tier, support=SUPPORT):
     """
     calculates generated FTE for a set of data and returns new dataframe
     containing generated fte
@@ -485,17 +489,22 @@ def generate_fte(data, tier, support=1926):
     data: pd.DataFrame
         DataFrame to calculate generated FTE for
 
-    tier: pd.DataFrame
-        DataFrame that holds the proposed funding lever for different
-        tiers
+    tier: TierTable | pd.DataFrame
+        Tier table (tier_table.load()) or the DataFrame that holds the
+        proposed funding lever for different tiers
+
+    support: int, optional
+        a fixed amount for institutional and academic support(default
+        is 1926)
 
     Returns
     -------
     pd.DataFrame
-        generate_fte: a new DataFrame that has the generated FTE
+        generate_fte: a new DataFrame that has the generated FTE and an
+        "Invalid FTE" column marking rows that were counted as 0
     """
     assert isinstance(data, pd.DataFrame)
-    assert isinstance(tier, pd.DataFrame)
+    assert isinstance(tier, (pd.DataFrame, TierTable))
 
     # Constant value used for calculating FTE
     try:
@@ -503,17 +512,16 @@ def generate_fte(data, tier, support=1926):
         if not isinstance(data, pd.DataFrame):
             raise TypeError(
                 "Parameter 'data' must be a pandas DataFrame.")
-        if not isinstance(tier, pd.DataFrame):
-            raise TypeError(
-                "Parameter 'tier' must be a pandas DataFrame.")
 
         # Check if required columns exist in 'tier'
-        required_tier_columns = ["Prefix/Course ID", "New Sector"]
-        for col in required_tier_columns:
-            if col not in tier.columns:
-                raise KeyError(
-                    f"Missing required column '{col}' in tier "
-                    f"DataFrame.")
+        if isinstance(tier, pd.DataFrame):
+            required_tier_columns = ["Prefix/Course ID", "New Sector"]
+            for col in required_tier_columns:
+                if col not in tier.columns:
+                    raise KeyError(
+                        f"Missing required column '{col}' in tier "
+                        f"DataFrame.")
+        tier = as_tier_table(tier)
 
         # Check if required columns exist in 'data'
         required_data_columns = ["Sec Name", "Total FTE"]
@@ -523,23 +531,29 @@ def generate_fte(data, tier, support=1926):
                     f"Missing required column '{col}' in data "
                     f"DataFrame.")
 
-        # create a dictionary to hold the course ID and their proposed
-        # funding
-        data["_Course Prefix"] = data["Sec Name"].str[:3]
-        data.loc[:, "_Course Prefix"] =\
-            data["_Course Prefix"].fillna("UNKNOWN")
-        courseid_to_funding = {
-            row["Prefix/Course ID"]: row["New Sector"]
-            for _, row in tier.iterrows()
-        }
-
-        # Apply computed generated FTE to for all rows in original
-        # DataFrame
-        data["Generated FTE"] = data.apply(
-            lambda row: compute_fte(row, courseid_to_funding, support),
-            axis=1)
-        data.drop(columns=["_Course Prefix"],
-                  inplace=True, errors="ignore")
+        # Rows without a usable section name or Total FTE generate 0,
+        # the same rule compute_fte applies to a single row
+        sec_name = data["Sec Name"]
+        total_fte = data["Total FTE"]
+        valid_name = sec_name.str.len().ge(3).fillna(False)
+        if pd.api.types.is_numeric_dtype(total_fte):
+            valid_fte = total_fte.notna()
+        else:
+            valid_fte = total_fte.map(
+                lambda x: isinstance(x, (int, float)) and not pd.isna(x))
+        data["Invalid FTE"] = ~(valid_name & valid_fte)
+
+        # Look up every prefix at once and apply the formula to the
+        # whole column
+        prop_fund = tier.funding_for(sec_name.str[:3])
+        generated = (prop_fund + support) * pd.to_numeric(
+            total_fte, errors="coerce")
+        data["Generated FTE"] = generated.where(~data["Invalid FTE"], 0)
+
+        invalid = int(data["Invalid FTE"].sum())
+        if invalid:
+            print(f"generate_fte: {invalid} row(s) with a missing section "
+                  f"name or Total FTE were counted as 0")
 
         return data
 
@@ -550,7 +564,7 @@ def generate_fte(data, tier, support=1926):
 
     return data.copy()
 
-def compute_fte(row, courseid_to_funding, support=1926):
+def compute_fte(row, courseid_to_funding, support=SUPPORT):
     """
     Computes the generate FTE for a single row in a dataframe
     :param row: pd.Series
@@ -612,7 +626,7 @@ def calculate_enrollment_percentage(count, capacity):
     if isinstance(capacity, pd.Series):
         # Replace any 0 values in the Series with NaN to prevent
         # division errors
-        capacity = capacity.replace(0, pd.NA)
+        capacity = capacity.where(capacity != 0)
 
     return ((count / capacity) * 100).round(1).astype(str) + "%"
 
@@ -621,8 +635,8 @@ def fte_faculty_submenu(faculty):
 
     Parameters
     ----------
-    faculty: list[str]
-        List of valid faculty names.
+    faculty: list[str] or FacultyIndex
+        Valid faculty names.
 
     Returns
     -------
@@ -630,6 +644,10 @@ def fte_faculty_submenu(faculty):
         The faculty member name, or "To be Announced",
          or None if the user quits
     """
+    # build the name index once for every search in this menu
+    if not isinstance(faculty, FacultyIndex):
+        faculty = FacultyIndex(faculty)
+
     keep_going = True
     while keep_going:
 
@@ -681,34 +699,21 @@ def find_faculty(search_for, to_search):
     ----------
     search_for: str
         The name to search for.
-    to_search: list[str]
-        The names to search.
+    to_search: list[str] or FacultyIndex
+        The names to search. Pass a FacultyIndex to reuse it between
+        searches.
 
     Returns
     -------
     None | list[str]
         If not found returns None. Else, returns a list of all matches.
     """
+    if not isinstance(to_search, FacultyIndex):
+        to_search = FacultyIndex(to_search)
 
-    # Search for an exact faculty match
-    name = [n for n in to_search if search_for == n]
-
-    # If no exact match, attempt to match last names
-    if not name:
-        try:
-            search_last = search_for.split()[1]  # Extract last name
-            name = [n for n in to_search if n.split()[1] == search_last]
-        except IndexError:
-            # If user only provided one name, check against last names
-            # in the list
-            name = [n for n in to_search if search_for == n.split()[1]]
-
-    # If still no match, compare first initials
-    if not name:
-        name = [n for n in to_search if search_for[0] == n[0]]
-
-    # Return None if no match found
-    return name if name else None
+    # exact name, then last name, then a typo-tolerant match within a
+    # bounded edit distance, then first initial (see FacultyIndex.find)
+    return to_search.find(search_for)
 
 def get_course_codes(courses):
     """Cuts the section portion out of course codes.
@@ -815,8 +820,8 @@ def fte_faculty_submenu(faculty):
 
     Parameters
     ----------
-    faculty: list[str]
-        List of valid faculty names.
+    faculty: list[str] or FacultyIndex
+        Valid faculty names.
 
     Returns
     -------
@@ -824,6 +829,10 @@ def fte_faculty_submenu(faculty):
         The faculty member name, or "To be Announced",
          or None if the user quits
     """
+    # build the name index once for every search in this menu
+    if not isinstance(faculty, FacultyIndex):
+        faculty = FacultyIndex(faculty)
+
     keep_going = True
     while keep_going:
 
@@ -0,0 +1,236 @@
+# -*- coding: utf-8 -*-
+"""
+Staleness check for the daily CSAR extract: which reports need running
+again since the last refresh.
+
+Every row of the extract is keyed by "Sec Name" and its meeting number
+and hashed (pandas.util.hash_pandas_object, one vectorized pass). The
+hashes are compared with the ones saved by the previous run to find the
+added, removed and changed rows. Only the sections they belong to get
+their Generated FTE computed again, and only the courses and divisions
+those sections are in get their totals added up again. The reports that
+show any of those keys are written to a change log so they can be run
+again.
+
+The state of the last run is kept in .csar_cache/refresh_state.pkl. It
+is only read by the next refresh: the reports themselves still compute
+their figures from the extract, so a refresh does not make them faster.
+"""
+import os
+import pickle
+import time
+
+import pandas as pd
+
+import fte_engine
+import functions as fn
+import tier_table
+from snapshot import CACHE_DIR, SNAPSHOT_VERSION
+
+
+STATE_FILE = os.path.join(CACHE_DIR, 'refresh_state.pkl')
+
+# Stale reports of every run are appended here
+CHANGE_LOG = 'stale_reports.csv'
+
+# Columns kept for every section between runs
+SECTION_COLUMNS = ['Sec Name', 'Course Code', 'Sec Divisions', 'Sec Faculty Info',
+                   'Section FTE', 'Generated FTE']
+
+
+def row_hashes(merged):
+    '''
+    Hashes the content of every CSAR row, keyed by section and meeting.
+
+    Parameters
+    ----------
+    merged : dataframe
+        Output of functions.merge_sources.
+
+    Returns
+    -------
+    dataframe
+        "Sec Name", "Meeting" (0, 1, ... in file order within the
+        section) and "Hash" (uint64).
+    '''
+    rows = merged.sort_values('Sec Name', kind='stable')
+    # categoricals hash by value, but plain text keeps old and new alike
+    content = rows.astype({col: str for col in rows.columns
+                           if isinstance(rows[col].dtype, pd.CategoricalDtype)})
+    return pd.DataFrame({
+        'Sec Name': rows['Sec Name'].to_numpy(),
+        'Meeting': rows.groupby('Sec Name').cumcount().to_numpy(),
+        'Hash': pd.util.hash_pandas_object(content, index=False).to_numpy(),
+    })
+
+
+def diff_rows(old, new):
+    '''
+    Compares two row_hashes tables.
+
+    Parameters
+    ----------
+    old, new : dataframe
+        Output of row_hashes for the previous and the current extract.
+
+    Returns
+    -------
+    dataframe
+        "Sec Name", "Meeting" and "Change" (added, removed or changed)
+        for every row that is not identical.
+    '''
+    both = old.merge(new, on=['Sec Name', 'Meeting'], how='outer',
+                     suffixes=(' Old', ' New'), indicator=True)
+    change = pd.Series('', index=both.index, dtype=object)
+    change[both['_merge'] == 'right_only'] = 'added'
+    change[both['_merge'] == 'left_only'] = 'removed'
+    change[(both['_merge'] == 'both') & (both['Hash Old'] != both['Hash New'])] = 'changed'
+    both['Change'] = change
+    return both.loc[change != '', ['Sec Name', 'Meeting', 'Change']].reset_index(drop=True)
+
+
+def section_fte(sections, tier):
+    '''
+    Per-section Total and Generated FTE.
+
+    Parameters
+    ----------
+    sections : dataframe
+        Sections to compute, one row each.
+    tier : TierTable
+
+    Returns
+    -------
+    dataframe
+        SECTION_COLUMNS, indexed by "Sec Name".
+    '''
+    data = fte_engine.compute_fte(sections, tier)
+    data = data[SECTION_COLUMNS].astype({'Course Code': object, 'Sec Divisions': object,
+                                         'Sec Faculty Info': object})
+    return data.set_index('Sec Name', drop=False)
+
+
+def _update_totals(totals, per_section, column, keys):
+    '''
+    Replaces the rows of keys in a totals table with fresh ones.
+    '''
+    keys = {key for key in keys if pd.notna(key)}
+    fresh = fte_engine.group_totals(per_section, column, keys)
+    kept = totals[~totals.index.isin(keys)]
+    return pd.concat([kept, fresh]).sort_index()
+
+
+def _stale_reports(touched):
+    '''
+    Reports that show any of the touched sections.
+    '''
+    stale = []
+    for report, column in [('FTE by Division', 'Sec Divisions'),
+                           ('FTE by Course', 'Course Code'),
+                           ('FTE per Instructor', 'Sec Faculty Info')]:
+        counts = touched.dropna(subset=[column]).groupby(column)['Sec Name'].nunique()
+        for key, count in counts.items():
+            stale.append({'Report': report, 'Key': key, 'Sections Changed': count})
+    return pd.DataFrame(stale, columns=['Report', 'Key', 'Sections Changed'])
+
+
+def load_state(state_file=STATE_FILE):
+    '''
+    The state saved by the previous refresh, None if there is none.
+    '''
+    try:
+        with open(state_file, 'rb') as file:
+            return pickle.load(file)
+    except (OSError, pickle.PickleError, EOFError):
+        return None
+
+
+def save_state(state, state_file=STATE_FILE):
+    '''
+    Saves the refresh state atomically.
+    '''
+    os.makedirs(os.path.dirname(state_file) or '.', exist_ok=True)
+    tmp_path = state_file + '.tmp'
+    with open(tmp_path, 'wb') as file:
+        pickle.dump(state, file)
+    os.replace(tmp_path, state_file)
+
+
+def refresh(sources=fn.SOURCE_FILES, state_file=STATE_FILE,
+            log_file=CHANGE_LOG, tier_path=tier_table.TIER_FILE):
+    '''
+    Finds the reports made stale since the last refresh, keeping its own
+    per-section FTE and course/division totals up to date with the
+    current extract by recomputing only what changed. The report
+    functions do not read these totals.
+
+    Parameters
+    ----------
+    sources : tuple[str]
+        The CSAR extract and the contact hours workbook.
+    state_file : str
+        Where the previous run's state is kept.
+    log_file : str
+        CSV the stale reports are appended to (None to skip).
+    tier_path : str
+        Tier funding workbook; when it changes everything is recomputed.
+
+    Returns
+    -------
+    dict
+        "changes" (diff_rows output), "stale" (reports to run again),
+        "sections", "courses" and "divisions" (the updated tables).
+    '''
+    tier = tier_table.load(tier_path)
+    tier_stat = os.stat(tier_path)
+    tier_signature = (tier_stat.st_mtime_ns, tier_stat.st_size)
+
+    merged = fn.merge_sources(sources=sources)
+    hashes = row_hashes(merged)
+    sections = fn.split_sections(merged)[0].set_index('Sec Name', drop=False)
+
+    state = load_state(state_file)
+    if (state is None or state['tier'] != tier_signature
+            or state.get('version') != SNAPSHOT_VERSION):
+        # first run, new funding levels or new code: everything counts as added
+        old_hashes = hashes.iloc[:0]
+        per_section = section_fte(sections.iloc[:0], tier)
+        courses = fte_engine.group_totals(per_section, 'Course Code')
+        divisions = fte_engine.group_totals(per_section, 'Sec Divisions')
+    else:
+        old_hashes = state['hashes']
+        per_section = state['sections']
+        courses = state['courses']
+        divisions = state['divisions']
+
+    changes = diff_rows(old_hashes, hashes)
+    touched_names = changes['Sec Name'].unique()
+
+    # the old and the new course/division/instructor of a section go stale
+    before = per_section[per_section.index.isin(touched_names)]
+    recomputed = section_fte(sections[sections.index.isin(touched_names)], tier)
+    touched = pd.concat([before, recomputed], ignore_index=True)
+
+    per_section = pd.concat([per_section[~per_section.index.isin(touched_names)],
+                             recomputed]).sort_index()
+    courses = _update_totals(courses, per_section, 'Course Code', touched['Course Code'])
+    divisions = _update_totals(divisions, per_section, 'Sec Divisions',
+                               touched['Sec Divisions'])
+
+    stale = _stale_reports(touched)
+    save_state({'hashes': hashes, 'sections': per_section, 'courses': courses,
+                'divisions': divisions, 'tier': tier_signature,
+                'version': SNAPSHOT_VERSION}, state_file)
+
+    if log_file and len(stale):
+        logged = stale.assign(Refreshed=time.strftime('%Y-%m-%d %H:%M:%S'))
+        logged.to_csv(log_file, mode='a', index=False,
+                      header=not os.path.exists(log_file))
+
+    counts = changes['Change'].value_counts()
+    print(f"{counts.get('added', 0)} rows added, {counts.get('removed', 0)} removed, "
+          f"{counts.get('changed', 0)} changed; {len(recomputed)} sections recomputed, "
+          f"{len(stale)} reports stale")
+
+    return {'changes': changes, 'stale': stale, 'sections': per_section,
+            'courses': courses, 'divisions': divisions}
@@ -0,0 +1,267 @@
+# -*- coding: utf-8 -*-
+"""
+Everything the Streamlit pages show, computed once per data version.
+
+Streamlit reruns app.py from the top on every click. ReportCache is built
+once for a load of the data (app.py caches it by the source files' size
+and modification time): the option lists, Generated FTE and enrollment
+for every section, the row positions of every division, course and
+instructor, their FTE totals, and the division by delivery method by
+tier FTE cube. A page then only slices those rows, and each report is
+built the first time it is asked for and kept.
+
+DownloadCache keeps the Excel workbooks of the reports downloaded so far,
+so a report is only written to xlsx when someone asks for it, and once
+for every session until the data changes.
+"""
+import io
+import os
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+import fte_engine
+import functions as fn
+import option4 as opfour
+import tier_table
+import web_functions as wf
+from faculty_index import FacultyIndex
+
+
+# Course code as the web division report has always extracted it
+DIVISION_COURSE_PATTERN = r'([A-Z]+-\d+)'
+
+# Workbooks kept for downloads, in bytes, across every session
+DOWNLOAD_CACHE_BYTES = 64 * 1024 * 1024
+
+
+def data_version(paths=fn.SOURCE_FILES + (tier_table.TIER_FILE,)):
+    '''
+    Size and modification time of the source files; changes whenever
+    one of them is replaced.
+
+    Returns
+    -------
+    tuple
+    '''
+    version = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+            version.append((path, stat.st_mtime_ns, stat.st_size))
+        except OSError:
+            version.append((path, None, None))
+    return tuple(version)
+
+
+class ReportCache:
+    '''
+    Precomputed FTE of every section and the reports built from it.
+
+    Parameters
+    ----------
+    sections : dataframe
+        One row per section (functions.read_tables).
+    fte_tier : TierTable or dataframe
+        Tier funding table.
+    '''
+
+    def __init__(self, sections, fte_tier):
+        data = sections.copy()
+        data.columns = data.columns.str.strip()
+        self.sections = data
+        self.fte_tier = fte_tier
+
+        # option lists, in the order the pages have always shown them
+        self.divisions = list(data['Sec Divisions'].dropna().unique())
+        self.sec_names = list(data['Sec Name'].dropna().unique())
+        self.faculty = FacultyIndex.from_frame(data).names
+
+        # Generated FTE and enrollment of every section, once
+        self.fte = fte_engine.compute_fte(data, fte_tier)
+        self.enrollment = wf.enrollment_percentages(data)
+        self.faculty_enrollment = opfour.calculate_enrollment_percentage(
+            data['FTE Count'], data['Capacity'])
+
+        # row positions of every key, from one groupby per column
+        self._rows = {column: self.fte.groupby(column, sort=False, observed=True).indices
+                      for column in ['Sec Divisions', 'Course Code',
+                                     'Sec Faculty Info', 'Sec Name']}
+
+        self.by_division = fte_engine.group_totals(self.fte, 'Sec Divisions')
+        self.by_course = fte_engine.group_totals(self.fte, 'Course Code')
+        self.by_instructor = fte_engine.group_totals(self.fte, 'Sec Faculty Info')
+        # division x delivery method x tier, for the dashboard
+        self.cube_sections = fte_engine.cube_sections(data, fte_tier)
+        self.cube = fte_engine.fte_cube(self.cube_sections)
+
+        self._reports = {}
+
+    def rows(self, column, key):
+        '''
+        Positions of the sections whose column equals key.
+        '''
+        return self._rows[column].get(key, [])
+
+    def _memo(self, report, column, key, build):
+        '''
+        Builds a report once per key. Only keys found in column are kept,
+        so free text typed into a page can not grow the cache, which is
+        shared by every session.
+        '''
+        if (report, key) in self._reports:
+            return self._reports[(report, key)]
+        result = build()
+        if key in self._rows[column]:
+            self._reports[(report, key)] = result
+        return result
+
+    def division_sections(self, division):
+        '''
+        The division's sections, as the Sec Division Report shows them.
+        '''
+        return self.sections.iloc[self.rows('Sec Divisions', division)]
+
+    def enrollment_rows(self, sec_name):
+        '''
+        The section with its "Enrollment Percentage".
+        '''
+        rows = self.rows('Sec Name', sec_name)
+        filtered = self.sections.iloc[rows].copy()
+        filtered["Enrollment Percentage"] = self.enrollment.iloc[rows]
+        return filtered
+
+    def division_report(self, division):
+        '''
+        FTE by Division for one division.
+
+        Returns
+        -------
+        tuple
+            (formatted report, Total FTE, Generated FTE), or
+            (None, 0, 0) for an unknown division.
+        '''
+        division = division.upper()
+
+        def build():
+            div_data = self.fte.iloc[self.rows('Sec Divisions', division)]
+            if div_data.empty:
+                return None, 0, 0
+            div_data = div_data.copy()
+            div_data['Course Code'] = div_data['Sec Name'].str.extract(
+                DIVISION_COURSE_PATTERN)
+            div_data = div_data.sort_values(['Course Code', 'Sec Name'])
+            raw_df, original, generated = wf.division_rows(div_data, division)
+            return wf.format_fte_output(raw_df, original, generated), original, generated
+        return self._memo('division', 'Sec Divisions', division, build)
+
+    def course_report(self, course_code):
+        '''
+        FTE per Course for one course code.
+
+        Returns
+        -------
+        tuple
+            (report, Total FTE, Generated FTE), or (None, 0, 0) when the
+            course has no sections.
+        '''
+        code = course_code.strip().upper()
+
+        def build():
+            filtered = self.fte.iloc[self.rows('Course Code', code)]
+            if filtered.empty:
+                return None, 0, 0
+            return wf.course_rows(filtered.copy())
+        return self._memo('course', 'Course Code', code, build)
+
+    def faculty_report(self, faculty_name):
+        '''
+        FTE per Instructor for one "Sec Faculty Info" value.
+
+        Returns
+        -------
+        tuple
+            (report, Total FTE, Generated FTE)
+        '''
+        def build():
+            rows = self.rows('Sec Faculty Info', faculty_name)
+            frame = self.sections.iloc[rows].copy()
+            frame["Enrollment Per"] = self.faculty_enrollment.iloc[rows]
+            frame["Generated FTE"] = self.fte['Generated FTE'].iloc[rows]
+            return wf.faculty_rows(frame.sort_values("Sec Name"))
+        return self._memo('faculty', 'Sec Faculty Info', faculty_name, build)
+
+
+def excel_bytes(frame, sheet_name='Full Report'):
+    '''
+    A report as the bytes of an xlsx workbook with one sheet.
+
+    Returns
+    -------
+    bytes
+    '''
+    output = io.BytesIO()
+    with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
+        frame.to_excel(writer, sheet_name=sheet_name, index=False)
+    return output.getvalue()
+
+
+class DownloadCache:
+    '''
+    Workbooks already written for download, least recently used dropped
+    first once they add up to more than max_bytes. Safe to share between
+    the sessions of a Streamlit server.
+
+    Parameters
+    ----------
+    max_bytes : int
+        Total size of the workbooks kept (default is DOWNLOAD_CACHE_BYTES).
+    '''
+
+    def __init__(self, max_bytes=DOWNLOAD_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._items
+
+    def __len__(self):
+        return len(self._items)
+
+    def get(self, key, build):
+        '''
+        The bytes kept for key, or those build() returns, which are kept.
+
+        Parameters
+        ----------
+        key : tuple
+            e.g. (report type, division or instructor, data version).
+        build : callable
+            Writes the workbook; only called when key is not kept.
+
+        Returns
+        -------
+        bytes
+        '''
+        with self._lock:
+            if key in self._items:
+                self._items.move_to_end(key)
+                return self._items[key]
+
+        # written outside the lock so other downloads are not held up
+        data = build()
+        if len(data) > self.max_bytes:
+            return data
+
+        with self._lock:
+            if key not in self._items:
+                self._items[key] = data
+                self.size += len(data)
+            while self.size > self.max_bytes:
+                _, dropped = self._items.popitem(last=False)
+                self.size -= len(dropped)
+        return data
@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+"""
+Single-pass Excel writer shared by every report.
+
+Column widths are worked out from the dataframe itself and the header,
+total-row, border and number formats are applied while xlsxwriter writes
+the sheet, so each file is serialized exactly once (no reopening it with
+openpyxl afterwards).
+"""
+import pandas as pd
+
+import instrument
+
+
+# Look of the grand total row and the row just above it
+TOTAL_FORMAT = {'bold': True, 'bg_color': '#E0E0E0'}
+BORDER_FORMAT = {'bottom': 1}
+
+MONEY_FORMAT = '$#,##0.00'
+NUMBER_FORMAT = '#,##0.00'
+
+
+def column_widths(frame, padding=2):
+    '''
+    Width of every column: the longest value or header plus padding.
+
+    Parameters
+    ----------
+    frame : dataframe
+        Data that will be written.
+    padding : int
+        Extra characters added to each column (default is 2).
+
+    Returns
+    -------
+    list[int]
+        One width per column.
+    '''
+    widths = []
+    for col in frame.columns:
+        longest = frame[col].astype(str).str.len().max() if len(frame) else 0
+        widths.append(int(max(longest, len(str(col)))) + padding)
+    return widths
+
+
+class _Formats:
+    '''
+    Creates each distinct xlsxwriter format only once per sheet.
+    '''
+
+    def __init__(self, workbook):
+        self.workbook = workbook
+        self.cache = {}
+
+    def get(self, *parts):
+        properties = {}
+        for part in parts:
+            if part:
+                properties.update(part)
+        if not properties:
+            return None
+        key = tuple(sorted(properties.items()))
+        if key not in self.cache:
+            self.cache[key] = self.workbook.add_format(properties)
+        return self.cache[key]
+
+
+def _rewrite_row(worksheet, row, values, formats, cell_formats):
+    '''
+    Writes one row again with its own format on every cell.
+    '''
+    for col, value in enumerate(values):
+        fmt = formats.get(*cell_formats[col])
+        if not isinstance(value, str) and pd.isna(value):
+            worksheet.write_blank(row, col, None, fmt)
+        else:
+            worksheet.write(row, col, value, fmt)
+
+
+def write_sheet(writer, frame, sheet_name='Sheet1', widths=None,
+                total_row=False, column_formats=None, autofilter=False):
+    '''
+    Writes a dataframe to one sheet of an open xlsxwriter ExcelWriter.
+
+    Parameters
+    ----------
+    writer : pandas.ExcelWriter
+        Writer opened with engine='xlsxwriter'.
+    frame : dataframe
+        Data to write.
+    sheet_name : str
+        Name of the sheet (default is 'Sheet1').
+    widths : list[int]
+        Column widths (default is column_widths(frame)).
+    total_row : bool
+        Make the last row bold and grey with a border above it
+        (default is False).
+    column_formats : dict[str, str]
+        Number format for named columns, e.g. {'Generated FTE': MONEY_FORMAT}.
+    autofilter : bool
+        Add Excel's sort/filter buttons to the header row (default is
+        False).
+
+    Returns
+    -------
+    None
+    '''
+    frame = frame.reset_index(drop=True)
+    frame.to_excel(writer, sheet_name=sheet_name, index=False)
+
+    worksheet = writer.sheets[sheet_name]
+    formats = _Formats(writer.book)
+
+    if widths is None:
+        widths = column_widths(frame)
+    column_formats = column_formats or {}
+    number_formats = [{'num_format': column_formats[col]} if col in column_formats
+                      else None for col in frame.columns]
+
+    for idx, width in enumerate(widths):
+        worksheet.set_column(idx, idx, width, formats.get(number_formats[idx]))
+
+    # Excel row of the last data row (row 0 is the header)
+    last_row = len(frame)
+    if autofilter and len(frame.columns):
+        worksheet.autofilter(0, 0, last_row, len(frame.columns) - 1)
+    if total_row and last_row > 0:
+        _rewrite_row(worksheet, last_row, frame.iloc[-1].tolist(), formats,
+                     [(fmt, TOTAL_FORMAT) for fmt in number_formats])
+
+        # Add a bottom border to the row before the total
+        if last_row > 1:
+            _rewrite_row(worksheet, last_row - 1, frame.iloc[-2].tolist(), formats,
+                         [(fmt, BORDER_FORMAT) for fmt in number_formats])
+
+
+def write_workbook(filename, sheets):
+    '''
+    Writes several sheets to one workbook in a single pass.
+
+    Parameters
+    ----------
+    filename : str or file-like
+        Where to save the workbook.
+    sheets : list[tuple]
+        (sheet_name, frame, options) for every sheet, where options are
+        keyword arguments for write_sheet.
+
+    Returns
+    -------
+    None
+    '''
+    rows = sum(len(frame) for _, frame, _ in sheets)
+    with instrument.span('write_workbook', rows_in=rows), \
+            pd.ExcelWriter(filename, engine='xlsxwriter',
+                           engine_kwargs={'options': {'nan_inf_to_errors': True}}) as writer:
+        for sheet_name, frame, options in sheets:
+            write_sheet(writer, frame, sheet_name, **options)
+
+
+def write_report(filename, frame, sheet_name='Sheet1', **options):
+    '''
+    Writes a single-sheet report.
+
+    Parameters
+    ----------
+    filename : str or file-like
+        Where to save the workbook.
+    frame : dataframe
+        Data to write.
+    sheet_name : str
+        Name of the sheet (default is 'Sheet1').
+    **options
+        Keyword arguments for write_sheet (widths, total_row,
+        column_formats, autofilter).
+
+    Returns
+    -------
+    None
+    '''
+    write_workbook(filename, [(sheet_name, frame, options)])
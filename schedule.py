@@ -0,0 +1,436 @@
+# -*- coding: utf-8 -*-
+"""
+Schedule analyses built on the parsed Meetings table.
+
+Every timed meeting is expanded into one interval per weekday it meets
+(start/end minutes past midnight plus its date range). Overlaps inside a
+group (a room, an instructor, ...) are found with a sweep over the
+intervals sorted by start time: after one sort, np.searchsorted gives
+for every interval the block of later intervals that start before it
+ends, so the whole college is checked in O(n log n + conflicts) instead
+of comparing every pair.
+"""
+import numpy as np
+import pandas as pd
+import instrument
+import report_writer
+from meeting_times import BUILDING, DAY_BITS, ROOM, day_names
+
+
+# Rooms that are not physical spaces and can not be double-booked
+VIRTUAL_ROOMS = ('INET', 'VIRT', 'TBA')
+
+# Hours a room is available each weekday (8:00 AM to 10:00 PM)
+ROOM_DAY_START = 8 * 60
+ROOM_DAY_END = 22 * 60
+
+# Utilization limits for the "Status" column of the room report
+UNDER_USED = 25
+OVER_USED = 85
+
+# Weekly contact hours above which an instructor is reported as over the cap
+MAX_CONTACT_HOURS = 30
+
+# np.busday_count week mask for each bit of the Days column (Mon..Sun)
+_WEEKDAY_ORDER = ['M', 'T', 'W', 'TH', 'F', 'S', 'SU']
+
+_MINUTES_PER_DAY = 24 * 60
+
+
+def _week_mask(days):
+    '''
+    Converts a Days bitmask to a '1010000' style numpy week mask.
+    '''
+    return ''.join('1' if days & DAY_BITS[day] else '0' for day in _WEEKDAY_ORDER)
+
+
+def _in_physical_room(frame):
+    '''
+    Mask of the rows held in a real room (not online or TBA).
+    '''
+    return (frame['Building'].notna() & frame['Room'].notna()
+            & ~frame['Room'].isin(VIRTUAL_ROOMS)
+            & ~frame['Building'].isin(VIRTUAL_ROOMS))
+
+
+def meeting_intervals(meetings):
+    '''
+    Expands the timed meetings into one interval per meeting day.
+
+    Meetings without a start/end time (TBA, online) or whose end is not
+    after their start are left out.
+
+    Parameters
+    ----------
+    meetings : dataframe
+        Meetings table with the parsed Meeting Times columns.
+
+    Returns
+    -------
+    dataframe
+        The meeting's columns plus "Day" (M, T, ... SU), "Start" and
+        "End" as plain integer minutes.
+    '''
+    start = meetings['Start Minute']
+    end = meetings['End Minute']
+    timed = meetings[start.notna() & end.notna() & (meetings['Days'] > 0)]
+    timed = timed[timed['End Minute'] > timed['Start Minute']]
+
+    days = timed['Days'].to_numpy()
+    pieces = []
+    for day, bit in DAY_BITS.items():
+        on_day = timed[(days & bit) > 0]
+        pieces.append(on_day.assign(Day=day))
+    intervals = pd.concat(pieces, ignore_index=True)
+
+    intervals['Start'] = intervals['Start Minute'].to_numpy(dtype=np.int64)
+    intervals['End'] = intervals['End Minute'].to_numpy(dtype=np.int64)
+    return intervals
+
+
+def overlapping_pairs(intervals, by):
+    '''
+    Finds every pair of intervals in the same group that overlap in both
+    time of day and date range.
+
+    Parameters
+    ----------
+    intervals : dataframe
+        Output of meeting_intervals (optionally with extra columns).
+    by : list[str]
+        Columns that define a group, e.g. ['Building', 'Room', 'Day'].
+
+    Returns
+    -------
+    left, right : dataframe
+        Rows of intervals for the first and second member of each pair,
+        aligned by position. Pairs within the same section are skipped.
+    '''
+    frame = intervals.sort_values(by + ['Start'], kind='stable')
+    frame = frame.reset_index(drop=True)
+    group = frame.groupby(by, sort=False, observed=True).ngroup()
+    group = group.to_numpy(dtype=np.int64)
+
+    # one sorted key per interval; groups never share a key range
+    span = _MINUTES_PER_DAY + 1
+    keys = group * span + frame['Start'].to_numpy()
+    ends = group * span + frame['End'].to_numpy()
+
+    # intervals after i that start before i ends overlap it in time
+    first = np.arange(len(frame))
+    stop = np.searchsorted(keys, ends, side='left')
+    count = np.maximum(stop - first - 1, 0)
+
+    left = np.repeat(first, count)
+    offset = np.arange(count.sum()) - np.repeat(np.cumsum(count) - count, count)
+    right = left + 1 + offset
+
+    a = frame.iloc[left].reset_index(drop=True)
+    b = frame.iloc[right].reset_index(drop=True)
+
+    # same days and times only clash when the date ranges overlap too
+    keep = ((a['Start Date'] <= b['End Date']) & (b['Start Date'] <= a['End Date'])
+            & (a['Sec Name'] != b['Sec Name']))
+    return a[keep].reset_index(drop=True), b[keep].reset_index(drop=True)
+
+
+def _time_label(minutes):
+    '''
+    Formats minutes past midnight as hh:mmAM/PM.
+    '''
+    hours, mins = divmod(int(minutes), 60)
+    return f"{(hours - 1) % 12 + 1:02d}:{mins:02d}{'PM' if hours >= 12 else 'AM'}"
+
+
+def _pair_report(left, right, keys):
+    '''
+    One row per conflicting pair with the days they clash on joined.
+    '''
+    pairs = pd.DataFrame({col: left[col].astype(str) for col in keys})
+    pairs['Sec Name'] = left['Sec Name'].to_numpy()
+    pairs['Meeting Times'] = left['Meeting Times'].to_numpy()
+    pairs['Conflicts With'] = right['Sec Name'].to_numpy()
+    pairs['Other Meeting Times'] = right['Meeting Times'].to_numpy()
+    overlap = (np.minimum(left['End'], right['End'])
+               - np.maximum(left['Start'], right['Start']))
+    pairs['Overlap Start'] = [_time_label(m) for m in
+                              np.maximum(left['Start'], right['Start'])]
+    pairs['Overlap Minutes'] = overlap.to_numpy()
+    pairs['Day'] = left['Day'].map(DAY_BITS).to_numpy()
+
+    # the same two meetings clash on each of their shared days
+    columns = [col for col in pairs.columns if col != 'Day']
+    report = pairs.groupby(columns, sort=False)['Day'].sum().reset_index()
+    report['Days'] = [''.join(day_names(mask)) for mask in report.pop('Day')]
+    return report[keys + ['Days'] + columns[len(keys):]]
+
+
+def double_bookings(meetings):
+    '''
+    Lists the sections that share a physical room at the same time.
+
+    Parameters
+    ----------
+    meetings : dataframe
+        Meetings table with the parsed Meeting Times columns.
+
+    Returns
+    -------
+    dataframe
+        One row per pair of clashing sections with the room, the days
+        they clash on, both meeting lines and the minutes of overlap.
+    '''
+    intervals = meeting_intervals(meetings)
+    physical = intervals[_in_physical_room(intervals)]
+
+    left, right = overlapping_pairs(physical, ['Building', 'Room', 'Day'])
+    return _pair_report(left, right, ['Building', 'Room'])
+
+
+def room_utilization(meetings, conflicts=None):
+    '''
+    Works out how much of the term each physical room is booked.
+
+    Booked hours count every date a meeting actually falls on between its
+    start and end date. Available hours are the weekdays of the whole
+    term (first to last meeting date) times the room day, 8 AM to 10 PM.
+    Double-booked time is counted for each section, so a room can go over
+    100%.
+
+    Parameters
+    ----------
+    meetings : dataframe
+        Meetings table with the parsed Meeting Times columns.
+    conflicts : dataframe
+        Output of double_bookings, computed when not given.
+
+    Returns
+    -------
+    dataframe
+        One row per room, busiest first.
+    '''
+    rooms = meetings[meetings['Start Minute'].notna()
+                     & (meetings['End Minute'] > meetings['Start Minute'])
+                     & meetings['Start Date'].notna()
+                     & _in_physical_room(meetings)].copy()
+
+    if rooms.empty:
+        return pd.DataFrame(columns=['Building', 'Room', 'Sections', 'Meetings',
+                                     'Booked Hours', 'Available Hours',
+                                     'Utilization %', 'Double Bookings', 'Status'])
+
+    # dates each meeting really happens on, one busday_count per day pattern
+    first = rooms['Start Date'].to_numpy(dtype='datetime64[D]')
+    last = rooms['End Date'].to_numpy(dtype='datetime64[D]') + 1
+    occurrences = np.zeros(len(rooms), dtype=np.int64)
+    days = rooms['Days'].to_numpy()
+    for pattern in np.unique(days):
+        same = days == pattern
+        occurrences[same] = np.busday_count(first[same], last[same],
+                                            weekmask=_week_mask(pattern))
+
+    duration = (rooms['End Minute'] - rooms['Start Minute']).to_numpy(dtype=np.int64)
+    rooms['Booked'] = occurrences * duration
+    rooms['Building'] = rooms['Building'].astype(str)
+    rooms['Room'] = rooms['Room'].astype(str)
+
+    report = rooms.groupby(['Building', 'Room']).agg(
+        Sections=('Sec Name', 'nunique'),
+        Meetings=('Sec Name', 'size'),
+        Booked=('Booked', 'sum')).reset_index()
+
+    term_days = np.busday_count(first.min(), last.max(), weekmask='1111100')
+    available = term_days * (ROOM_DAY_END - ROOM_DAY_START)
+
+    if conflicts is None:
+        conflicts = double_bookings(meetings)
+    clashes = conflicts.groupby(['Building', 'Room']).size().rename('Double Bookings')
+
+    report['Booked Hours'] = (report.pop('Booked') / 60).round(2)
+    report['Available Hours'] = round(available / 60, 2)
+    report['Utilization %'] = (report['Booked Hours'] / report['Available Hours']
+                               * 100).round(2)
+    report = report.join(clashes, on=['Building', 'Room'])
+    report['Double Bookings'] = report['Double Bookings'].fillna(0).astype(int)
+    report['Status'] = np.select(
+        [report['Utilization %'] >= OVER_USED, report['Utilization %'] < UNDER_USED],
+        ['Over-used', 'Under-used'], '')
+
+    return report.sort_values('Utilization %', ascending=False,
+                              kind='stable').reset_index(drop=True)
+
+
+@instrument.traced(profile=True)
+def room_report(meetings, excel_filename='room_utilization.xlsx'):
+    '''
+    Writes the room utilization and double booking report to Excel.
+
+    Parameters
+    ----------
+    meetings : dataframe
+        Meetings table with the parsed Meeting Times columns.
+    excel_filename : str
+        Workbook to write (default is 'room_utilization.xlsx').
+
+    Returns
+    -------
+    utilization, conflicts : dataframe
+    '''
+    try:
+        conflicts = double_bookings(meetings)
+        utilization = room_utilization(meetings, conflicts)
+
+        report_writer.write_workbook(excel_filename, [
+            ('Room Utilization', utilization, {'autofilter': True}),
+            ('Double Bookings', conflicts, {'autofilter': True}),
+        ])
+
+        over = (utilization['Status'] == 'Over-used').sum()
+        under = (utilization['Status'] == 'Under-used').sum()
+        print(f"{len(utilization)} rooms: {over} over-used, {under} under-used, "
+              f"{len(conflicts)} double bookings")
+        print(f"Room report saved as {excel_filename}")
+        return utilization, conflicts
+
+    except PermissionError:
+        print(f"Close {excel_filename} and try again.")
+    except KeyError as err:
+        print(f"Meeting data is missing a column: {err}")
+    return None, None
+
+
+def _teaching(sections):
+    '''
+    One row per (section, instructor) from "Sec Faculty Info", which
+    lists co-teachers as "A. Fann, J. Jones" and cuts long lists short
+    with " (more)". The name cut off before " (more)" is dropped, as is
+    any name without a last name.
+    '''
+    teaching = sections[['Sec Name', 'Sec Faculty Info', 'Contact Hours']].copy()
+    names = teaching.pop('Sec Faculty Info').astype(object)
+    # "A. Fann, J. Jo (more)": the last co-teacher's name is incomplete
+    names = names.str.replace(r',[^,]*\(more\)\s*$', '', regex=True)
+    names = names.str.replace(r'\s*\(more\)\s*$', '', regex=True)
+    teaching['Instructor'] = names.str.split(',')
+    teaching = teaching.explode('Instructor')
+    teaching['Instructor'] = teaching['Instructor'].str.strip()
+    # an initial alone ("J.") is what is left of a cut-off name
+    named = teaching['Instructor'].str.contains(r'\S\s+\S', regex=True, na=False)
+    return teaching[named].reset_index(drop=True)
+
+
+def instructor_conflicts(sections, meetings):
+    '''
+    Lists the meetings an instructor is booked into at the same time.
+
+    Parameters
+    ----------
+    sections : dataframe
+        Sections table (readfile()).
+    meetings : dataframe
+        Meetings table with the parsed Meeting Times columns.
+
+    Returns
+    -------
+    dataframe
+        One row per clashing pair of meetings with the instructor, the
+        days they clash on, both meeting lines, the minutes of overlap
+        and whether both are in the same room (usually a combined class).
+    '''
+    teaching = _teaching(sections)[['Sec Name', 'Instructor']]
+    intervals = meeting_intervals(meetings).merge(teaching, on='Sec Name')
+
+    left, right = overlapping_pairs(intervals, ['Instructor', 'Day'])
+    report = _pair_report(left, right, ['Instructor'])
+
+    place = slice(BUILDING.start, ROOM.stop)
+    report['Same Room'] = (report['Meeting Times'].str[place]
+                           == report['Other Meeting Times'].str[place])
+    return report
+
+
+def instructor_load(sections, conflicts, max_hours=MAX_CONTACT_HOURS):
+    '''
+    Totals the weekly contact hours and schedule conflicts of every
+    instructor.
+
+    Parameters
+    ----------
+    sections : dataframe
+        Sections table (readfile()).
+    conflicts : dataframe
+        Output of instructor_conflicts.
+    max_hours : float
+        Weekly contact hour cap (default is MAX_CONTACT_HOURS).
+
+    Returns
+    -------
+    dataframe
+        One row per instructor with Sections, Contact Hours, Conflicts,
+        Over Cap and a short Exceptions note, the most urgent first.
+    '''
+    teaching = _teaching(sections)
+    teaching['Contact Hours'] = pd.to_numeric(teaching['Contact Hours'],
+                                              errors='coerce').fillna(0)
+
+    load = teaching.groupby('Instructor').agg(
+        Sections=('Sec Name', 'nunique'),
+        **{'Contact Hours': ('Contact Hours', 'sum')})
+    load['Conflicts'] = conflicts.groupby('Instructor').size()
+    load['Conflicts'] = load['Conflicts'].fillna(0).astype(int)
+    load['Over Cap'] = load['Contact Hours'] > max_hours
+
+    notes = np.where(load['Conflicts'] > 0,
+                     load['Conflicts'].astype(str) + ' conflicts', '')
+    over = np.where(load['Over Cap'],
+                    'over ' + str(max_hours) + ' contact hours', '')
+    load['Exceptions'] = pd.Series(notes, index=load.index).str.cat(
+        pd.Series(over, index=load.index), sep='; ').str.strip('; ')
+
+    load = load.reset_index()
+    return load.sort_values(['Conflicts', 'Contact Hours'], ascending=False,
+                            kind='stable').reset_index(drop=True)
+
+
+@instrument.traced(profile=True)
+def instructor_report(sections, meetings, max_hours=MAX_CONTACT_HOURS,
+                      excel_filename='instructor_exceptions.xlsx'):
+    '''
+    Writes the all-faculty conflict and load exception report to Excel.
+
+    Parameters
+    ----------
+    sections : dataframe
+        Sections table (readfile()).
+    meetings : dataframe
+        Meetings table with the parsed Meeting Times columns.
+    max_hours : float
+        Weekly contact hour cap (default is MAX_CONTACT_HOURS).
+    excel_filename : str
+        Workbook to write (default is 'instructor_exceptions.xlsx').
+
+    Returns
+    -------
+    exceptions, conflicts : dataframe
+    '''
+    try:
+        conflicts = instructor_conflicts(sections, meetings)
+        load = instructor_load(sections, conflicts, max_hours)
+        exceptions = load[load['Exceptions'] != '']
+
+        report_writer.write_workbook(excel_filename, [
+            ('Exceptions', exceptions, {'autofilter': True}),
+            ('Conflicts', conflicts, {'autofilter': True}),
+            ('All Instructors', load, {'autofilter': True}),
+        ])
+
+        print(f"{len(load)} instructors: {(load['Conflicts'] > 0).sum()} with "
+              f"conflicts, {load['Over Cap'].sum()} over {max_hours} contact hours")
+        print(f"Instructor report saved as {excel_filename}")
+        return exceptions, conflicts
+
+    except PermissionError:
+        print(f"Close {excel_filename} and try again.")
+    except KeyError as err:
+        print(f"Section data is missing a column: {err}")
+    return None, None
@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+"""
+Column types for the loaded CSAR data.
+
+pd.read_csv leaves every text column as Python strings and every number
+as int64/float64. The CSAR has a handful of distinct values in most text
+columns (one Term, five delivery methods, thirteen divisions, ...), so
+they are stored as categoricals, and counts that fit are stored as small
+integers. Total FTE stays float64: it is rounded to 3 places and then
+multiplied by the tier funding, and float32 would change the totals in
+the reports.
+"""
+import numpy as np
+import pandas as pd
+
+
+# Snapshots in .csar_cache hold these types: bump snapshot.SNAPSHOT_VERSION
+# when changing them
+
+# Text columns with few distinct values, read straight in as categoricals
+CATEGORY_COLUMNS = ['Term', 'X Sec Delivery Method', 'Sec Allow Waitlist Flag',
+                    'Sec Faculty Info', 'Sec All Faculty Last Names',
+                    'Sec Divisions']
+
+# read_csv dtype argument for the CSAR
+CSAR_DTYPES = {col: 'category' for col in CATEGORY_COLUMNS}
+
+# Only these columns of the contact hours workbook are used
+CONTACT_HOURS_COLUMNS = ['Sec Name', 'Contact Hours']
+
+# Whole numbers, stored as int16 (int8 would overflow in simple
+# arithmetic such as count * 100)
+INTEGER_COLUMNS = ['Capacity', 'FTE Count']
+
+# Numbers where float32 (about 7 significant digits) loses nothing
+FLOAT32_COLUMNS = ['Contact Hours']
+
+
+def apply_schema(frame):
+    '''
+    Converts the merged CSAR columns to their compact types.
+
+    Category columns that are not categoricals yet (e.g. Course Code,
+    which is extracted after the read) are converted, integer columns
+    become int16 when they have no missing values and fit, and float32
+    columns are converted only when the values survive the round trip.
+
+    Parameters
+    ----------
+    frame : dataframe
+        Merged CSAR rows.
+
+    Returns
+    -------
+    dataframe
+        Copy of frame with the compact types.
+    '''
+    frame = frame.copy()
+
+    for col in CATEGORY_COLUMNS + ['Course Code']:
+        if col in frame.columns and not isinstance(frame[col].dtype,
+                                                   pd.CategoricalDtype):
+            frame[col] = frame[col].astype('category')
+
+    for col in INTEGER_COLUMNS:
+        if col not in frame.columns:
+            continue
+        values = pd.to_numeric(frame[col], errors='coerce')
+        limits = np.iinfo(np.int16)
+        if (values.notna().all() and (values % 1 == 0).all()
+                and values.between(limits.min, limits.max).all()):
+            frame[col] = values.astype(np.int16)
+
+    for col in FLOAT32_COLUMNS:
+        if col in frame.columns:
+            values = pd.to_numeric(frame[col], errors='coerce')
+            small = values.astype(np.float32)
+            if np.allclose(small, values, rtol=0, atol=0, equal_nan=True):
+                frame[col] = small
+
+    return frame
+
+
+def memory_report(before, after):
+    '''
+    Bytes used by each column before and after apply_schema.
+
+    Parameters
+    ----------
+    before, after : dataframe
+
+    Returns
+    -------
+    dataframe
+        Column, dtype and bytes before and after, with a Total row.
+    '''
+    old = before.memory_usage(deep=True, index=False)
+    new = after.memory_usage(deep=True, index=False)
+    report = pd.DataFrame({
+        'Column': old.index,
+        'Before Type': [str(before[col].dtype) for col in old.index],
+        'After Type': [str(after[col].dtype) if col in after.columns else ''
+                       for col in old.index],
+        'Before Bytes': old.to_numpy(),
+        'After Bytes': new.reindex(old.index).fillna(0).astype(int).to_numpy(),
+    })
+    report.loc[len(report)] = ['Total', '', '', report['Before Bytes'].sum(),
+                               report['After Bytes'].sum()]
+    return report
@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+"""
+Binary snapshot cache for the CSAR tables.
+
+The tables built by readfile() are written to .csar_cache/ keyed by a
+content hash of the source files and SNAPSHOT_VERSION, so the CSV and
+xlsx only have to be parsed again when one of them changes or the code
+that builds the tables does. Snapshots are stored as Feather
+when pyarrow is installed and as pickle otherwise.
+"""
+import hashlib
+import os
+import pandas as pd
+
+import instrument
+
+try:
+    import pyarrow  # noqa: F401  (only needed for Feather snapshots)
+    SNAPSHOT_FORMAT = 'feather'
+except ImportError:
+    SNAPSHOT_FORMAT = 'pkl'
+
+
+CACHE_DIR = '.csar_cache'
+
+# Version of the cached tables' layout. Bump it whenever build_tables,
+# split_sections, merge_sources, schema.py or TierTable changes what they
+# produce, so snapshots (and tier_table.pkl) written by older code are
+# rebuilt instead of served.
+SNAPSHOT_VERSION = 2
+
+
+def fingerprint(paths, version=SNAPSHOT_VERSION):
+    '''
+    Hashes the contents of the source files and the snapshot version.
+
+    Parameters
+    ----------
+    paths : list[str]
+        Files to hash, in order.
+    version : int
+        Layout version of the tables built from them (default is
+        SNAPSHOT_VERSION).
+
+    Returns
+    -------
+    str
+        Hex digest of the combined file contents.
+    '''
+    digest = hashlib.sha256(f"v{version}".encode())
+    for path in paths:
+        digest.update(os.path.basename(path).encode())
+        with open(path, 'rb') as file:
+            for chunk in iter(lambda: file.read(1 << 20), b''):
+                digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _write(frame, path):
+    '''
+    Writes a snapshot atomically so a crash never leaves half a file.
+    '''
+    tmp_path = path + '.tmp'
+    if SNAPSHOT_FORMAT == 'feather':
+        # Feather only stores a default index, keep the sorted one as a column
+        frame.reset_index(names='_index').to_feather(tmp_path)
+    else:
+        frame.to_pickle(tmp_path)
+    os.replace(tmp_path, path)
+
+
+def _read(path):
+    '''
+    Reads a snapshot written by _write.
+    '''
+    if SNAPSHOT_FORMAT == 'feather':
+        frame = pd.read_feather(path).set_index('_index')
+        frame.index.name = None
+        return frame
+    return pd.read_pickle(path)
+
+
+def load_or_build(sources, build, name='tables', rebuild=False,
+                  cache_dir=CACHE_DIR, version=SNAPSHOT_VERSION):
+    '''
+    Returns the cached tables for the current source files, building them
+    (and writing a new snapshot) on a miss.
+
+    Parameters
+    ----------
+    sources : list[str]
+        Files the tables are built from, hashed to key the snapshot.
+    build : callable
+        Function that builds the tables from the source files and
+        returns them as a dict of dataframes.
+    name : str
+        Prefix of the snapshot files (default is 'tables').
+    rebuild : bool
+        Ignore any existing snapshot and rebuild it (default is False).
+    cache_dir : str
+        Directory holding the snapshots (default is '.csar_cache').
+    version : int
+        Layout version of the tables; a snapshot written with another
+        version is rebuilt (default is SNAPSHOT_VERSION).
+
+    Returns
+    -------
+    dict[str, dataframe]
+        The tables returned by build.
+    '''
+    key = fingerprint(sources, version)[:16]
+    index_path = os.path.join(cache_dir, f"{name}_{key}.parts")
+
+    def part_path(part):
+        return os.path.join(cache_dir, f"{name}_{key}.{part}.{SNAPSHOT_FORMAT}")
+
+    if not rebuild and os.path.exists(index_path):
+        try:
+            with open(index_path) as file:
+                parts = file.read().split()
+            with instrument.span('snapshot read') as stage:
+                tables = {part: _read(part_path(part)) for part in parts}
+                stage.rows_out = len(next(iter(tables.values()), []))
+            print(f"Cache hit: loaded {name} snapshot {key}")
+            return tables
+        except Exception as err:
+            print(f"Cache unreadable ({err}), rebuilding")
+
+    print(f"Cache miss: building {name} snapshot {key}")
+    tables = build()
+
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        # drop snapshots of older versions of the source files
+        for old in os.listdir(cache_dir):
+            if old.startswith(name + '_'):
+                os.remove(os.path.join(cache_dir, old))
+        with instrument.span('snapshot write'):
+            for part, frame in tables.items():
+                _write(frame, part_path(part))
+        # the index is written last so a partial snapshot is never read
+        with open(index_path, 'w') as file:
+            file.write("\n".join(tables))
+    except OSError as err:
+        print(f"Could not write cache: {err}")
+
+    return tables
@@ -0,0 +1,254 @@
+# -*- coding: utf-8 -*-
+"""
+Term-partitioned CSAR history.
+
+Every CSAR extract in csar_terms/ (plus the current deanDailyCsar.csv)
+is one partition, keyed by the Term in its first row. A partition is only
+read when a report asks for its term, and loaded partitions are kept in
+an LRU cache: when their memory goes over the budget the least recently
+used terms are dropped and simply read again (from their snapshot) the
+next time they are needed.
+
+Terms are given as "2025SP", a range "2023FA:2025SP", a list
+"2024FA,2025SP" or "ALL".
+"""
+import glob
+import os
+from collections import OrderedDict
+
+import pandas as pd
+
+import functions as fn
+import schema
+
+
+TERMS_DIR = 'csar_terms'
+
+# Most memory the loaded partitions may use before old ones are dropped
+MEMORY_BUDGET = 512 * 2 ** 20
+
+# Order of the terms within a year
+SEASONS = {'SP': 0, 'SU': 1, 'FA': 2}
+
+
+def term_key(term):
+    '''
+    Sort key putting terms in calendar order (2024SP, 2024SU, 2024FA, ...).
+
+    Parameters
+    ----------
+    term : str
+
+    Returns
+    -------
+    tuple
+    '''
+    term = str(term)
+    year = int(term[:4]) if term[:4].isdigit() else 0
+    return (year, SEASONS.get(term[4:].upper(), len(SEASONS)), term)
+
+
+def parse_terms(spec, available):
+    '''
+    Turns a term, range, list or "ALL" into a list of terms.
+
+    Parameters
+    ----------
+    spec : str
+        "2025SP", "2023FA:2025SP", "2024FA,2025SP" or "ALL".
+    available : list[str]
+        Known terms in calendar order.
+
+    Returns
+    -------
+    list[str]
+        Terms in calendar order.
+
+    Raises
+    ------
+    ValueError
+        If a term is not available or the range is empty.
+    '''
+    spec = str(spec).strip().upper()
+    if spec == 'ALL':
+        return list(available)
+
+    if ':' in spec:
+        first, last = (part.strip() for part in spec.split(':', 1))
+        for term in (first, last):
+            if term not in available:
+                raise ValueError(f"unknown term {term}")
+        terms = [term for term in available
+                 if term_key(first) <= term_key(term) <= term_key(last)]
+        if not terms:
+            raise ValueError(f"no terms between {first} and {last}")
+        return terms
+
+    terms = [term.strip() for term in spec.split(',') if term.strip()]
+    for term in terms:
+        if term not in available:
+            raise ValueError(f"unknown term {term}")
+    return sorted(set(terms), key=term_key)
+
+
+def _memory(frames):
+    '''
+    Bytes used by a list of dataframes.
+    '''
+    return int(sum(frame.memory_usage(deep=True).sum() for frame in frames))
+
+
+class TermStore:
+    '''
+    Lazily loaded Sections and Meetings tables for every term.
+
+    Parameters
+    ----------
+    directory : str
+        Directory of CSAR extracts, one or more terms per file (default
+        is 'csar_terms').
+    current : str
+        The current daily extract; it wins when a term is in both
+        (default is 'deanDailyCsar.csv').
+    hours_file : str
+        Contact hours workbook used for every term.
+    budget : int
+        Memory budget in bytes for the loaded terms (default is
+        MEMORY_BUDGET).
+    loader : callable
+        Reads one extract; takes sources= and name= like
+        functions.read_tables (the default).
+    '''
+
+    def __init__(self, directory=TERMS_DIR, current=fn.SOURCE_FILES[0],
+                 hours_file=fn.SOURCE_FILES[1], budget=MEMORY_BUDGET,
+                 loader=fn.read_tables):
+        self.directory = directory
+        self.current = current
+        self.hours_file = hours_file
+        self.budget = budget
+        self.loader = loader
+        self._paths = None
+        self._loaded = OrderedDict()
+
+    def discover(self):
+        '''
+        Finds the term of every extract by reading only its first row.
+
+        Returns
+        -------
+        dict[str, str]
+            Term to extract path.
+        '''
+        paths = {}
+        candidates = sorted(glob.glob(os.path.join(self.directory, '*.csv')))
+        if os.path.exists(self.current):
+            candidates.append(self.current)
+
+        for path in candidates:
+            try:
+                first = pd.read_csv(path, usecols=['Term'], nrows=1)
+            except (ValueError, OSError, pd.errors.ParserError) as err:
+                print(f"Skipping {path}: {err}")
+                continue
+            if len(first) and pd.notna(first['Term'].iloc[0]):
+                paths[str(first['Term'].iloc[0])] = path
+
+        self._paths = paths
+        return paths
+
+    def terms(self):
+        '''
+        Every available term in calendar order.
+
+        Returns
+        -------
+        list[str]
+        '''
+        if self._paths is None:
+            self.discover()
+        return sorted(self._paths, key=term_key)
+
+    def memory_used(self):
+        '''
+        Bytes held by the loaded terms.
+        '''
+        return sum(size for _, _, size in self._loaded.values())
+
+    def load(self, term):
+        '''
+        Returns one term's (sections, meetings), reading it on first use.
+
+        Parameters
+        ----------
+        term : str
+
+        Returns
+        -------
+        tuple
+            (sections, meetings) for the term.
+        '''
+        if term in self._loaded:
+            self._loaded.move_to_end(term)
+            sections, meetings, _ = self._loaded[term]
+            return sections, meetings
+
+        if term not in self.terms():
+            raise ValueError(f"unknown term {term}")
+
+        path = self._paths[term]
+        sections, meetings = self.loader(sources=(path, self.hours_file),
+                                         name=f"term_{term}")
+        if len(sections) == 0:
+            raise FileNotFoundError(f"could not read {path}")
+
+        # an extract can hold more than one term
+        if 'Term' in sections.columns:
+            in_term = sections['Term'].astype(str) == term
+            if not in_term.all():
+                sections = sections[in_term]
+                meetings = meetings[meetings['Sec Name'].isin(sections['Sec Name'])]
+
+        self._loaded[term] = (sections, meetings, _memory([sections, meetings]))
+        self._evict()
+        return sections, meetings
+
+    def _evict(self):
+        '''
+        Drops the least recently used terms until under the budget,
+        always keeping the newest one.
+        '''
+        while self.memory_used() > self.budget and len(self._loaded) > 1:
+            term, _ = self._loaded.popitem(last=False)
+            print(f"Unloaded term {term} to stay under the memory budget")
+
+    def tables(self, spec):
+        '''
+        Sections and Meetings for a term, range, list or "ALL".
+
+        Parameters
+        ----------
+        spec : str
+            See parse_terms.
+
+        Returns
+        -------
+        tuple
+            (sections, meetings), several terms stacked in calendar order.
+        '''
+        terms = parse_terms(spec, self.terms())
+        parts = [self.load(term) for term in terms]
+        if len(parts) == 1:
+            return parts[0]
+
+        # stacking terms with different categories gives plain strings,
+        # so the compact types are applied again
+        sections = schema.apply_schema(pd.concat([part[0] for part in parts]))
+        meetings = pd.concat([part[1] for part in parts], ignore_index=True)
+        return sections, meetings
+
+    def sections(self, spec):
+        '''
+        Sections for a term, range, list or "ALL" (see tables).
+        '''
+        return self.tables(spec)[0]
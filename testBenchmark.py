@@ -0,0 +1,38 @@
+import unittest
+import meeting_times
+from benchmark import DELIVERY_METHODS, synthetic_csar
+
+
+class TestSyntheticCsar(unittest.TestCase):
+
+    def setUp(self):
+        self.csar, self.hours = synthetic_csar(scale=1, seed=3)
+
+    def test_shape(self):
+        """The real row count, every delivery method, every course in the hours file."""
+        self.assertEqual(len(self.csar), 3276)
+        self.assertEqual(set(self.csar["X Sec Delivery Method"]), set(DELIVERY_METHODS))
+        self.assertLessEqual(set(self.csar["Sec Name"].str[:7]), set(self.hours["Sec Name"]))
+
+    def test_continuation_rows(self):
+        """Only the first row of a section carries its division."""
+        first = ~self.csar["Sec Name"].duplicated()
+        self.assertTrue(self.csar.loc[first, "Sec Divisions"].notna().all())
+        self.assertTrue(self.csar.loc[~first, "Sec Divisions"].isna().all())
+        self.assertGreater((~first).sum(), 1000)
+
+    def test_fields(self):
+        """Meeting times parse and some faculty fields span several lines."""
+        parsed = meeting_times.parse(self.csar["Meeting Times"])
+        listed = self.csar["Meeting Times"].notna()
+        self.assertTrue(parsed.loc[listed, "Building"].notna().all())
+        self.assertTrue(self.csar["Sec Faculty Info"].str.contains("\n").any())
+
+    def test_seeded(self):
+        """The same seed gives the same extract."""
+        self.assertTrue(self.csar.equals(synthetic_csar(scale=1, seed=3)[0]))
+        self.assertFalse(self.csar.equals(synthetic_csar(scale=1, seed=4)[0]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,5 +1,5 @@
 import unittest
-from m_pro_4_groupa_functions import clean_course_code
+from functions import clean_course_code
 
 class TestCleanCourseCode(unittest.TestCase):
     def test_clean_course_code(self):
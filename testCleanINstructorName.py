@@ -1,5 +1,5 @@
 import unittest
-from m_pro_4_groupa_functions import clean_instructor_name  # Replace 'module_name' with the actual module name
+from functions import clean_instructor_name
 
 class TestCleanInstructorName(unittest.TestCase):
     
@@ -1,5 +1,5 @@
 import unittest
-from m_pro_4_groupa_functions import clean_name_for_search  # Replace 'module_name' with the actual module name
+from functions import clean_name_for_search
 
 class TestCleanNameForSearch(unittest.TestCase):
     
@@ -0,0 +1,62 @@
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+import pandas as pd
+from faculty_index import FacultyIndex
+from functions import select_codes
+from main import build_parser, run_course, run_dashboard, run_division, run_faculty
+
+
+class TestCli(unittest.TestCase):
+
+    def test_select_codes(self):
+        """Codes match ignoring case, unknown ones are returned apart."""
+        available = ["CBUS1", "CGEN", "CGEN3"]
+        self.assertEqual(select_codes("all", available), (available, []))
+        self.assertEqual(select_codes(" cgen3, cbus1,XX ,cgen3", available),
+                         (["CGEN3", "CBUS1"], ["XX"]))
+
+    def test_subcommands(self):
+        """Each command keeps its options and the global flags."""
+        args = build_parser().parse_args(
+            ["--term", "2025SP", "division", "--codes", "ALL", "--out", "reports/"])
+        self.assertEqual((args.term, args.codes, args.out), ("2025SP", "ALL", "reports/"))
+        self.assertIs(args.run, run_division)
+        args = build_parser().parse_args(["course", "--codes", "CSC-121,MAT-171"])
+        self.assertIs(args.run, run_course)
+        self.assertTrue(build_parser().parse_args(["faculty", "--all"]).all)
+        args = build_parser().parse_args(["dashboard"])
+        self.assertIs(args.run, run_dashboard)
+        self.assertEqual(args.workbook, "college_fte_dashboard.xlsx")
+
+    def test_bad_arguments(self):
+        """Bad command lines exit with status 2."""
+        for argv in (["division"], ["faculty", "--all", "--names", "X"]):
+            with self.assertRaises(SystemExit) as raised:
+                build_parser().parse_args(argv)
+            self.assertEqual(raised.exception.code, 2)
+
+    def test_faculty_files_unique(self):
+        """Instructors sharing a last name and initial get their own files."""
+        data = pd.DataFrame({
+            "Sec Name": ["CSC-121-0001", "CSC-134-0001"],
+            "Sec Faculty Info": ["A. Fann", "Al Fann"],
+            "X Sec Delivery Method": ["IN", "IN"], "Meeting Times": ["", ""],
+            "Capacity": [20, 20], "FTE Count": [10, 5],
+            "Total FTE": [1.0, 0.5], "Sec Divisions": ["CBUS1", "CBUS1"],
+        })
+        with tempfile.TemporaryDirectory() as out:
+            args = argparse.Namespace(all=True, names=None, out=out)
+            with contextlib.redirect_stdout(io.StringIO()):
+                failed = run_faculty(args, data, None,
+                                     FacultyIndex.from_frame(data), None)
+            self.assertEqual(failed, 0)
+            self.assertEqual(sorted(os.listdir(out)),
+                             ["fanna_1_FTE.xlsx", "fanna_2_FTE.xlsx"])
+
+
+if __name__ == '__main__':
+    unittest.main()
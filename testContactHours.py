@@ -0,0 +1,43 @@
+import unittest
+import numpy as np
+import pandas as pd
+from functions import contact_hours_lookup, join_contact_hours
+
+
+class TestContactHours(unittest.TestCase):
+
+    def setUp(self):
+        self.csar = pd.DataFrame({
+            "Sec Name": ["CSC-121-0001", "CSC-121-0002", "MAT-171-0001",
+                         "ENG-111-0001"],
+            "Course Code": ["CSC-121", "CSC-121", "MAT-171", "ENG-111"],
+        })
+        self.hours = pd.DataFrame({
+            "Course Code": ["CSC-121", "CSC-121", "MAT-171", "MAT-171", None],
+            "Contact Hours": ["4", 4, 3, 5, 2],
+        })
+
+    def test_lookup(self):
+        """Every code is listed once; different values are reported."""
+        lookup, conflicts = contact_hours_lookup(self.hours)
+        self.assertEqual(lookup.to_dict(), {"CSC-121": 4.0, "MAT-171": 3.0})
+        self.assertEqual(conflicts["Course Code"].tolist(), ["MAT-171", "MAT-171"])
+        self.assertEqual(conflicts["Contact Hours"].tolist(), [3, 5])
+
+    def test_join_keeps_rows(self):
+        """Repeated codes in the workbook never repeat CSAR rows."""
+        lookup, _ = contact_hours_lookup(self.hours)
+        joined = join_contact_hours(self.csar, lookup)
+        self.assertEqual(len(joined), len(self.csar))
+        np.testing.assert_array_equal(joined["Contact Hours"], [4.0, 4.0, 3.0, np.nan])
+        self.assertNotIn("Contact Hours", self.csar.columns)
+
+    def test_not_unique(self):
+        """A lookup with a repeated code is refused."""
+        lookup = pd.Series([4.0, 5.0], index=["CSC-121", "CSC-121"])
+        with self.assertRaises(pd.errors.MergeError):
+            join_contact_hours(self.csar, lookup)
+
+
+if __name__ == '__main__':
+    unittest.main()
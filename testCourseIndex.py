@@ -0,0 +1,36 @@
+import unittest
+import pandas as pd
+from course_index import CourseIndex
+
+
+class TestCourseIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.frame = pd.DataFrame({"Sec Name": [
+            "MAT-171-0001", "ACA-120-1001", "ACA-122-0001", None,
+            "ACA-120-1901", "BIO-168-0002",
+        ]})
+        self.index = CourseIndex.from_frame(self.frame)
+
+    def test_exact_code(self):
+        """A course code returns its rows in frame order."""
+        self.assertEqual(self.index.rows("aca-120").tolist(), [1, 4])
+        self.assertEqual(self.index.rows("ZZZ-999").tolist(), [])
+
+    def test_prefix(self):
+        """Prefixes of codes and section names match like str.contains did."""
+        self.assertEqual(self.index.codes_with_prefix("ACA").tolist(),
+                         ["ACA-120", "ACA-122"])
+        self.assertEqual(self.index.prefix_rows("aca-12").tolist(), [1, 2, 4])
+        self.assertEqual(self.index.prefix_rows("ACA-120-19").tolist(), [4])
+
+    def test_search_matches_contains(self):
+        """search returns the rows str.contains used to find."""
+        for text in ["ACA-120", "bio", "0001", "ZZZ"]:
+            expected = self.frame.index[self.frame["Sec Name"].str.contains(
+                text, case=False, na=False)].tolist()
+            self.assertEqual(self.index.search(text).tolist(), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
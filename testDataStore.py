@@ -0,0 +1,49 @@
+import os
+import tempfile
+import unittest
+from datastore import DataStore
+
+
+class TestDataStore(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "source.csv")
+        with open(self.path, "w") as file:
+            file.write("a\n1\n")
+        self.calls = 0
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def loader(self):
+        self.calls += 1
+        return [self.calls], [-self.calls]
+
+    def test_loads_once(self):
+        """Repeated access reuses the loaded frame."""
+        store = DataStore(sources=[self.path], loader=self.loader)
+        self.assertEqual(store.frame, [1])
+        self.assertEqual(store.sections, [1])
+        self.assertEqual(store.meetings, [-1])
+        self.assertEqual(self.calls, 1)
+
+    def test_reloads_on_change(self):
+        """A change in size or mtime triggers a reload."""
+        store = DataStore(sources=[self.path], loader=self.loader)
+        store.frame
+        with open(self.path, "a") as file:
+            file.write("2\n")
+        self.assertEqual(store.frame, [2])
+
+    def test_missing_file_not_cached(self):
+        """A missing source is retried on the next access."""
+        store = DataStore(sources=[self.path + ".missing"],
+                          loader=self.loader)
+        store.frame
+        store.frame
+        self.assertEqual(self.calls, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import unittest
+from faculty_index import FacultyIndex, bounded_distance
+from option4 import find_faculty
+
+
+class TestFacultyIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.index = FacultyIndex([
+            "K. Hogsten Utley", "A. Fann, J. Jones", "J. Jones", "Staff",
+            "T. French", None, "J. Jones",
+        ])
+
+    def test_unique_names(self):
+        """Missing and repeated names are dropped."""
+        self.assertEqual(len(self.index), 5)
+
+    def test_prefix(self):
+        """Any word of the name can start a prefix search."""
+        self.assertEqual(self.index.prefix("hog"), ["K. Hogsten Utley"])
+        self.assertEqual(self.index.prefix("K.Hog"), ["K. Hogsten Utley"])
+        self.assertEqual(self.index.prefix("jon"),
+                         ["A. Fann, J. Jones", "J. Jones"])
+        self.assertEqual(self.index.prefix("zzz"), [])
+
+    def test_search_falls_back_to_substring(self):
+        """Text inside a word is still found."""
+        self.assertEqual(self.index.search("rench"), ["T. French"])
+
+    def test_find_single_token(self):
+        """A one word name no longer crashes find_faculty."""
+        self.assertEqual(find_faculty("Staff", ["Staff", "T. French"]), ["Staff"])
+        self.assertEqual(find_faculty("Utley", self.index), ["K. Hogsten Utley"])
+        self.assertEqual(find_faculty("Tom French", self.index), ["T. French"])
+        self.assertEqual(find_faculty("Q", self.index), None)
+
+    def test_fuzzy(self):
+        """Typos and swapped letters still find the instructor."""
+        self.assertEqual(self.index.fuzzy("Hogsten Utly"), [("K. Hogsten Utley", 1)])
+        self.assertEqual(self.index.fuzzy("Frnech")[0], ("T. French", 1))
+        self.assertEqual(self.index.fuzzy("zzzz"), [])
+        self.assertEqual(self.index.search("Jnoes")[0], "J. Jones")
+        self.assertEqual(find_faculty("Frenhc", self.index), ["T. French"])
+
+    def test_bounded_distance(self):
+        """The distance stops growing past the bound."""
+        self.assertEqual(bounded_distance("peniston", "penniston", 2), 1)
+        self.assertEqual(bounded_distance("kitten", "sitting", 1), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+import unittest
+import pandas as pd
+import fte_engine
+
+
+class TestFteEngine(unittest.TestCase):
+
+    def setUp(self):
+        self.tier = pd.DataFrame({"Prefix/Course ID": ["CSC", "MAT", None],
+                                  "New Sector": [5340, 4800, 9999]})
+        self.data = pd.DataFrame({
+            "Sec Name": ["CSC-121-0001", "CSC-121-0002", "MAT-171-0001",
+                         "ENG-111-0001"],
+            "Total FTE": [1.0, None, 0.5, 2.0],
+            "Capacity": [20, 20, 0, 10],
+            "FTE Count": [10, 5, 3, 10],
+        })
+
+    def test_compute_fte(self):
+        """Generated FTE uses the prefix funding plus the support value."""
+        result = fte_engine.compute_fte(self.data, self.tier)
+        self.assertEqual(result["Generated FTE"].tolist(),
+                         [7266.0, 0.0, 3363.0, 3852.0])
+        self.assertEqual(result["Section FTE"].tolist(), [1.0, 0.0, 0.5, 2.0])
+
+    def test_enrollment_ratio(self):
+        """Zero capacity leaves the enrollment blank."""
+        result = fte_engine.compute_fte(self.data, self.tier)
+        formatted = fte_engine.format_ratio(result["Enrollment Ratio"])
+        self.assertEqual(formatted.tolist(), ["50.00%", "25.00%", "", "100.00%"])
+
+    def test_add_course_totals(self):
+        """A Total row follows each course with its subtotal."""
+        rows = pd.DataFrame({"Course Code": ["A", "", "B"],
+                             "Generated FTE": [1.0, 2.0, 4.0]})
+        courses = pd.Series(["A", "A", "B"])
+        report, subtotals = fte_engine.add_course_totals(
+            rows, courses, rows["Generated FTE"])
+        self.assertEqual(report["Course Code"].tolist(),
+                         ["A", "", "Total", "B", "Total"])
+        self.assertEqual(report["Generated FTE"].tolist(),
+                         [1.0, 2.0, 3.0, 4.0, 4.0])
+        self.assertEqual(subtotals.tolist(), [3.0, 4.0])
+
+    def test_running_total(self):
+        """Totals are added left to right."""
+        self.assertEqual(fte_engine.running_total([]), 0)
+        self.assertEqual(fte_engine.running_total([0.1, 0.2, 0.3]),
+                         0.1 + 0.2 + 0.3)
+
+    def test_fte_cube(self):
+        """Each division, method and tier is totalled once per section."""
+        data = self.data.assign(
+            **{"Sec Divisions": ["BUS", "BUS", "MAT", None],
+               "X Sec Delivery Method": ["IN", "IN", "TR", "IN"]})
+        tier = pd.DataFrame({"Prefix/Course ID": ["CSC", "MAT"],
+                             "New Sector": [5340, 4800], "Tier": ["1A", "2"]})
+        # the same section listed twice counts once
+        labelled = fte_engine.cube_sections(pd.concat([data, data.iloc[:1]]), tier)
+        cube = fte_engine.fte_cube(labelled)
+        self.assertEqual(cube[["Sec Divisions", "X Sec Delivery Method", "Tier"]]
+                         .values.tolist(),
+                         [["BUS", "IN", "1A"], ["MAT", "TR", "2"],
+                          [fte_engine.UNLISTED, "IN", fte_engine.UNLISTED]])
+        self.assertEqual(cube["Sections"].tolist(), [2, 1, 1])
+        self.assertEqual(cube["Generated FTE"].tolist(), [7266.0, 3363.0, 3852.0])
+
+        pivot = fte_engine.pivot_cube(labelled, "Tier", "Sections")
+        self.assertEqual(pivot.loc["TOTAL", "TOTAL"], 4)
+        self.assertEqual(pivot.loc["MAT", "1A"], 0)
+
+    def test_cube_adds_like_reports(self):
+        """Dashboard totals are added up the way the division reports do."""
+        values = [0.1, 0.2, 0.3, 0.4, 0.7, 0.11]
+        data = pd.DataFrame({
+            "Sec Name": ["CSC-134-0002", "CSC-134-0001", "CSC-121-0003",
+                         "CSC-121-0002", "CSC-121-0001", "MAT-171-0001"],
+            "Sec Divisions": ["BUS"] * 5 + ["MAT"],
+            "X Sec Delivery Method": ["IN", "TR"] * 3,
+            "Total FTE": values, "Capacity": 10, "FTE Count": 5})
+        labelled = fte_engine.cube_sections(data, self.tier)
+        # listed by course, then section, as the division report does
+        listed = [0.7, 0.4, 0.3, 0.2, 0.1, 0.11]
+        self.assertEqual(labelled["Section FTE"].tolist(), listed)
+
+        pivot = fte_engine.pivot_cube(labelled, "X Sec Delivery Method", "Total FTE")
+        self.assertEqual(pivot.loc["BUS", "TOTAL"], fte_engine.running_total(listed[:5]))
+        self.assertEqual(pivot.loc["TOTAL", "TOTAL"], fte_engine.running_total(
+            [fte_engine.running_total(listed[:5]), 0.11]))
+        cube = fte_engine.fte_cube(labelled)
+        self.assertEqual(cube["Total FTE"].tolist(),
+                         [fte_engine.running_total([0.7, 0.3, 0.1]),
+                          fte_engine.running_total([0.4, 0.2]), 0.11])
+
+        # Generated FTE adds up the course subtotals
+        bus = labelled[labelled["Sec Divisions"] == "BUS"]
+        _, subtotals = fte_engine.add_course_totals(
+            bus[["Course Code", "Generated FTE"]], bus["Course Code"],
+            bus["Generated FTE"])
+        totals = fte_engine.division_totals(labelled, "Generated FTE")
+        self.assertEqual(totals["BUS"], fte_engine.running_total(subtotals))
+        pivot = fte_engine.pivot_cube(bus, "Tier", rows="X Sec Delivery Method")
+        self.assertEqual(pivot.loc["TOTAL", "TOTAL"], totals["BUS"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import contextlib
+import io
+import json
+import os
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+import instrument
+import option4
+
+
+@instrument.traced()
+def double_rows(frame):
+    return pd.concat([frame, frame])
+
+
+class TestInstrument(unittest.TestCase):
+
+    def tearDown(self):
+        instrument.disable()
+
+    def test_disabled_records_nothing(self):
+        """Spans are free when tracing is off."""
+        instrument.disable()
+        double_rows(pd.DataFrame({"a": [1]}))
+        with instrument.span("off"):
+            pass
+        self.assertEqual(len(instrument.spans()), 0)
+
+    def test_nested_spans(self):
+        """Rows, nesting and the inner allocation are recorded."""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "trace.json")
+            instrument.enable(path)
+            with instrument.span("outer", rows_in=3):
+                result = double_rows(pd.DataFrame({"a": [1, 2, 3]}))
+                with instrument.span("allocate") as stage:
+                    block = np.ones(2 ** 20)
+                    stage.rows_out = len(block)
+            spans = instrument.spans().set_index("name")
+            self.assertEqual(len(result), 6)
+            self.assertEqual(spans.loc["double_rows", ["rows_in", "rows_out", "depth"]].tolist(),
+                             [3, 6, 1])
+            self.assertGreaterEqual(spans.loc["allocate", "peak_bytes"], 8 * 2 ** 20)
+            self.assertGreaterEqual(spans.loc["outer", "peak_bytes"], 8 * 2 ** 20)
+
+            instrument.write()
+            with open(path) as file:
+                events = json.load(file)["traceEvents"]
+            self.assertEqual([event["name"] for event in events],
+                             ["double_rows", "allocate", "outer"])
+
+    def test_report_span(self):
+        """The faculty report is recorded under its own name."""
+        data = pd.DataFrame({
+            "Sec Name": ["CSC-121-0001"], "Sec Faculty Info": ["A. Fann"],
+            "X Sec Delivery Method": ["IN"], "Meeting Times": [""],
+            "Capacity": [20], "FTE Count": [10], "Total FTE": [1.0],
+            "Sec Divisions": ["CBUS1"],
+        })
+        tier = pd.DataFrame({"Prefix/Course ID": ["CSC"], "New Sector": [5340]})
+        with tempfile.TemporaryDirectory() as tmp:
+            instrument.enable(os.path.join(tmp, "trace.json"))
+            with contextlib.redirect_stdout(io.StringIO()):
+                option4.faculty_fte_report(data, "A. Fann", tier, tmp)
+            names = instrument.spans()["name"].tolist()
+        self.assertIn("faculty_fte_report", names)
+        self.assertNotIn("faculty_file_name", names)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,49 @@
+import unittest
+import pandas as pd
+import meeting_times
+
+
+class TestMeetingTimes(unittest.TestCase):
+
+    def setUp(self):
+        self.parsed = meeting_times.parse(pd.Series([
+            "01/13/25 05/14/25 LAH  106      LAB  T         02:00PM 04:50PM",
+            "01/13/25 03/10/25 DED  INET     CLAS MTWTHFSSU TBA            ",
+            "01/13/25 05/14/25 GCB  209      LAB  TTH       12:00PM 12:50AM",
+            None,
+        ]))
+
+    def test_fields(self):
+        """Dates, building, room and type are sliced out of the string."""
+        row = self.parsed.iloc[0]
+        self.assertEqual(row["Start Date"], pd.Timestamp("2025-01-13"))
+        self.assertEqual(row["End Date"], pd.Timestamp("2025-05-14"))
+        self.assertEqual(row["Building"], "LAH")
+        self.assertEqual(row["Room"], "106")
+        self.assertEqual(row["Meeting Type"], "LAB")
+
+    def test_times(self):
+        """Times become minutes past midnight, TBA becomes missing."""
+        self.assertEqual(self.parsed["Start Minute"].tolist()[0], 14 * 60)
+        self.assertEqual(self.parsed["End Minute"].tolist()[0], 16 * 60 + 50)
+        self.assertEqual(self.parsed["Start Minute"].tolist()[2], 12 * 60)
+        self.assertEqual(self.parsed["End Minute"].tolist()[2], 50)
+        self.assertTrue(pd.isna(self.parsed["Start Minute"].iloc[1]))
+
+    def test_days(self):
+        """TH and SU are not mistaken for T and S."""
+        days = self.parsed["Days"].tolist()
+        self.assertEqual(meeting_times.day_names(days[0]), ["T"])
+        self.assertEqual(days[1], 127)
+        self.assertEqual(meeting_times.day_names(days[2]), ["T", "TH"])
+        self.assertEqual(days[3], 0)
+
+    def test_missing(self):
+        """A missing Meeting Times gives missing fields."""
+        row = self.parsed.iloc[3]
+        self.assertTrue(pd.isna(row["Start Date"]))
+        self.assertTrue(pd.isna(row["Building"]))
+
+
+if __name__ == '__main__':
+    unittest.main()
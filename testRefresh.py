@@ -0,0 +1,40 @@
+import unittest
+import pandas as pd
+from refresh import diff_rows, row_hashes
+
+
+class TestRefresh(unittest.TestCase):
+
+    def setUp(self):
+        self.rows = pd.DataFrame({
+            "Sec Name": ["BIO-168-0001", "ACA-120-1001", "BIO-168-0001"],
+            "Meeting Times": ["CLAS", "CLAS", "LAB"],
+            "FTE Count": [20, 15, 20],
+        })
+
+    def test_keys_follow_file_order(self):
+        """Rows are keyed by section and meeting number within it."""
+        hashes = row_hashes(self.rows)
+        self.assertEqual(list(zip(hashes["Sec Name"], hashes["Meeting"])),
+                         [("ACA-120-1001", 0), ("BIO-168-0001", 0), ("BIO-168-0001", 1)])
+
+    def test_unchanged_extract(self):
+        """The same rows in another order give no changes."""
+        old = row_hashes(self.rows)
+        new = row_hashes(self.rows.iloc[[1, 0, 2]])
+        self.assertEqual(len(diff_rows(old, new)), 0)
+
+    def test_added_removed_changed(self):
+        """Each kind of change is reported against its key."""
+        new_rows = self.rows.copy()
+        new_rows.loc[1, "FTE Count"] = 16
+        new_rows = pd.concat([new_rows.drop(index=2), pd.DataFrame({
+            "Sec Name": ["MAT-171-0001"], "Meeting Times": ["CLAS"], "FTE Count": [30]})])
+        changes = diff_rows(row_hashes(self.rows), row_hashes(new_rows))
+        found = {(name, change) for name, change in zip(changes["Sec Name"], changes["Change"])}
+        self.assertEqual(found, {("ACA-120-1001", "changed"), ("BIO-168-0001", "removed"),
+                                 ("MAT-171-0001", "added")})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,113 @@
+import io
+import contextlib
+import unittest
+import pandas as pd
+import web_functions as wf
+from report_cache import DownloadCache, ReportCache, excel_bytes
+
+
+class TestReportCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tier = pd.DataFrame({"Prefix/Course ID": ["CSC", "MAT"],
+                                  "New Sector": [5340, 4800]})
+        self.data = pd.DataFrame({
+            "Sec Name": ["CSC-121-0001", "CSC-121-0002", "MAT-171-0001",
+                         "CSC-134-0001"],
+            "Course Code": ["CSC-121", "CSC-121", "MAT-171", "CSC-134"],
+            "Sec Divisions": ["BUS", "BUS", "MAT", "BUS"],
+            "Sec Faculty Info": ["Fann, A.", "Jones, B.", "Fann, A.", None],
+            "X Sec Delivery Method": ["LEC", "INT", "LEC", "LEC"],
+            "Meeting Times": ["", "", "", ""],
+            "Total FTE": [1.0, 0.5, 0.25, None],
+            "Capacity": [20, 20, 0, 10],
+            "FTE Count": [10, 5, 3, 0],
+        })
+        self.cache = ReportCache(self.data, self.tier)
+
+    def test_options(self):
+        """Option lists keep the order of the data."""
+        self.assertEqual(self.cache.divisions, ["BUS", "MAT"])
+        self.assertEqual(list(self.cache.faculty), ["Fann, A.", "Jones, B."])
+        self.assertEqual(self.cache.by_division["Sections"].tolist(), [3, 1])
+
+    def test_reports_match(self):
+        """Every page gives what the web functions give."""
+        for division in self.cache.divisions:
+            expected = wf.format_fte_output(
+                *wf.fte_by_div_raw(self.data, self.tier, division))
+            pd.testing.assert_frame_equal(
+                self.cache.division_report(division)[0].reset_index(drop=True),
+                expected.reset_index(drop=True))
+
+        for code in ["CSC-121", "csc-134", "MAT-171"]:
+            expected = wf.calculate_fte_by_course(self.data, self.tier, code)
+            result = self.cache.course_report(code)
+            pd.testing.assert_frame_equal(result[0], expected[0])
+            self.assertEqual(result[1:], expected[1:])
+
+        for name in self.cache.faculty:
+            with contextlib.redirect_stdout(io.StringIO()):
+                expected = wf.generate_faculty_fte_report(self.data, self.tier, name)
+            result = self.cache.faculty_report(name)
+            pd.testing.assert_frame_equal(result[0], expected[0])
+
+    def test_enrollment(self):
+        """Enrollment matches calc_enrollment, zero capacity included."""
+        expected = self.data.apply(wf.calc_enrollment, axis=1)
+        self.assertEqual(wf.enrollment_percentages(self.data).tolist(),
+                         expected.tolist())
+        self.assertEqual(self.cache.enrollment_rows("MAT-171-0001")
+                         ["Enrollment Percentage"].tolist(), ["0%"])
+
+    def test_missing(self):
+        """Unknown keys give the empty result the web functions give."""
+        self.assertEqual(self.cache.division_report("XYZ"), (None, 0, 0))
+        self.assertEqual(self.cache.course_report("ENG-111"), (None, 0, 0))
+        self.assertEqual(len(self.cache.division_sections("XYZ")), 0)
+
+    def test_memoized(self):
+        """A report is built once per key."""
+        self.assertIs(self.cache.division_report("BUS"),
+                      self.cache.division_report("bus"))
+        # codes typed in that match nothing are not kept
+        self.cache.course_report("no such course")
+        self.assertEqual(list(self.cache._reports), [("division", "BUS")])
+
+
+class TestDownloadCache(unittest.TestCase):
+
+    def test_built_once(self):
+        """A workbook is written the first time it is asked for."""
+        cache = DownloadCache()
+        calls = []
+        build = lambda: calls.append(1) or b"xlsx"
+        self.assertEqual(cache.get(("division", "BUS", 1), build), b"xlsx")
+        self.assertEqual(cache.get(("division", "BUS", 1), build), b"xlsx")
+        self.assertEqual(len(calls), 1)
+        self.assertNotIn(("division", "BUS", 2), cache)
+
+    def test_least_recently_used_dropped(self):
+        """Past max_bytes the oldest unused workbook goes first."""
+        cache = DownloadCache(max_bytes=10)
+        cache.get("a", lambda: b"1234")
+        cache.get("b", lambda: b"1234")
+        cache.get("a", lambda: b"")
+        cache.get("c", lambda: b"1234")
+        self.assertIn("a", cache)
+        self.assertNotIn("b", cache)
+        self.assertEqual(cache.size, 8)
+        # too big to keep at all
+        self.assertEqual(cache.get("d", lambda: b"x" * 11), b"x" * 11)
+        self.assertNotIn("d", cache)
+
+    def test_excel_bytes(self):
+        """The bytes read back as the report."""
+        frame = pd.DataFrame({"Sec Name": ["CSC-121-0001"], "Total FTE": [1.5]})
+        data = excel_bytes(frame)
+        pd.testing.assert_frame_equal(
+            pd.read_excel(io.BytesIO(data), sheet_name="Full Report"), frame)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+import unittest
+import pandas as pd
+import meeting_times
+import schedule
+
+
+def meetings_for(rows):
+    """Meetings table for (Sec Name, Meeting Times) pairs."""
+    meetings = pd.DataFrame(rows, columns=["Sec Name", "Meeting Times"])
+    return meeting_times.add_parsed_columns(meetings)
+
+
+class TestSchedule(unittest.TestCase):
+
+    def test_double_booking(self):
+        """Overlapping times in one room on a shared day are reported."""
+        meetings = meetings_for([
+            ("ACA-120-1001", "01/13/25 05/14/25 LAH  146      CLAS MW        09:00AM 10:15AM"),
+            ("BIO-168-1001", "01/13/25 05/14/25 LAH  146      LAB  W         10:00AM 11:50AM"),
+            ("CSC-121-1001", "01/13/25 05/14/25 LAH  146      CLAS W         10:15AM 11:00AM"),
+            ("ENG-111-1001", "01/13/25 05/14/25 LAH  145      CLAS W         09:00AM 10:15AM"),
+        ])
+        conflicts = schedule.double_bookings(meetings)
+        pairs = set(zip(conflicts["Sec Name"], conflicts["Conflicts With"]))
+        self.assertEqual(pairs, {("ACA-120-1001", "BIO-168-1001"),
+                                 ("BIO-168-1001", "CSC-121-1001")})
+        self.assertEqual(conflicts["Days"].tolist()[0], "W")
+        self.assertEqual(conflicts["Overlap Minutes"].tolist()[0], 15)
+
+    def test_no_clash_across_date_ranges(self):
+        """Same room and time in different halves of the term is fine."""
+        meetings = meetings_for([
+            ("ACA-120-1001", "01/13/25 03/10/25 LAH  146      CLAS T         09:00AM 10:15AM"),
+            ("ACA-120-1002", "03/13/25 05/14/25 LAH  146      CLAS T         09:00AM 10:15AM"),
+            ("ACA-120-1901", "01/13/25 05/14/25 DED  INET     CLAS MTWTHFSSU TBA            "),
+        ])
+        self.assertTrue(schedule.double_bookings(meetings).empty)
+
+    def test_utilization(self):
+        """Booked hours count every date the meeting falls on."""
+        meetings = meetings_for([
+            ("ACA-120-1001", "01/13/25 01/24/25 LAH  146      CLAS MW        09:00AM 10:00AM"),
+        ])
+        report = schedule.room_utilization(meetings)
+        self.assertEqual(report["Booked Hours"].tolist(), [4.0])
+        self.assertEqual(report["Available Hours"].tolist(), [140.0])
+
+    def test_instructor_conflicts_and_load(self):
+        """Co-teachers are split and each gets the section's hours."""
+        sections = pd.DataFrame({
+            "Sec Name": ["ACA-120-1001", "BIO-168-1001", "CSC-121-1001"],
+            "Sec Faculty Info": ["A. Fann, J. Jones", "J. Jones", "T. French (more)"],
+            "Contact Hours": [3.0, 5.0, 4.0],
+        })
+        meetings = meetings_for([
+            ("ACA-120-1001", "01/13/25 05/14/25 LAH  146      CLAS MW        09:00AM 10:15AM"),
+            ("BIO-168-1001", "01/13/25 05/14/25 LAH  145      LAB  W         10:00AM 11:50AM"),
+            ("CSC-121-1001", "01/13/25 05/14/25 LAH  146      CLAS W         10:00AM 11:00AM"),
+        ])
+        conflicts = schedule.instructor_conflicts(sections, meetings)
+        self.assertEqual(conflicts["Instructor"].tolist(), ["J. Jones"])
+        self.assertFalse(conflicts["Same Room"].iloc[0])
+
+        load = schedule.instructor_load(sections, conflicts, max_hours=6)
+        load = load.set_index("Instructor")
+        self.assertEqual(load.loc["J. Jones", "Contact Hours"], 8.0)
+        self.assertTrue(load.loc["J. Jones", "Over Cap"])
+        self.assertEqual(load.loc["T. French", "Exceptions"], "")
+
+    def test_truncated_co_teachers(self):
+        """The name cut off before " (more)" is not an instructor."""
+        sections = pd.DataFrame({
+            "Sec Name": ["ACA-120-1001", "BIO-168-1001"],
+            "Sec Faculty Info": ["A. Fann, B. Smith, J. (more)",
+                                 "C. Jones, D. Belfl (more)"],
+            "Contact Hours": [3.0, 5.0],
+        })
+        teaching = schedule._teaching(sections)
+        self.assertEqual(teaching["Instructor"].tolist(),
+                         ["A. Fann", "B. Smith", "C. Jones"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,36 @@
+import unittest
+import pandas as pd
+import schema
+
+
+class TestSchema(unittest.TestCase):
+
+    def setUp(self):
+        self.frame = pd.DataFrame({
+            "X Sec Delivery Method": ["BL", "IN", "BL"],
+            "Capacity": [25, 35, 0],
+            "FTE Count": [21.0, None, 3.0],
+            "Contact Hours": [3.0, 4.5, None],
+            "Total FTE": [0.656, 1.063, 0.094],
+        })
+        self.typed = schema.apply_schema(self.frame)
+
+    def test_types(self):
+        """Columns get compact types only where nothing is lost."""
+        self.assertIsInstance(self.typed["X Sec Delivery Method"].dtype,
+                              pd.CategoricalDtype)
+        self.assertEqual(self.typed["Capacity"].dtype, "int16")
+        self.assertEqual(self.typed["FTE Count"].dtype, "float64")
+        self.assertEqual(self.typed["Contact Hours"].dtype, "float32")
+        self.assertEqual(self.typed["Total FTE"].dtype, "float64")
+
+    def test_memory_report(self):
+        """The report ends with a total row."""
+        report = schema.memory_report(self.frame, self.typed)
+        self.assertEqual(report["Column"].iloc[-1], "Total")
+        self.assertLess(report["After Bytes"].iloc[-1],
+                        report["Before Bytes"].iloc[-1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+import pandas as pd
+import snapshot
+import tier_table
+
+
+class TestSnapshot(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.source = os.path.join(self.tmp.name, "source.csv")
+        with open(self.source, "w") as file:
+            file.write("a\n1\n")
+        self.cache_dir = os.path.join(self.tmp.name, "cache")
+        self.calls = 0
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def build(self):
+        self.calls += 1
+        return {"sections": pd.DataFrame({"a": [self.calls]})}
+
+    def load(self, version):
+        return snapshot.load_or_build([self.source], self.build,
+                                      cache_dir=self.cache_dir, version=version)
+
+    def test_version_change_rebuilds(self):
+        """A snapshot written by another version of the code is rebuilt."""
+        self.load(1)
+        self.assertEqual(self.load(1)["sections"]["a"].tolist(), [1])
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(self.load(2)["sections"]["a"].tolist(), [2])
+        self.assertEqual(self.calls, 2)
+
+    def test_tier_table_version(self):
+        """tier_table.pkl written by another version is not used."""
+        path = os.path.join(self.tmp.name, "tier.xlsx")
+        pd.DataFrame({"Prefix/Course ID": ["CSC"], "New Sector": [5340],
+                      "Tier": ["1A"]}).to_excel(path, index=False)
+        tier_table.load(path, self.cache_dir)
+        with mock.patch.object(tier_table.pd, "read_excel",
+                               wraps=pd.read_excel) as read:
+            tier_table._loaded.clear()
+            tier_table.load(path, self.cache_dir)
+            self.assertEqual(read.call_count, 0)
+            with mock.patch.object(tier_table, "SNAPSHOT_VERSION", -1):
+                tier_table._loaded.clear()
+                tier_table.load(path, self.cache_dir)
+            self.assertEqual(read.call_count, 1)
+        tier_table._loaded.clear()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+import os
+import tempfile
+import unittest
+import pandas as pd
+from term_store import TermStore, parse_terms, term_key
+
+
+class TestTermStore(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        for term in ["2024SP", "2024FA", "2023FA"]:
+            path = os.path.join(self.tmp.name, f"{term}.csv")
+            pd.DataFrame({"Term": [term], "Sec Name": ["ACA-120-1001"]}).to_csv(
+                path, index=False)
+        self.loads = []
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def loader(self, sources, name):
+        self.loads.append(name)
+        term = pd.read_csv(sources[0])["Term"].iloc[0]
+        sections = pd.DataFrame({"Term": [term] * 100, "Sec Name": ["ACA-120-1001"] * 100})
+        meetings = pd.DataFrame({"Sec Name": ["ACA-120-1001"]})
+        return sections, meetings
+
+    def store(self, budget=10 ** 9):
+        return TermStore(directory=self.tmp.name, current="missing.csv",
+                         budget=budget, loader=self.loader)
+
+    def test_terms_in_calendar_order(self):
+        """Terms sort by year, then spring, summer, fall."""
+        self.assertEqual(self.store().terms(), ["2023FA", "2024SP", "2024FA"])
+        self.assertLess(term_key("2024SU"), term_key("2024FA"))
+
+    def test_parse_terms(self):
+        """Ranges, lists and ALL expand to known terms."""
+        terms = ["2023FA", "2024SP", "2024FA"]
+        self.assertEqual(parse_terms("2024SP:2024FA", terms), ["2024SP", "2024FA"])
+        self.assertEqual(parse_terms("2024fa,2023FA", terms), ["2023FA", "2024FA"])
+        self.assertEqual(parse_terms("ALL", terms), terms)
+        with self.assertRaises(ValueError):
+            parse_terms("2022SP", terms)
+
+    def test_lazy_and_cached(self):
+        """A term is read on first use only."""
+        store = self.store()
+        self.assertEqual(self.loads, [])
+        store.sections("2024SP")
+        store.sections("2024SP")
+        self.assertEqual(self.loads, ["term_2024SP"])
+
+    def test_lru_eviction(self):
+        """Going over the budget drops the least recently used term."""
+        store = self.store()
+        store.load("2023FA")
+        store.budget = store.memory_used() * 2
+        store.load("2024SP")
+        store.load("2023FA")
+        store.load("2024FA")
+        self.assertEqual(list(store._loaded), ["2023FA", "2024FA"])
+
+    def test_range_stacks_terms(self):
+        """A range returns every term's rows."""
+        sections = self.store().sections("2023FA:2024FA")
+        self.assertEqual(sorted(sections["Term"].astype(str).unique()),
+                         ["2023FA", "2024FA", "2024SP"])
+
+
+if __name__ == '__main__':
+    unittest.main()
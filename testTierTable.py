@@ -0,0 +1,38 @@
+import unittest
+import numpy as np
+import pandas as pd
+from tier_table import TierTable, SUPPORT
+
+
+class TestTierTable(unittest.TestCase):
+
+    def setUp(self):
+        frame = pd.DataFrame({
+            "Prefix/Course ID": ["MAT", "CAB", "ACA", None, "CAB"],
+            "Tier": ["2", "1A", "2", "2", "1B"],
+            "New Sector": [4800, 5340, 4800, 1, 4800],
+        })
+        self.table = TierTable.from_frame(frame)
+
+    def test_scalar_lookup(self):
+        """Single prefixes return their funding, 0 when unknown."""
+        self.assertEqual(self.table.funding_for("MAT"), 4800.0)
+        self.assertEqual(self.table.funding_for("ZZZ"), 0.0)
+        self.assertEqual(self.table.tier_for("ACA"), "2")
+
+    def test_vector_lookup(self):
+        """A column of prefixes is looked up at once."""
+        result = self.table.funding_for(pd.Series(["ACA", None, "ZZZ", "MAT"]))
+        np.testing.assert_array_equal(result, [4800.0, 0.0, 0.0, 4800.0])
+
+    def test_duplicate_prefix_last_wins(self):
+        """Repeated prefixes keep the last row, like a dict would."""
+        self.assertEqual(self.table.funding_for("CAB"), 4800.0)
+        self.assertEqual(self.table.tier_for("CAB"), "1B")
+
+    def test_support(self):
+        self.assertEqual(self.table.support, SUPPORT)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,208 @@
+# -*- coding: utf-8 -*-
+"""
+FTE_Tier.xlsx as a sorted, load-once lookup table.
+
+The workbook is read at most once per process (and once per change of the
+file, thanks to a small pickle in .csar_cache/ keyed by its mtime and
+size). Funding levels are looked up by course prefix with a binary search
+over a sorted array, for one prefix or a whole column at once.
+"""
+import os
+import pickle
+import numpy as np
+import pandas as pd
+from snapshot import CACHE_DIR, SNAPSHOT_VERSION
+
+
+# Fixed institutional and academic support added to every tier's funding
+SUPPORT = 1926
+
+TIER_FILE = 'FTE_Tier.xlsx'
+
+# Tables already loaded in this process, keyed by path
+_loaded = {}
+
+
+# Pickled in .csar_cache/tier_table.pkl: bump snapshot.SNAPSHOT_VERSION
+# when changing its attributes
+class TierTable:
+    '''
+    Funding level ("New Sector") and tier for every course prefix.
+
+    Parameters
+    ----------
+    prefixes : np.ndarray
+        Sorted, unique prefix/course IDs.
+    funding : np.ndarray
+        "New Sector" funding for each prefix.
+    tiers : np.ndarray
+        Tier label (1A, 1B, 2) for each prefix.
+    support : int
+        Support value added to the funding (default is SUPPORT).
+    '''
+
+    def __init__(self, prefixes, funding, tiers, support=SUPPORT):
+        self.prefixes = prefixes
+        self.funding = funding
+        self.tiers = tiers
+        self.support = support
+
+    @classmethod
+    def from_frame(cls, tier, support=SUPPORT):
+        '''
+        Builds the table from the FTE_Tier.xlsx dataframe.
+
+        When a prefix is listed more than once the last row wins, the
+        same as the dictionaries the reports used to build.
+
+        Parameters
+        ----------
+        tier : dataframe
+            Needs "Prefix/Course ID", "New Sector" and "Tier" columns.
+        support : int
+            Support value added to the funding (default is SUPPORT).
+
+        Returns
+        -------
+        TierTable
+        '''
+        tier = tier.dropna(subset=['Prefix/Course ID'])
+        tier = tier.drop_duplicates('Prefix/Course ID', keep='last')
+        tier = tier.sort_values('Prefix/Course ID')
+
+        tiers = tier['Tier'] if 'Tier' in tier.columns else ''
+        return cls(
+            tier['Prefix/Course ID'].astype(str).to_numpy(dtype=str),
+            tier['New Sector'].to_numpy(dtype=float),
+            pd.Series(tiers, index=tier.index).astype(str).to_numpy(dtype=str),
+            support)
+
+    def __len__(self):
+        return len(self.prefixes)
+
+    def _positions(self, prefixes):
+        '''
+        Finds each prefix in the sorted array.
+
+        Returns
+        -------
+        pos : np.ndarray
+            Index into the table (only meaningful where found is True).
+        found : np.ndarray
+            True where the prefix is in the table.
+        '''
+        keys = pd.Series(prefixes, dtype=object).fillna('')
+        keys = keys.to_numpy(dtype=str)
+        if len(self.prefixes) == 0:
+            return np.zeros(len(keys), dtype=int), np.zeros(len(keys), dtype=bool)
+
+        pos = np.searchsorted(self.prefixes, keys)
+        pos = np.minimum(pos, len(self.prefixes) - 1)
+        return pos, self.prefixes[pos] == keys
+
+    def funding_for(self, prefixes):
+        '''
+        Looks up the "New Sector" funding for course prefixes.
+
+        Parameters
+        ----------
+        prefixes : str or array-like
+            One prefix or a column of them (e.g. Sec Name.str[:3]).
+
+        Returns
+        -------
+        float or np.ndarray
+            Funding for each prefix, 0 when the prefix is not listed.
+        '''
+        if np.ndim(prefixes) == 0:
+            return float(self.funding_for([prefixes])[0])
+
+        pos, found = self._positions(prefixes)
+        return np.where(found, self.funding[pos], 0.0) if len(pos) else np.zeros(0)
+
+    def tier_for(self, prefixes):
+        '''
+        Looks up the funding tier label for course prefixes.
+
+        Parameters
+        ----------
+        prefixes : str or array-like
+            One prefix or a column of them.
+
+        Returns
+        -------
+        str or np.ndarray
+            Tier for each prefix, '' when the prefix is not listed.
+        '''
+        if np.ndim(prefixes) == 0:
+            return str(self.tier_for([prefixes])[0])
+
+        pos, found = self._positions(prefixes)
+        if len(pos) == 0:
+            return np.zeros(0, dtype=str)
+        return np.where(found, self.tiers[pos], '')
+
+
+def as_tier_table(tier):
+    '''
+    Accepts either a TierTable or the FTE_Tier.xlsx dataframe.
+
+    Parameters
+    ----------
+    tier : TierTable or dataframe
+
+    Returns
+    -------
+    TierTable
+    '''
+    if isinstance(tier, TierTable):
+        return tier
+    return TierTable.from_frame(tier)
+
+
+def load(path=TIER_FILE, cache_dir=CACHE_DIR):
+    '''
+    Returns the tier table for a workbook, reading it only when it has
+    changed since the last load in this process or on disk.
+
+    Parameters
+    ----------
+    path : str
+        Location of the tier workbook (default is 'FTE_Tier.xlsx').
+    cache_dir : str
+        Directory for the pickled table (default is '.csar_cache').
+
+    Returns
+    -------
+    TierTable
+    '''
+    stat = os.stat(path)
+    # a table pickled by an older TierTable is read from the workbook again
+    signature = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size,
+                 SNAPSHOT_VERSION)
+
+    cached = _loaded.get(signature[0])
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+
+    cache_file = os.path.join(cache_dir, 'tier_table.pkl')
+    table = None
+    try:
+        with open(cache_file, 'rb') as file:
+            stored_signature, stored_table = pickle.load(file)
+        if stored_signature == signature:
+            table = stored_table
+    except (OSError, pickle.PickleError, EOFError, ValueError):
+        pass
+
+    if table is None:
+        table = TierTable.from_frame(pd.read_excel(path))
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            with open(cache_file, 'wb') as file:
+                pickle.dump((signature, table), file)
+        except OSError as err:
+            print(f"Could not write tier cache: {err}")
+
+    _loaded[signature[0]] = (signature, table)
+    return table
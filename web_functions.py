@@ -3,11 +3,21 @@
 # Imports
 import pandas as pd
 from openpyxl.styles import Font, Border, Side, PatternFill
-import options4 as opfour
+import option4 as opfour
+import functions as fn
+import fte_engine
+from tier_table import SUPPORT
 
-def readfile():
+def readfile(rebuild_cache=False):
     '''
     Generates the dataframe and then sorts it.
+    The dataframe has one row per section.
+
+    Parameters
+    ----------
+    rebuild_cache : bool
+        Ignore the snapshot in .csar_cache and rebuild it
+        (default is False).
 
     Returns
     -------
@@ -15,47 +25,26 @@ def readfile():
         the sorted dataframe of the file.
 
     '''
-    try:
-        # reads the deansDailyCsar.csv and unique_deansDailyCsar_FTE files in to a dataframe
-        file_in = pd.read_csv('deanDailyCsar.csv')
-        fte_file_in = pd.read_excel('unique_deansDailyCsar_FTE.xlsx')
-
-        # merge prior dataframes
-        # Extract Course Code from Sec Name if not already done
-        if "Course Code" not in file_in.columns:
-            file_in["Course Code"] = file_in["Sec Name"].str.extract(r"([A-Z]{3}-\d{3})")
-
-        # Also create Course Code in credits_df
-        if "Course Code" not in fte_file_in.columns:
-            fte_file_in["Course Code"] = fte_file_in["Sec Name"].str.extract(r"([A-Z]{3}-\d{3})")
-
-        # Merge only needed columns from credits_df
-        merged_df = pd.merge(
-            file_in,
-            fte_file_in[["Course Code", "Contact Hours"]],
-            how='left',
-            on='Course Code'
-        )
-
-        merged_df["Contact Hours"] = pd.to_numeric(
-        merged_df["Contact Hours"], errors='coerce')
-        merged_df["FTE Count"] = pd.to_numeric(merged_df["FTE Count"], errors='coerce')
-
-        # Calculate Total FTE
-        merged_df["Total FTE"] = ((merged_df["Contact Hours"] * 16 *\
-                                   merged_df["FTE Count"]) / 512).round(3)
+    # shares the tables and their snapshot with the command line version
+    return fn.read_tables(rebuild_cache)[0]
 
 
-        # sorts the dataframe by sec divisions, sec name
-        # and sec faculty info and assigns it to groups
-        groups = merged_df.sort_values(["Sec Divisions", "Sec Name", "Sec Faculty Info"])
+def readmeetings(rebuild_cache=False):
+    '''
+    Loads the Meetings table (one row per meeting line, with the parsed
+    Meeting Times columns).
 
-        return groups
+    Parameters
+    ----------
+    rebuild_cache : bool
+        Ignore the snapshot in .csar_cache and rebuild it
+        (default is False).
 
-    except FileNotFoundError:
-        groups = []
-        print("File Missing!")
-        return groups
+    Returns
+    -------
+    meetings : dataframe
+    '''
+    return fn.read_tables(rebuild_cache)[1]
 
 
 def calc_enrollment(row):
@@ -73,6 +62,31 @@ def calc_enrollment(row):
             return "N/A%"
 
 
+def enrollment_percentages(frame):
+    '''
+    calc_enrollment for every row at once: "12.50%", "0%" when the
+    capacity is 0, otherwise "N/A%" when the capacity or count is
+    missing or not a number.
+
+    Parameters
+    ----------
+    frame : dataframe
+        Needs "Capacity" and "FTE Count" columns.
+
+    Returns
+    -------
+    pd.Series
+        Formatted percentages, indexed like frame.
+    '''
+    cap = pd.to_numeric(frame["Capacity"], errors='coerce').astype(float)
+    count = pd.to_numeric(frame["FTE Count"], errors='coerce').astype(float)
+
+    percentage = (count / cap.where(cap != 0)) * 100
+    text = percentage.map("{:.2f}%".format)
+    text = text.where(cap.notna() & count.notna(), "N/A%")
+    return text.where(cap != 0, "0%").astype(str)
+
+
 def fte_by_div_raw(file_in, fte_tier, div_code):
 
     # Filter division
@@ -82,109 +96,63 @@ def fte_by_div_raw(file_in, fte_tier, div_code):
     if div_data.empty:
         return None, 0, 0
 
-    # Create lookup for prefix/course ID → New Sector multiplier
-    fte_lookup = {
-        row['Prefix/Course ID']: row['New Sector']
-        for _, row in fte_tier.iterrows()
-        if pd.notna(row['Prefix/Course ID'])
-    }
-
     # Extract course codes from Sec Name
     div_data['Course Code'] = div_data['Sec Name'].str.extract(r'([A-Z]+-\d+)')
     div_data = div_data.sort_values(['Course Code', 'Sec Name'])
 
-    base_fte_value = 1926
-
-    output_rows = []
-    current_course = None
-    course_total_fte = 0
-    first_row = True
-
-    grand_total_original_fte = 0
-    grand_total_generated_fte = 0
-
-    for _, row in div_data.iterrows():
-        course = row['Course Code']
-        sec = row['Sec Name'][:3] if pd.notna(row['Sec Name']) else ""
-
-        new_sector_value = fte_lookup.get(sec, 0)
-        total_fte = float(row['Total FTE']) if pd.notna(row['Total FTE']) else 0
-        adjusted_fte = total_fte * (new_sector_value + base_fte_value)
-
-        grand_total_original_fte += total_fte
-
-        enrollment_per = ''
-        if pd.notna(row['Capacity']) and pd.notna(row['FTE Count']) and float(row['Capacity']) > 0:
-            enrollment_per = round((float(row['FTE Count']) / float(row['Capacity'])) * 100, 2)
-
-        if course != current_course and current_course is not None:
-            output_rows.append({
-                'Division': '',
-                'Course Code': 'Total',
-                'Sec Name': '',
-                'X Sec Delivery Method': '',
-                'Meeting Times': '',
-                'Capacity': '',
-                'FTE Count': '',
-                'Sec Faculty Info': '',
-                'Total FTE': '',
-                'Enrollment Per': '',
-                'Generated FTE': course_total_fte
-            })
-            grand_total_generated_fte += course_total_fte
-            course_total_fte = 0
-
-        output_rows.append({
-            'Division': div_code if first_row else '',
-            'Course Code': course if course != current_course else '',
-            'Sec Name': row['Sec Name'],
-            'X Sec Delivery Method': row['X Sec Delivery Method'],
-            'Meeting Times': row['Meeting Times'],
-            'Capacity': row['Capacity'],
-            'FTE Count': row['FTE Count'],
-            'Sec Faculty Info': row['Sec Faculty Info'],
-            'Total FTE': total_fte,
-            'Enrollment Per': f"{enrollment_per}%" if enrollment_per != '' else '',
-            'Generated FTE': adjusted_fte
-        })
-
-        course_total_fte += adjusted_fte
-        current_course = course
-        first_row = False
-
-    # Add final course total
-    if current_course is not None:
-        output_rows.append({
-            'Division': '',
-            'Course Code': 'Total',
-            'Sec Name': '',
-            'X Sec Delivery Method': '',
-            'Meeting Times': '',
-            'Capacity': '',
-            'FTE Count': '',
-            'Sec Faculty Info': '',
-            'Total FTE': '',
-            'Enrollment Per': '',
-            'Generated FTE': course_total_fte
-        })
-        grand_total_generated_fte += course_total_fte
-
-    output_df = pd.DataFrame(output_rows)
+    # Generated FTE and enrollment for the whole division in one pass
+    div_data = fte_engine.compute_fte(div_data, fte_tier)
+    return division_rows(div_data, div_code)
+
+
+def division_rows(div_data, div_code):
+    '''
+    FTE by Division rows for one division's sections, already sorted by
+    Course Code and Sec Name and passed through fte_engine.compute_fte.
+
+    Returns
+    -------
+    tuple
+        (report rows, Total FTE, Generated FTE), as fte_by_div_raw.
+    '''
+    new_course = fte_engine.course_starts(div_data['Course Code'])
+
+    # missing Total FTE has always been reported as a plain 0
+    section_fte = div_data['Section FTE'].astype(object).where(
+        div_data['Total FTE'].notna(), 0)
+
+    section_rows = pd.DataFrame({
+        'Division': '',
+        'Course Code': div_data['Course Code'].where(new_course, ''),
+        'Sec Name': div_data['Sec Name'],
+        'X Sec Delivery Method': div_data['X Sec Delivery Method'],
+        'Meeting Times': div_data['Meeting Times'],
+        'Capacity': div_data['Capacity'],
+        'FTE Count': div_data['FTE Count'],
+        'Sec Faculty Info': div_data['Sec Faculty Info'],
+        'Total FTE': section_fte,
+        'Enrollment Per': fte_engine.format_ratio(div_data['Enrollment Ratio'], "{}%"),
+        'Generated FTE': div_data['Generated FTE']
+    })
+    section_rows.iloc[0, 0] = div_code
+
+    output_df, course_totals = fte_engine.add_course_totals(
+        section_rows, div_data['Course Code'], div_data['Generated FTE'])
+
+    grand_total_original_fte = fte_engine.running_total(div_data['Section FTE'])
+    grand_total_generated_fte = fte_engine.running_total(course_totals)
+
     return output_df, grand_total_original_fte, grand_total_generated_fte
 
 
 def format_fte_output(raw_df, original_fte_total, generated_fte_total):
-    formatted_rows = []
 
-    for _, row in raw_df.iterrows():
-        formatted_row = row.copy()
-        if isinstance(row['Generated FTE'], (float, int)):
-            formatted_row['Generated FTE'] = "${:,.2f}".format(row['Generated FTE'])
-        if isinstance(row['Total FTE'], (float, int)):
-            formatted_row['Total FTE'] = "{:.3f}".format(row['Total FTE'])
-        formatted_rows.append(formatted_row)
-
-    df = pd.DataFrame(formatted_rows)
+    # numbers are formatted, the blanks and labels of total rows kept
+    df = raw_df.copy()
+    df['Generated FTE'] = df['Generated FTE'].map(
+        lambda x: "${:,.2f}".format(x) if isinstance(x, (float, int)) else x)
+    df['Total FTE'] = df['Total FTE'].map(
+        lambda x: "{:.3f}".format(x) if isinstance(x, (float, int)) else x)
     df.loc[len(df.index)] = {
         'Division': '',
         'Course Code': 'DIVISION TOTAL',
@@ -201,7 +169,7 @@ def format_fte_output(raw_df, original_fte_total, generated_fte_total):
 
     return df
 
-def calculate_fte_by_course(df, fte_tier, course_code, base_fte=1926):
+def calculate_fte_by_course(df, fte_tier, course_code, base_fte=SUPPORT):
 
     course_code = course_code.upper()
     filtered = df[df['Course Code'] == course_code].copy()
@@ -209,43 +177,46 @@ def calculate_fte_by_course(df, fte_tier, course_code, base_fte=1926):
     if filtered.empty:
         return None, 0, 0
 
-    # Load FTE lookup
-    fte_lookup = {
-        row['Prefix/Course ID']: row['New Sector']
-        for _, row in fte_tier.iterrows()
-        if pd.notna(row['Prefix/Course ID'])
-    }
+    # Generated FTE and enrollment for every section at once
+    filtered = fte_engine.compute_fte(filtered, fte_tier, base_fte)
+    return course_rows(filtered)
 
-    output_rows = []
-    total_original_fte = 0
-    total_generated_fte = 0
-
-    for _, row in filtered.iterrows():
-        sec_prefix = row['Sec Name'][:3]
-        new_sector = fte_lookup.get(sec_prefix, 0)
-        total_fte = float(row['Total FTE']) if pd.notna(row['Total FTE']) else 0
-        generated_fte = total_fte * (new_sector + base_fte)
-        total_original_fte += total_fte
-        total_generated_fte += generated_fte
-
-        enrollment_per = ''
-        if pd.notna(row['Capacity']) and pd.notna(row['FTE Count']) and float(row['Capacity']) > 0:
-            enrollment_per = round((float(row['FTE Count']) / float(row['Capacity'])) * 100, 2)
-
-        output_rows.append({
-            'Sec Name': row['Sec Name'],
-            'X Sec Delivery Method': row['X Sec Delivery Method'],
-            'Sec Faculty Info': row['Sec Faculty Info'],
-            'Meeting Times': row['Meeting Times'],
-            'Capacity': row['Capacity'],
-            'FTE Count': row['FTE Count'],
-            'Total FTE': total_fte,
-            'Enrollment Per': f"{enrollment_per}%" if enrollment_per else '',
-            'Generated FTE': generated_fte
-        })
+
+def course_rows(filtered):
+    '''
+    FTE per Course rows for one course's sections, already passed
+    through fte_engine.compute_fte.
+
+    Returns
+    -------
+    tuple
+        (report rows, Total FTE, Generated FTE), as calculate_fte_by_course.
+    '''
+    total_original_fte = fte_engine.running_total(filtered['Section FTE'])
+    total_generated_fte = fte_engine.running_total(filtered['Generated FTE'])
+
+    # missing Total FTE has always been reported as a plain 0
+    section_fte = filtered['Section FTE'].astype(object).where(
+        filtered['Total FTE'].notna(), 0)
+
+    # sections that round to 0% enrollment are left blank
+    enrollment = filtered['Enrollment Ratio']
+    enrollment = enrollment.where(enrollment.map(lambda x: round(x, 2)) != 0)
+
+    output_rows = pd.DataFrame({
+        'Sec Name': filtered['Sec Name'],
+        'X Sec Delivery Method': filtered['X Sec Delivery Method'],
+        'Sec Faculty Info': filtered['Sec Faculty Info'],
+        'Meeting Times': filtered['Meeting Times'],
+        'Capacity': filtered['Capacity'],
+        'FTE Count': filtered['FTE Count'],
+        'Total FTE': section_fte,
+        'Enrollment Per': fte_engine.format_ratio(enrollment, "{}%"),
+        'Generated FTE': filtered['Generated FTE']
+    }).reset_index(drop=True)
 
     # Add summary row
-    output_rows.append({
+    output_rows.loc[len(output_rows)] = {
         'Sec Name': 'COURSE TOTAL',
         'X Sec Delivery Method': '',
         'Sec Faculty Info': '',
@@ -255,9 +226,9 @@ def calculate_fte_by_course(df, fte_tier, course_code, base_fte=1926):
         'Total FTE': "{:.2f}".format(total_original_fte),
         'Enrollment Per': '',
         'Generated FTE': "${:,.2f}".format(total_generated_fte)
-    })
+    }
 
-    df_out = pd.DataFrame(output_rows)
+    df_out = output_rows
     df_out['Total FTE'] = df_out['Total FTE'].apply(lambda x: "{:.2f}".format(x) if isinstance(x, float) else x)
     df_out['Generated FTE'] = df_out['Generated FTE'].apply(lambda x: "${:,.2f}".format(x) if isinstance(x, (float, int)) else x)
 
@@ -273,7 +244,7 @@ def generate_faculty_fte_report(dean_df, fte_tier, faculty_name):
     ----------
     dean_df : pd.DataFrame
         Merged dean dataset
-    fte_tier : pd.DataFrame
+    fte_tier : TierTable | pd.DataFrame
         Tier multipliers
     faculty_name : str
         Full match of a faculty member from 'Sec Faculty Info'
@@ -288,12 +259,27 @@ def generate_faculty_fte_report(dean_df, fte_tier, faculty_name):
         Total generated FTE
     """
     frame = dean_df[dean_df["Sec Faculty Info"] == faculty_name].copy()
-    frame = opfour.remove_duplicate_sections(frame)
+    frame = frame.sort_values("Sec Name")
 
     frame["Enrollment Per"] = opfour.calculate_enrollment_percentage(
         frame["FTE Count"], frame["Capacity"])
 
     frame = opfour.generate_fte(frame, fte_tier)
+    frame = frame.drop(columns=["Invalid FTE"])
+    return faculty_rows(frame)
+
+
+def faculty_rows(frame):
+    """
+    FTE per Instructor rows for one faculty member's sections, sorted by
+    Sec Name, with "Enrollment Per" and "Generated FTE" filled in.
+
+    Returns
+    -------
+    tuple
+        (report rows, Total FTE, Generated FTE), as
+        generate_faculty_fte_report.
+    """
 
     total_original = frame["Total FTE"].sum()
     total_generated = frame["Generated FTE"].sum()